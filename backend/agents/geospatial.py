@@ -1,17 +1,34 @@
 from langchain.tools import tool
+from langchain_core.tools import InjectedToolArg
 from pydantic import BaseModel, Field
+from typing import Annotated, Optional
 import random
 
 class Coordinates(BaseModel):
     latitude: float
     longitude: float
 
-@tool("get_environmental_data", args_schema=Coordinates)
-def get_environmental_data(latitude: float, longitude: float):
+class EnvironmentRequest(Coordinates):
+    # Supplied by the caller, never by the model
+    reading: Annotated[Optional[dict], InjectedToolArg] = None
+
+@tool("get_environmental_data", args_schema=EnvironmentRequest)
+def get_environmental_data(latitude: float, longitude: float, reading: Optional[dict] = None):
     """
     Fetches real-time environmental data (AQI, Pollutants, Weather) for a given location.
-    Currently mocks data for demonstration purposes.
+    Uses the stored tile reading passed in by the caller
+    (services.environment.latest_tile_reading), and mocks data for
+    demonstration when there is none.
     """
+    if reading:
+        return {
+            "aqi_pm25": reading["aqi"],
+            "temperature_c": reading["temperature_c"],
+            "heat_index": reading["heat_index"],
+            "chemical_exposure": reading["chemical_exposure"],
+            "weather_condition": "Heatwave" if reading["heat_index"] > 40 else "Fetched",
+            "message": f"Reading for local grid tile at {reading['fetched_at']:%Y-%m-%d %H:%M}"
+        }
 
     is_polluted_zone = (latitude > 18.0 and latitude < 20.0) 
     
@@ -2,10 +2,13 @@ from typing import TypedDict, List, Dict, Any, Annotated
 from langgraph.graph import StateGraph, START, END
 from .clinical import assess_clinical_risk, ClinicalVitals
 from .nutrition import generate_nutrition_advice
+from .llm import key_pool, GEMINI_MODEL
+from .guidance_cache import (
+    guidance_cache, guidance_fingerprint, fill, bucket, flag_name, NAME_PLACEHOLDER, READING_PLACEHOLDERS
+)
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
-import os
 
 class PlanetaryIntelligence(BaseModel):
     temperature_c: float
@@ -30,12 +33,12 @@ class GraphState(TypedDict):
     nutrition_advice: Dict[str, List[str]]
 
 class GuidanceOutput(BaseModel):
-    clinical_justification: str = Field(description="A detailed clinical justification explicitly citing the local temperature and AQI. If environmental factors are safe, explicitly state that they were analyzed and are safe (e.g., 'The 4.5/10 score is driven by anemia; the local 27°C temperature and 102 AQI were analyzed and are currently within safe limits, adding no additional risk').")
+    clinical_justification: str = Field(description="A detailed clinical justification explicitly citing the local temperature and AQI. If environmental factors are safe, explicitly state that they were analyzed and are safe (e.g., 'The [RISK_SCORE]/10 score is driven by anemia; the local [TEMPERATURE_C]°C temperature and [AQI] AQI were analyzed and are currently within safe limits, adding no additional risk').")
     clinical_dietary_plan: List[str] = Field(description="List of specific dietary recommendations, e.g., 'Salt reduction (<5g) to manage BP'")
-    environmental_safety_protocols: List[str] = Field(description="List of specific environmental safety recommendations, e.g., 'Avoid outdoors between 11 AM - 4 PM due to 41C heat index'")
+    environmental_safety_protocols: List[str] = Field(description="List of specific environmental safety recommendations, e.g., 'Avoid outdoors between 11 AM - 4 PM due to [HEAT_INDEX]°C heat index'")
     medication_monitoring: List[str] = Field(description="List of specific medication or monitoring actions, e.g., 'Check BP daily; notify Doctor if systolic exceeds 140'")
 
-def assess_clinical_node(state: GraphState) -> Dict:
+async def assess_clinical_node(state: GraphState) -> Dict:
     vitals = state["clinical_vitals"]
 
     result = assess_clinical_risk.invoke({
@@ -53,8 +56,7 @@ def assess_clinical_node(state: GraphState) -> Dict:
         "clinical_flags": result["flags"]
     }
 
-def fetch_environment_node(state: GraphState) -> Dict:
-    env = state["planetary_intelligence"]
+def environment_flags(env: PlanetaryIntelligence) -> List[str]:
     env_flags = []
     
     if env.heat_index > 40:
@@ -63,25 +65,21 @@ def fetch_environment_node(state: GraphState) -> Dict:
         env_flags.append(f"High PM2.5 Levels ({env.aqi:.1f})")
     if env.toxins > 6.0:
         env_flags.append(f"High Chemical/Toxin Exposure ({env.toxins:.1f}/10)")
-        
-    return {
-        "environmental_flags": env_flags
-    }
+    return env_flags
 
-def generate_guidance_node(state: GraphState) -> Dict:
-    clinical_flags = state.get("clinical_flags", [])
-    env_flags = state.get("environmental_flags", [])
-    combined_flags = clinical_flags + env_flags
-
-    base_score = state.get("clinical_score", 1.0)
+def environment_multiplier(env: PlanetaryIntelligence) -> float:
     multiplier = 1.0
-    env = state["planetary_intelligence"]
-    
     if env.heat_index > 40: multiplier += 0.3
     if env.aqi > 150: multiplier += 0.2
     if env.toxins > 6.0: multiplier += 0.2
-        
-    final_score = base_score * multiplier
+    return multiplier
+
+def apply_environment(base_score: float, env: PlanetaryIntelligence):
+    """
+    Scales the clinical score by the planetary multiplier (capped at 10) and
+    explains the increase. Returns (final_score, impact_str).
+    """
+    final_score = base_score * environment_multiplier(env)
     final_score = min(final_score, 10.0)
 
     impact_str = ""
@@ -92,11 +90,29 @@ def generate_guidance_node(state: GraphState) -> Dict:
         if env.aqi > 150: impact_reasons.append(f"{env.aqi:.1f} AQI")
         if env.toxins > 6.0: impact_reasons.append(f"high chemical exposure")
         impact_str = f"Score increased by +{extra_score:.1f} due to {' and '.join(impact_reasons)}."
-    
+    return final_score, impact_str
+
+def risk_level_for(score: float) -> str:
     risk_level = "LOW"
-    if final_score >= 4.0: risk_level = "MODERATE"
-    if final_score >= 7.0: risk_level = "HIGH"
-    if final_score >= 9.0: risk_level = "CRITICAL"
+    if score >= 4.0: risk_level = "MODERATE"
+    if score >= 7.0: risk_level = "HIGH"
+    if score >= 9.0: risk_level = "CRITICAL"
+    return risk_level
+
+async def fetch_environment_node(state: GraphState) -> Dict:
+    return {
+        "environmental_flags": environment_flags(state["planetary_intelligence"])
+    }
+
+async def generate_guidance_node(state: GraphState) -> Dict:
+    clinical_flags = state.get("clinical_flags", [])
+    env_flags = state.get("environmental_flags", [])
+    combined_flags = clinical_flags + env_flags
+
+    base_score = state.get("clinical_score", 1.0)
+    env = state["planetary_intelligence"]
+    final_score, impact_str = apply_environment(base_score, env)
+    risk_level = risk_level_for(final_score)
 
     weather_cond = f"Temp: {env.temperature_c}, AQI: {env.aqi}, Toxins: {env.toxins}"
     fallback_advice = generate_nutrition_advice.invoke({
@@ -104,42 +120,43 @@ def generate_guidance_node(state: GraphState) -> Dict:
         "weather_condition": weather_cond
     })
 
+    # The prompt carries only bucketed readings, and the answer quotes exact
+    # ones through placeholders, so it can be cached for the whole bucket
+    readings = {
+        "temperature_c": env.temperature_c, "heat_index": env.heat_index,
+        "aqi": env.aqi, "toxins": env.toxins, "score": final_score
+    }
+    ranges = {name: "{:g}-{:g}".format(*bucket(name, value)) for name, value in readings.items()}
+    tokens = READING_PLACEHOLDERS
+
     prompt = f"""
-    You are an expert AI Clinical Dietician assisting a doctor for a pregnant mother named {state["name"]}.
+    You are an expert AI Clinical Dietician assisting a doctor for a pregnant mother. Refer to her only as {NAME_PLACEHOLDER}.
     Clinical Flags: {clinical_flags}
-    Environmental Flags: {env_flags} (Current Temp: {env.temperature_c}°C, AQI: {env.aqi}, Toxins: {env.toxins})
-    Current Generated Score: {final_score:.1f} / 10 ({risk_level})
+    Environmental Flags: {[flag_name(f) for f in env_flags]} (Current Temp: {ranges["temperature_c"]}°C, Heat Index: {ranges["heat_index"]}°C, AQI: {ranges["aqi"]}, Toxins: {ranges["toxins"]}/10)
+    Current Generated Score: {ranges["score"]} / 10 ({risk_level})
     Generated Base Advice: {fallback_advice}
+    Never write a reading as a number. Write the exact temperature as {tokens["temperature_c"]}, heat index as {tokens["heat_index"]}, AQI as {tokens["aqi"]}, toxin level as {tokens["toxins"]} and the score as {tokens["score"]}; they are filled in afterwards.
     
     Provide a detailed "Reasoning Trace":
-    1. A single-paragraph "Clinical Justification" that explicitly states the current exact temperature ({env.temperature_c}°C) and exact AQI ({env.aqi}). You MUST explain how these environmental factors compounded with the clinical vitals. If the environmental conditions are safe and did not increase the risk score, explicitly state that they were analyzed, are within safe limits, and pose no additional harm, to assure the user that planetary conditions are actively monitored.
+    1. A single-paragraph "Clinical Justification" that explicitly states the current exact temperature ({tokens["temperature_c"]}°C) and exact AQI ({tokens["aqi"]}). You MUST explain how these environmental factors compounded with the clinical vitals. If the environmental conditions are safe and did not increase the risk score, explicitly state that they were analyzed, are within safe limits, and pose no additional harm, to assure the user that planetary conditions are actively monitored.
     2. Categorize the practical advice into Clinical Dietary Plan, Environmental Safety Protocols, and Medication/Monitoring. Extract specific actionable items.
     """
     
-    api_key_str = os.environ.get("GOOGLE_API_KEY", "")
-    api_keys = [k.strip() for k in api_key_str.split(",") if k.strip()]
-    if not api_keys:
-        api_keys = [""]
-        
-    response = None
+    cache_key = guidance_fingerprint(clinical_flags, env_flags, risk_level, readings)
+    payload = await guidance_cache.get(cache_key)
     last_error = None
-    
-    for api_key in api_keys:
+
+    if payload is None:
         try:
-            llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.1, api_key=api_key)
-            structured_llm = llm.with_structured_output(GuidanceOutput)
-            response = structured_llm.invoke([HumanMessage(content=prompt)])
-            break # Success, break out of loop
+            generated = await key_pool.call(
+                "guidance", lambda structured_llm: structured_llm.ainvoke([HumanMessage(content=prompt)])
+            )
+            payload = generated.model_dump()
+            await guidance_cache.set(cache_key, payload)
         except Exception as e:
             last_error = e
-            error_msg = str(e)
-            print(f"API Key starting with '{api_key[:8]}' failed: {e}")
-            # If it's a quota, rate limit or invalid key error, try the next key
-            if any(term in error_msg for term in ["429", "Quota", "RESOURCE_EXHAUSTED", "API_KEY_INVALID", "invalid"]):
-                continue
-            else:
-                break # Non-key error, don't continue rotating
-                
+    response = GuidanceOutput(**fill(payload, state["name"], readings)) if payload else None
+
     if response:
         justification = response.clinical_justification
         advice_dict = {
@@ -170,6 +187,12 @@ def generate_guidance_node(state: GraphState) -> Dict:
         "nutrition_advice": advice_dict
     }
 
+def _guidance_llm(api_key: str):
+    llm = ChatGoogleGenerativeAI(model=GEMINI_MODEL, temperature=0.1, api_key=api_key)
+    return llm.with_structured_output(GuidanceOutput)
+
+key_pool.register("guidance", _guidance_llm)
+
 builder = StateGraph(GraphState)
 
 builder.add_node("assess_clinical", assess_clinical_node)
@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from services.cache import TTLCache, SQLiteStore
+
+GUIDANCE_CACHE_TTL = int(os.environ.get("GUIDANCE_CACHE_TTL", str(24 * 3600)))
+GUIDANCE_CACHE_SIZE = int(os.environ.get("GUIDANCE_CACHE_SIZE", "512"))
+GUIDANCE_CACHE_DISK_SIZE = int(os.environ.get("GUIDANCE_CACHE_DISK_SIZE", "20000"))
+GUIDANCE_CACHE_PATH = os.environ.get("GUIDANCE_CACHE_PATH", "data/llm_cache.db")
+
+# The prompt refers to the mother only by this token, so cached text never holds
+# a real name and filling it in cannot touch any other word
+NAME_PLACEHOLDER = "[MOTHER_NAME]"
+
+# Readings are bucketed in the key, and the model quotes the exact values only
+# through these tokens, so one cached answer fits every mother in the bucket
+READING_PLACEHOLDERS = {
+    "temperature_c": "[TEMPERATURE_C]",
+    "heat_index": "[HEAT_INDEX]",
+    "aqi": "[AQI]",
+    "toxins": "[TOXINS]",
+    "score": "[RISK_SCORE]",
+}
+READING_BUCKETS = {"temperature_c": 2.0, "heat_index": 2.0, "aqi": 25.0, "toxins": 1.0, "score": 1.0}
+READING_FORMATS = {"temperature_c": "{:.1f}", "heat_index": "{:.1f}", "aqi": "{:.0f}", "toxins": "{:.1f}", "score": "{:.1f}"}
+
+# Trailing readings such as "(43.2°C)" or "(7.8/10)"; descriptive parentheses stay
+FLAG_READING = re.compile(r"\s*\([^)]*\d[^)]*\)$")
+
+def bucket(name: str, value: float) -> Tuple[float, float]:
+    width = READING_BUCKETS[name]
+    low = math.floor(value / width) * width
+    return low, low + width
+
+def flag_name(flag: str) -> str:
+    """The flag without its reading, e.g. "Extreme Heat Index (43.2°C)" -> "Extreme Heat Index"."""
+    return FLAG_READING.sub("", flag)
+
+def guidance_fingerprint(clinical_flags: List[str], environmental_flags: List[str], risk_level: str,
+                         readings: Dict[str, float]) -> str:
+    """
+    Content address of a guidance request. Flags are order-insensitive,
+    free-text symptoms are normalized and environment flags lose their
+    readings. The readings (and score) count only by bucket; the exact values
+    are filled in by fill() after reading.
+    """
+    canonical = {
+        "version": 3,
+        "clinical_flags": sorted(" ".join(f.lower().split()) for f in clinical_flags),
+        "environmental_flags": sorted(flag_name(f) for f in environmental_flags),
+        "risk_level": risk_level,
+        "buckets": {name: bucket(name, value)[0] for name, value in sorted(readings.items())},
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+class GuidanceCache:
+    """
+    Two-tier cache of GuidanceOutput payloads: an in-process TTL/LRU tier in
+    front of a SQLite file tier that survives restarts.
+    """
+
+    def __init__(self, path: str = GUIDANCE_CACHE_PATH, ttl: int = GUIDANCE_CACHE_TTL,
+                 maxsize: int = GUIDANCE_CACHE_SIZE, disk_maxsize: int = GUIDANCE_CACHE_DISK_SIZE):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteStore(path, table="guidance_cache", maxsize=disk_maxsize)
+        self.disk_hits = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        payload = self.memory.get(key)
+        if payload is None:
+            raw = await asyncio.to_thread(self.disk.get, key)
+            if raw is None:
+                return None
+            self.disk_hits += 1
+            payload = json.loads(raw)
+            self.memory.set(key, payload)
+        return payload
+
+    async def set(self, key: str, payload: dict):
+        """Stores a payload still holding its placeholders; fill() after reading."""
+        self.memory.set(key, payload)
+        await asyncio.to_thread(self.disk.set, key, json.dumps(payload), self.ttl)
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.disk_hits
+        return {
+            "memory": memory,
+            "disk_hits": self.disk_hits,
+            "disk_size": len(self.disk),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+def fill(value, name: str, readings: Dict[str, float]):
+    """Puts the mother's name and exact readings wherever the model wrote a placeholder."""
+    if isinstance(value, str):
+        value = value.replace(NAME_PLACEHOLDER, name or "the mother")
+        for reading, placeholder in READING_PLACEHOLDERS.items():
+            if reading in readings:
+                value = value.replace(placeholder, READING_FORMATS[reading].format(readings[reading]))
+        return value
+    if isinstance(value, list):
+        return [fill(v, name, readings) for v in value]
+    if isinstance(value, dict):
+        return {k: fill(v, name, readings) for k, v in value.items()}
+    return value
+
+guidance_cache = GuidanceCache()
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Upper bound on Gemini requests in flight per worker process. Assessments, chat
+# summaries and translations all share this budget so a burst of one kind cannot
+# starve the others or trip the per-key rate limits.
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+LLM_KEY_COOLDOWN = float(os.environ.get("LLM_KEY_COOLDOWN", "60"))
+LLM_INVALID_KEY_COOLDOWN = float(os.environ.get("LLM_INVALID_KEY_COOLDOWN", "3600"))
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+
+QUOTA_ERROR_TERMS = ("429", "Quota", "RESOURCE_EXHAUSTED")
+# Only authentication failures say anything about the key itself; other 4xx
+# errors (a malformed prompt, say) would fail on every key and go to the caller
+INVALID_KEY_TERMS = ("API_KEY_INVALID", "UNAUTHENTICATED", "PERMISSION_DENIED")
+AUTH_ERROR_CODES = (401, 403)
+
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+def parse_api_keys(value: str) -> List[str]:
+    return [k.strip() for k in value.split(",") if k.strip()]
+
+class KeyPoolExhausted(Exception):
+    def __init__(self, last_error: Optional[Exception] = None):
+        self.last_error = last_error
+        detail = last_error if last_error else "no API key is configured or every key is cooling down"
+        super().__init__(f"All Gemini API keys failed: {detail}")
+
+class KeyHealth:
+    def __init__(self, key: str):
+        self.hint = f"{key[:4]}…{key[-2:]}" if len(key) > 8 else "…"
+        self.calls = 0
+        self.errors = 0
+        self.quota_errors = 0
+        self.in_flight = 0
+        self.avg_latency = 0.0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.cooldown_until <= now
+
+    def record(self, latency: float, error: bool = False):
+        self.calls += 1
+        self.errors += int(error)
+        # Exponentially weighted so a key that recovers is trusted again quickly
+        self.avg_latency = latency if self.calls == 1 else 0.8 * self.avg_latency + 0.2 * latency
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "key": self.hint,
+            "calls": self.calls,
+            "errors": self.errors,
+            "quota_errors": self.quota_errors,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+            "avg_latency_ms": round(self.avg_latency * 1000, 1),
+            "in_flight": self.in_flight,
+            "cooldown_remaining_s": round(max(self.cooldown_until - now, 0.0), 1),
+        }
+
+class KeyPool:
+    """
+    Shares the comma-separated GOOGLE_API_KEY list between every Gemini caller.
+
+    One client per (kind, key) is built on first use and reused. Each call goes
+    to the available key with the fewest requests in flight and the lowest
+    recent latency. A key that answers 429/RESOURCE_EXHAUSTED is put on
+    cooldown (using the server's retry delay when given) and an invalid key is
+    parked for much longer, so later calls skip them instead of retrying them
+    first. Client factories are injectable, which lets tests use a fake backend.
+    """
+
+    def __init__(self, keys: List[str], factories: Optional[Dict[str, Callable[[str], Any]]] = None,
+                 cooldown: float = LLM_KEY_COOLDOWN, invalid_cooldown: float = LLM_INVALID_KEY_COOLDOWN,
+                 semaphore: asyncio.Semaphore = llm_semaphore):
+        self.keys = list(keys)
+        self.factories = dict(factories or {})
+        self.cooldown = cooldown
+        self.invalid_cooldown = invalid_cooldown
+        self.semaphore = semaphore
+        self.health = {key: KeyHealth(key) for key in self.keys}
+        self._clients: Dict[tuple, Any] = {}
+
+    def register(self, kind: str, factory: Callable[[str], Any]):
+        self.factories[kind] = factory
+
+    def client(self, kind: str, key: str) -> Any:
+        client = self._clients.get((kind, key))
+        if client is None:
+            client = self.factories[kind](key)
+            self._clients[(kind, key)] = client
+        return client
+
+    def pick(self, exclude=()) -> Optional[str]:
+        """The available key with the fewest requests in flight, then the lowest latency."""
+        now = time.monotonic()
+        available = [key for key in self.keys if key not in exclude and self.health[key].available(now)]
+        return min(available, key=lambda k: (
+            self.health[k].in_flight, self.health[k].avg_latency, self.health[k].last_used
+        ), default=None)
+
+    async def call(self, kind: str, fn: Callable[[Any], Awaitable[Any]]) -> Any:
+        last_error = None
+        tried = set()
+        async with self.semaphore:
+            # Keys are chosen only once a slot is free and again after every
+            # failure, so calls queued behind a failing one see its cooldown
+            while (key := self.pick(exclude=tried)) is not None:
+                tried.add(key)
+                health = self.health[key]
+                client = self.client(kind, key)
+                health.in_flight += 1
+                health.last_used = time.monotonic()
+                start = time.perf_counter()
+                try:
+                    result = await fn(client)
+                except Exception as e:
+                    health.record(time.perf_counter() - start, error=True)
+                    last_error = e
+                    error_msg = str(e)
+                    print(f"Gemini key {health.hint} failed: {e}")
+                    if any(term in error_msg for term in QUOTA_ERROR_TERMS):
+                        health.quota_errors += 1
+                        health.cooldown_until = time.monotonic() + _retry_delay(error_msg, self.cooldown)
+                        continue
+                    if _is_invalid_key(e):
+                        health.cooldown_until = time.monotonic() + self.invalid_cooldown
+                        continue
+                    raise
+                finally:
+                    health.in_flight -= 1
+                health.record(time.perf_counter() - start)
+                return result
+        raise KeyPoolExhausted(last_error)
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        return [self.health[key].snapshot(now) for key in self.keys]
+
+def _is_invalid_key(error: Exception) -> bool:
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code in AUTH_ERROR_CODES:
+        return True
+    error_msg = str(error)
+    return any(term in error_msg for term in INVALID_KEY_TERMS) or re.match(r"\s*(401|403)\b", error_msg) is not None
+
+def _retry_delay(error_msg: str, default: float) -> float:
+    # Matches both "retry_delay { seconds: 37 }" and "'retryDelay': '37s'"
+    match = re.search(r"retry_?delay\D{0,20}?(\d+(?:\.\d+)?)", error_msg, re.IGNORECASE)
+    return max(float(match.group(1)), 1.0) if match else default
+
+def _genai_client(key: str):
+    from google import genai
+    return genai.Client(api_key=key)
+
+key_pool = KeyPool(parse_api_keys(os.environ.get("GOOGLE_API_KEY", "")), {"text": _genai_client})
+
+async def generate_text(prompt: str, model: str = GEMINI_MODEL) -> str:
+    """Plain-text Gemini completion through the shared key pool."""
+    response = await key_pool.call(
+        "text", lambda client: client.aio.models.generate_content(model=model, contents=prompt)
+    )
+    return response.text.strip()
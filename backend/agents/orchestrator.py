@@ -3,30 +3,18 @@ from .geospatial import get_environmental_data, Coordinates
 from .clinical import assess_clinical_risk, ClinicalVitals
 from .nutrition import generate_nutrition_advice
 from models import RiskAssessment
-import google.generativeai as genai
-import os
-
-GEMINI_API_KEY_STR = os.environ.get("GOOGLE_API_KEY", "")
-api_keys = [k.strip() for k in GEMINI_API_KEY_STR.split(",") if k.strip()]
-if api_keys:
-    genai.configure(api_key=api_keys[0])
-    model = genai.GenerativeModel('gemini-2.5-flash')
-else:
-    model = None
 
 class MatruKavachOrchestrator:
     def __init__(self):
         pass
 
-    async def assess_mother(self, mother_id: str, name: str, lat: float, lon: float, 
-                            bp_sys: int, bp_dia: int, weight: float, 
-                            hb: float, glucose: int, gest_weeks: int,
-                            extra_symptoms: str = None, temperature_c: float = 30.0,
-                            heat_index: float = 30.0, aqi: float = 50.0, toxins: float = 2.0):
-        
-        from .graph import matrukavach_graph, ClinicalVitals, PlanetaryIntelligence
+    def _initial_state(self, mother_id: str, name: str, bp_sys: int, bp_dia: int, weight: float,
+                       hb: float, glucose: int, gest_weeks: int, extra_symptoms: str = None,
+                       temperature_c: float = 30.0, heat_index: float = 30.0,
+                       aqi: float = 50.0, toxins: float = 2.0):
+        from .graph import ClinicalVitals, PlanetaryIntelligence
 
-        initial_state = {
+        return {
             "mother_id": mother_id,
             "name": name,
             "clinical_vitals": ClinicalVitals(
@@ -46,8 +34,21 @@ class MatruKavachOrchestrator:
             )
         }
 
+    async def assess_mother(self, mother_id: str, name: str, lat: float, lon: float, 
+                            bp_sys: int, bp_dia: int, weight: float, 
+                            hb: float, glucose: int, gest_weeks: int,
+                            extra_symptoms: str = None, temperature_c: float = 30.0,
+                            heat_index: float = 30.0, aqi: float = 50.0, toxins: float = 2.0):
+        
+        from .graph import matrukavach_graph
+
+        initial_state = self._initial_state(
+            mother_id, name, bp_sys, bp_dia, weight, hb, glucose, gest_weeks,
+            extra_symptoms, temperature_c, heat_index, aqi, toxins
+        )
+
         print(f"Executing LangGraph Background Agent for {name}...")
-        final_state = matrukavach_graph.invoke(initial_state)
+        final_state = await matrukavach_graph.ainvoke(initial_state)
         
         return RiskAssessment(
             mother_id=mother_id,
@@ -62,41 +63,43 @@ class MatruKavachOrchestrator:
             timestamp=datetime.now()
         )
 
-    async def generate_chat_summary(self, mother_id: str, messages: list):
-        if not messages:
-            return "No recent chat history found."
-            
-        formatted_messages = []
-        for msg in messages:
-            date_str = msg.timestamp.strftime("%Y-%m-%d %H:%M")
-            sender = "Mother" if msg.sender == "Patient" else msg.sender
-            text = msg.translated_text if msg.translated_text else msg.raw_text
-            formatted_messages.append(f"[{date_str}] {sender}: {text}")
-            
-        chat_log = "\n".join(formatted_messages)
-        
-        prompt = f"""
-        You are an AI assisting a doctor. Please provide a brief, clinical summary of the following chat history from the past two weeks between a pregnant mother and an ASHA worker/bot.
-        Focus on symptoms reported, emergencies, overall tone, and any concerns raised. Keep the summary concise (1-2 paragraphs). Let it be direct.
-        
-        Chat History:
-        {chat_log}
+    def preliminary_assessment(self, mother_id: str, name: str, lat: float, lon: float,
+                               bp_sys: int, bp_dia: int, weight: float,
+                               hb: float, glucose: int, gest_weeks: int,
+                               extra_symptoms: str = None, temperature_c: float = 30.0,
+                               heat_index: float = 30.0, aqi: float = 50.0, toxins: float = 2.0):
         """
-        
-        api_key_str = os.environ.get("GOOGLE_API_KEY", "")
-        api_keys = [k.strip() for k in api_key_str.split(",") if k.strip()]
-        if not api_keys:
-            return "AI model not configured for summary generation (no keys found)."
-            
-        last_error = None
-        for api_key in api_keys:
-            try:
-                genai.configure(api_key=api_key)
-                current_model = genai.GenerativeModel('gemini-2.5-flash')
-                response = current_model.generate_content(prompt)
-                return response.text.strip()
-            except Exception as e:
-                print(f"Summary generation failed for key starting with '{api_key[:8]}': {e}")
-                last_error = e
-                
-        return f"Failed to generate summary due to an AI error: {last_error}"
+        Runs only the deterministic clinical and environmental rules of the graph,
+        without the LLM guidance step. The score, level and flags are identical to
+        what assess_mother produces for the same inputs.
+        """
+        from .graph import environment_flags, apply_environment, risk_level_for
+
+        state = self._initial_state(
+            mother_id, name, bp_sys, bp_dia, weight, hb, glucose, gest_weeks,
+            extra_symptoms, temperature_c, heat_index, aqi, toxins
+        )
+        vitals = state["clinical_vitals"]
+        env = state["planetary_intelligence"]
+
+        clinical = assess_clinical_risk.invoke(vitals.model_dump())
+        env_flags = environment_flags(env)
+        final_score, impact_str = apply_environment(clinical["clinical_risk_score"], env)
+
+        base_advice = generate_nutrition_advice.invoke({
+            "clinical_flags": clinical["flags"] + env_flags,
+            "weather_condition": f"Temp: {env.temperature_c}, AQI: {env.aqi}, Toxins: {env.toxins}"
+        })
+
+        return RiskAssessment(
+            mother_id=mother_id,
+            overall_risk_score=round(final_score, 1),
+            risk_level=risk_level_for(final_score),
+            clinical_flags=clinical["flags"],
+            environmental_flags=env_flags,
+            nutrition_advice={"Preliminary Guidance": base_advice},
+            medication_reminders=[],
+            environmental_impact=impact_str,
+            clinical_justification=None,
+            timestamp=datetime.now()
+        )
@@ -0,0 +1,178 @@
+import numpy as np
+from enum import IntFlag
+from typing import Dict, List, Optional, Sequence
+
+class FlagBit(IntFlag):
+    """Bit positions of the per-mother flag mask. Values are stable; only append new flags."""
+    HYPERTENSION = 1 << 0
+    SEVERE_HYPERTENSION = 1 << 1
+    ANEMIA = 1 << 2
+    SEVERE_ANEMIA = 1 << 3
+    ELEVATED_GLUCOSE = 1 << 4
+    GESTATIONAL_DIABETES = 1 << 5
+    REPORTED_SYMPTOMS = 1 << 6
+    EXTREME_HEAT = 1 << 7
+    HIGH_PM25 = 1 << 8
+    HIGH_TOXINS = 1 << 9
+
+MASK_BITS = {
+    "hypertension": FlagBit.HYPERTENSION,
+    "severe_hypertension": FlagBit.SEVERE_HYPERTENSION,
+    "anemia": FlagBit.ANEMIA,
+    "severe_anemia": FlagBit.SEVERE_ANEMIA,
+    "elevated_glucose": FlagBit.ELEVATED_GLUCOSE,
+    "gestational_diabetes": FlagBit.GESTATIONAL_DIABETES,
+    "symptoms": FlagBit.REPORTED_SYMPTOMS,
+    "extreme_heat": FlagBit.EXTREME_HEAT,
+    "high_pm25": FlagBit.HIGH_PM25,
+    "high_toxins": FlagBit.HIGH_TOXINS,
+}
+
+# Leading text of the flag strings stored on RiskAssessment, which may carry
+# a trailing value, e.g. "Extreme Heat Index (43.2°C)"
+FLAG_LABELS = {
+    "Hypertension Level 1": FlagBit.HYPERTENSION,
+    "Severe Hypertension": FlagBit.SEVERE_HYPERTENSION,
+    "Anemia Detected": FlagBit.ANEMIA,
+    "Severe Anemia": FlagBit.SEVERE_ANEMIA,
+    "Elevated Blood Glucose": FlagBit.ELEVATED_GLUCOSE,
+    "Possible Gestational Diabetes": FlagBit.GESTATIONAL_DIABETES,
+    "Reported Symptoms": FlagBit.REPORTED_SYMPTOMS,
+    "Extreme Heat Index": FlagBit.EXTREME_HEAT,
+    "High PM2.5 Levels": FlagBit.HIGH_PM25,
+    "High Chemical/Toxin Exposure": FlagBit.HIGH_TOXINS,
+}
+
+def flag_bit(label: str) -> Optional[FlagBit]:
+    """Maps a stored flag string back to its FlagBit; None for text from other sources."""
+    for prefix, bit in FLAG_LABELS.items():
+        if label.startswith(prefix):
+            return bit
+    return None
+
+RISK_LEVELS = np.array(["LOW", "MODERATE", "HIGH", "CRITICAL"], dtype=object)
+
+def score_population(systolic_bp: Sequence[float], diastolic_bp: Sequence[float],
+                     hemoglobin: Sequence[float], glucose: Sequence[float],
+                     heat_index: Sequence[float], aqi: Sequence[float], toxins: Sequence[float],
+                     extra_symptoms: Sequence[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized form of assess_clinical_risk plus the environment multiplier and
+    risk levels from the assessment graph. Every threshold and increment matches
+    the per-record rules, so scores are bit-for-bit identical to a graph run.
+
+    Returns arrays aligned with the inputs: clinical_score, multiplier,
+    final_score, level_index/risk_level and a FlagBit mask per record.
+    """
+    systolic_bp = np.asarray(systolic_bp, dtype=np.float64)
+    diastolic_bp = np.asarray(diastolic_bp, dtype=np.float64)
+    hemoglobin = np.asarray(hemoglobin, dtype=np.float64)
+    glucose = np.asarray(glucose, dtype=np.float64)
+    heat_index = np.asarray(heat_index, dtype=np.float64)
+    aqi = np.asarray(aqi, dtype=np.float64)
+    toxins = np.asarray(toxins, dtype=np.float64)
+    if extra_symptoms is None:
+        has_symptoms = np.zeros(systolic_bp.shape, dtype=bool)
+    else:
+        has_symptoms = np.array([bool(s and s.strip()) for s in extra_symptoms], dtype=bool)
+
+    masks = {
+        "hypertension": (systolic_bp >= 140) | (diastolic_bp >= 90),
+        "severe_hypertension": (systolic_bp >= 160) | (diastolic_bp >= 110),
+        "anemia": hemoglobin < 11.0,
+        "severe_anemia": hemoglobin < 7.0,
+        "elevated_glucose": glucose > 140,
+        "gestational_diabetes": glucose > 200,
+        "symptoms": has_symptoms,
+        "extreme_heat": heat_index > 40,
+        "high_pm25": aqi > 150,
+        "high_toxins": toxins > 6.0,
+    }
+
+    clinical_score = np.ones(systolic_bp.shape, dtype=np.float64)
+    clinical_score += np.where(masks["hypertension"], 3.0, 0.0)
+    clinical_score += np.where(masks["severe_hypertension"], 5.0, 0.0)
+    clinical_score += np.where(masks["anemia"], 2.0, 0.0)
+    clinical_score += np.where(masks["severe_anemia"], 4.0, 0.0)
+    clinical_score += np.where(masks["elevated_glucose"], 2.0, 0.0)
+    clinical_score += np.where(masks["gestational_diabetes"], 4.0, 0.0)
+    clinical_score += np.where(masks["symptoms"], 1.5, 0.0)
+    clinical_score = np.minimum(clinical_score, 10.0)
+
+    # Same addition order as environment_multiplier so the float result is identical
+    multiplier = np.ones(systolic_bp.shape, dtype=np.float64)
+    multiplier += np.where(masks["extreme_heat"], 0.3, 0.0)
+    multiplier += np.where(masks["high_pm25"], 0.2, 0.0)
+    multiplier += np.where(masks["high_toxins"], 0.2, 0.0)
+    final_score = np.minimum(clinical_score * multiplier, 10.0)
+
+    # Index into RISK_LEVELS; same thresholds as risk_level_for
+    level_index = (
+        (final_score >= 4.0).astype(np.int8)
+        + (final_score >= 7.0).astype(np.int8)
+        + (final_score >= 9.0).astype(np.int8)
+    )
+
+    flags = np.zeros(systolic_bp.shape, dtype=np.uint16)
+    for key, bit in MASK_BITS.items():
+        flags |= np.where(masks[key], np.uint16(bit), np.uint16(0))
+
+    return {
+        "clinical_score": clinical_score,
+        "multiplier": multiplier,
+        "final_score": final_score,
+        "level_index": level_index,
+        "risk_level": RISK_LEVELS[level_index],
+        "flags": flags,
+        "masks": masks,
+    }
+
+def flag_names(mask: int) -> List[str]:
+    """Decodes a flag mask into FlagBit names, e.g. ["ANEMIA", "EXTREME_HEAT"]."""
+    return [bit.name for bit in FlagBit if mask & bit]
+
+def clinical_flag_lists(result: Dict[str, np.ndarray], extra_symptoms: Sequence[str] = None) -> List[List[str]]:
+    """Rebuilds the per-record clinical flag strings, in assess_clinical_risk order."""
+    masks = result["masks"]
+    labels = [
+        ("hypertension", "Hypertension Level 1"),
+        ("severe_hypertension", "Severe Hypertension (Preeclampsia Risk)"),
+        ("anemia", "Anemia Detected"),
+        ("severe_anemia", "Severe Anemia"),
+        ("elevated_glucose", "Elevated Blood Glucose"),
+        ("gestational_diabetes", "Possible Gestational Diabetes"),
+    ]
+    flags = [[] for _ in range(len(result["final_score"]))]
+    for key, label in labels:
+        for i in np.flatnonzero(masks[key]):
+            flags[i].append(label)
+    for i in np.flatnonzero(masks["symptoms"]):
+        flags[i].append(f"Reported Symptoms: {extra_symptoms[i]}")
+    return flags
+
+def environmental_flag_lists(result: Dict[str, np.ndarray], heat_index: Sequence[float],
+                             aqi: Sequence[float], toxins: Sequence[float]) -> List[List[str]]:
+    """Rebuilds the per-record environmental flag strings, in graph order."""
+    masks = result["masks"]
+    flags = [[] for _ in range(len(result["final_score"]))]
+    for i in np.flatnonzero(masks["extreme_heat"]):
+        flags[i].append(f"Extreme Heat Index ({heat_index[i]:.1f}°C)")
+    for i in np.flatnonzero(masks["high_pm25"]):
+        flags[i].append(f"High PM2.5 Levels ({aqi[i]:.1f})")
+    for i in np.flatnonzero(masks["high_toxins"]):
+        flags[i].append(f"High Chemical/Toxin Exposure ({toxins[i]:.1f}/10)")
+    return flags
+
+def environmental_impact_strings(result: Dict[str, np.ndarray], heat_index: Sequence[float],
+                                 aqi: Sequence[float]) -> List[str]:
+    """Rebuilds the "Score increased by ..." explanation produced by apply_environment."""
+    masks = result["masks"]
+    extra = result["final_score"] - result["clinical_score"]
+    impacts = [""] * len(extra)
+    for i in np.flatnonzero(extra > 0):
+        reasons = []
+        if masks["extreme_heat"][i]: reasons.append(f"{heat_index[i]:.1f}°C Heatwave")
+        if masks["high_pm25"][i]: reasons.append(f"{aqi[i]:.1f} AQI")
+        if masks["high_toxins"][i]: reasons.append("high chemical exposure")
+        impacts[i] = f"Score increased by +{extra[i]:.1f} due to {' and '.join(reasons)}."
+    return impacts
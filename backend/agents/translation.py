@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import List, Optional
+from services.cache import TTLCache, SQLiteStore
+from .llm import key_pool, generate_text
+
+TRANSLATION_CACHE_TTL = int(os.environ.get("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", "2048"))
+TRANSLATION_CACHE_DISK_SIZE = int(os.environ.get("TRANSLATION_CACHE_DISK_SIZE", "50000"))
+TRANSLATION_CACHE_PATH = os.environ.get("TRANSLATION_CACHE_PATH", "data/llm_cache.db")
+
+LANGUAGE_NAMES = {"en": "English", "hi": "Hindi", "mr": "Marathi"}
+
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+LATIN_WORD = re.compile(r"[a-z]+")
+PLACEHOLDER = re.compile(r"\{[a-z_]+\}")
+
+# Frequent romanized Hindi/Marathi words; any of them marks Latin text as Hinglish
+ROMANIZED_MARKERS = frozenset("""
+hai hain nahi nahin mujhe mera meri mere mai hum aap kya kyu kaise bahut bohot
+ho raha rahi rahe tha thi dard pet sir khoon ulti chakkar bukhar dast kamzori
+ji haan accha acha theek thik kal aaj abhi karo kar hoga hogi gaya gayi lag lagta
+aahe ahe mala majha majhi khup nako kay ka ki ke se ko
+""".split())
+
+def is_english(text: str) -> bool:
+    """
+    Cheap script check used to skip the LLM: Devanagari means Hindi/Marathi,
+    and Latin text counts as English unless it contains romanized Hindi or
+    Marathi words. Text without letters (numbers, emoji) needs no translation.
+    """
+    if DEVANAGARI.search(text):
+        return False
+    words = LATIN_WORD.findall(text.lower())
+    return not any(word in ROMANIZED_MARKERS for word in words)
+
+def _normalize(text: str) -> str:
+    return "\n".join(" ".join(line.split()) for line in text.strip().splitlines())
+
+class Translator:
+    """
+    Translation through Gemini with a two-tier cache (in-process TTL/LRU in
+    front of SQLite) keyed by (text, target language).
+
+    translate() takes a list of segments, answers cached ones locally and
+    sends the rest in a single JSON-list prompt, so a templated message costs
+    at most one LLM call and its boilerplate lines are cached across mothers.
+    Segments may carry {placeholders}, which are kept verbatim so callers can
+    fill per-mother values after translation.
+    """
+
+    def __init__(self, path: str = TRANSLATION_CACHE_PATH, ttl: int = TRANSLATION_CACHE_TTL,
+                 maxsize: int = TRANSLATION_CACHE_SIZE, disk_maxsize: int = TRANSLATION_CACHE_DISK_SIZE):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteStore(path, table="translation_cache", maxsize=disk_maxsize)
+        self.skipped = 0
+        self.llm_calls = 0
+        self.llm_segments = 0
+
+    @staticmethod
+    def _key(text: str, target: str) -> str:
+        return hashlib.sha256(f"{target}\x00{text}".encode()).hexdigest()
+
+    async def _cached(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    async def _store(self, key: str, value: str):
+        self.memory.set(key, value)
+        await asyncio.to_thread(self.disk.set, key, value, self.ttl)
+
+    async def translate(self, segments: List[str], target_lang: str) -> Optional[List[str]]:
+        """
+        Translates each segment into target_lang. Returns None when the LLM is
+        unavailable or its answer is unusable, so callers can fall back.
+        """
+        target = LANGUAGE_NAMES.get(target_lang, "English")
+        segments = [_normalize(s) for s in segments]
+        results: List[Optional[str]] = [None] * len(segments)
+        missing = {}
+        for i, segment in enumerate(segments):
+            if not segment or (target == "English" and is_english(segment)):
+                results[i] = segment
+                self.skipped += 1
+                continue
+            cached = await self._cached(self._key(segment, target))
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.setdefault(segment, []).append(i)
+
+        if missing:
+            if not key_pool.keys:
+                return None
+            sources = list(missing)
+            try:
+                translated = await self._call_llm(sources, target)
+            except Exception as e:
+                print(f"Gemini Translation error: {e}")
+                return None
+            for source, text in zip(sources, translated):
+                if sorted(PLACEHOLDER.findall(text)) != sorted(PLACEHOLDER.findall(source)):
+                    text = source  # a mangled template is worse than an untranslated one
+                else:
+                    await self._store(self._key(source, target), text)
+                for i in missing[source]:
+                    results[i] = text
+        return results
+
+    async def _call_llm(self, sources: List[str], target: str) -> List[str]:
+        self.llm_calls += 1
+        self.llm_segments += len(sources)
+        if target == "English":
+            instruction = "Translate each of the following patient messages to English."
+        else:
+            instruction = (f"Translate each of the following medical messages from a doctor to {target}, "
+                           "using an empathetic and conversational tone.")
+        prompt = (
+            f"{instruction} Keep anything in curly braces such as {{name}} exactly as it is. "
+            f"The input is a JSON list of {len(sources)} strings. ONLY output a JSON list of the "
+            f"{len(sources)} translated strings in the same order.\n\n{json.dumps(sources, ensure_ascii=False)}"
+        )
+        raw = await generate_text(prompt)
+        raw = raw.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+        translated = json.loads(raw)
+        if not isinstance(translated, list) or len(translated) != len(sources):
+            raise ValueError(f"expected {len(sources)} translations, got {raw[:200]}")
+        return [str(t).strip() for t in translated]
+
+    def stats(self) -> dict:
+        return {
+            "memory": self.memory.stats(),
+            "disk_size": len(self.disk),
+            "skipped_english": self.skipped,
+            "llm_calls": self.llm_calls,
+            "llm_segments": self.llm_segments,
+        }
+
+translator = Translator()
@@ -0,0 +1,120 @@
+import re
+import unicodedata
+from typing import Dict, List, NamedTuple
+
+# Severity tiers, highest first. RED alerts the care team immediately; YELLOW
+# is highlighted for the next review.
+PRIORITIES = ("RED", "YELLOW", "GREEN")
+
+# Latin-script terms (English and romanized Hindi/Marathi) are regex fragments
+# matched as whole words, so suffixes must be spelled out.
+LATIN_TERMS = {
+    "RED": [
+        r"blood(?! (?:pressure|test|report|sugar|group|count))", r"bleed(?:s|ing)?", r"bled", r"khoon", r"khun",
+        r"severe (?:pain|headache|bleeding)", r"unbearable pain", r"bahut (?:tez )?dard", r"tez dard",
+        r"faint(?:ed|ing|s)?", r"unconscious", r"behosh", r"chakkar",
+        r"contractions?", r"labou?r pains?",
+        r"water (?:broke|break(?:ing)?|leak(?:ing)?)", r"pani (?:gir|nikal|toot|tut|beh|aa)\w*",
+        r"emergency", r"having fits", r"getting fits", r"fits? (?:aa|aaye|aya|aate)\w*", r"seizures?", r"convulsions?", r"jhatke",
+        r"blurr?(?:ed|y) vision", r"can'?t breathe", r"breathless(?:ness)?", r"saans (?:nahi|phool)\w*",
+        r"baby (?:not|isn'?t|is not) moving", r"no (?:fetal|baby) movement", r"hal ?chal (?:nahi|kam|band)",
+        r"diarrho?ea", r"loose motions?", r"dast",
+        r"headaches?", r"sir ?dard", r"sar ?dard",
+        r"vomit(?:ing|s|ed)?", r"ulti(?:yan|yaan)?",
+    ],
+    "YELLOW": [
+        r"pain(?:ful|s)?", r"dard", r"dukh\w*",
+        r"fever(?:ish)?", r"bukhar", r"taap",
+        r"swelling", r"swollen", r"sujan",
+        r"dizz(?:y|iness)", r"weak(?:ness)?", r"kamzori", r"thakan", r"tired(?:ness)?",
+        r"nause(?:a|ous)", r"ji machal\w*",
+        r"burning urine", r"jalan", r"itching", r"khujli",
+        r"cough(?:ing)?", r"khansi",
+    ],
+}
+
+# Devanagari stems match at the start of a word with any ending, which covers
+# inflections such as उल्टी/उल्टियां or दर्द/दर्दनाक. Stems listed in
+# DEVANAGARI_WHOLE_WORDS must end the word instead.
+DEVANAGARI_TERMS = {
+    "RED": [
+        "खून", "रक्तस्राव", "रक्तस्त्राव", "रक्त जा", "ब्लीडिंग",
+        "तेज दर्द", "बहुत दर्द", "असहनीय",
+        "बेहोश", "चक्कर", "बेशुद्ध",
+        "पानी गिर", "पानी निकल", "पानी टूट", "पाणी गेल",
+        "संकुचन", "प्रसव पीड़ा", "प्रसूती कळा",
+        "दौरा", "दौरे", "झटके", "आकडी",
+        "धुंधला", "अंधुक", "सांस नहीं", "सांस फूल", "श्वास घेण्यास त्रास",
+        "हलचल कम", "हलचल नहीं", "हालचाल कमी", "हालचाल नाही",
+        "दस्त", "जुलाब", "सिरदर्द", "सिर दर्द", "सर दर्द", "डोकेदुखी", "डोकं दुख", "डोके दुख", "डोक्यात दुख",
+        "उल्टी", "उल्टियां", "उल्टियाँ", "उलटी", "उलट्या", "इमरजेंसी", "आपातकाल",
+    ],
+    "YELLOW": [
+        "दर्द", "दुख", "बुखार", "ताप", "तापा", "सूजन", "सूज", "कमजोरी", "अशक्तपणा", "थकान", "थकवा",
+        "जी मिचल", "मळमळ", "जलन", "खुजली", "खांसी", "खोकला",
+    ],
+}
+
+# "ताप" (fever) is also the start of "तापमान" (temperature); its inflected
+# forms are matched through the "तापा" stem instead (तापाने, तापामुळे)
+DEVANAGARI_WHOLE_WORDS = {"ताप"}
+
+# \w alone misses Devanagari vowel signs and the virama, so the whole block counts as word characters
+WORD_CHARS = r"\wऀ-ॿ"
+
+def _alternatives(tier: str) -> List[str]:
+    latin = [term.replace(" ", r"\s+") + f"(?![{WORD_CHARS}])" for term in LATIN_TERMS[tier]]
+    devanagari = [
+        re.escape(unicodedata.normalize("NFC", term)).replace(r"\ ", r"\s+")
+        + (f"(?![{WORD_CHARS}])" if term in DEVANAGARI_WHOLE_WORDS else "")
+        for term in sorted(DEVANAGARI_TERMS[tier], key=len, reverse=True)
+    ]
+    return latin + devanagari
+
+def _compile(alternatives: List[str]) -> re.Pattern:
+    """
+    Factors the alternatives by their first character, trie-style, so the
+    engine tests one branch per position instead of every term, and the
+    pattern starts with literals the engine can use to skip ahead.
+    """
+    by_first: Dict[str, List[str]] = {}
+    for alternative in alternatives:
+        by_first.setdefault(alternative[0], []).append(alternative[1:])
+    return re.compile("|".join(f"{first}(?:{'|'.join(rests)})" for first, rests in by_first.items()))
+
+# RED alternatives come first so they win where tiers overlap ("bahut dard" over "dard")
+TRIAGE_PATTERN = _compile(_alternatives("RED") + _alternatives("YELLOW"))
+RED_PATTERN = re.compile("|".join(_alternatives("RED")))
+WORD_CHAR = re.compile(f"[{WORD_CHARS}]")
+
+class TriageResult(NamedTuple):
+    priority: str
+    matches: List[str]
+
+    @property
+    def is_urgent(self) -> bool:
+        return self.priority == "RED"
+
+def triage(text: str) -> TriageResult:
+    """
+    Classifies a patient message into RED/YELLOW/GREEN from danger-sign terms in
+    English, romanized Hindi/Marathi and Devanagari, in one regex pass over the
+    raw text. It needs no translation, so emergencies can be raised before any
+    LLM call.
+    """
+    if not text:
+        return TriageResult("GREEN", [])
+    text = unicodedata.normalize("NFC", text).lower()
+    matches = []
+    best = len(PRIORITIES) - 1
+    for match in TRIAGE_PATTERN.finditer(text):
+        start = match.start()
+        if start and WORD_CHAR.match(text, start - 1):
+            continue
+        term = match.group()
+        matches.append(term)
+        best = min(best, 0 if RED_PATTERN.fullmatch(term) else 1)
+    return TriageResult(PRIORITIES[best], matches)
+
+def higher_priority(a: str, b: str) -> str:
+    return a if PRIORITIES.index(a) <= PRIORITIES.index(b) else b
@@ -0,0 +1,74 @@
+import random
+import time
+from agents.triage import triage
+
+# Keyword loop the webhook used before agents/triage.py
+LEGACY_KEYWORDS = [
+    "blood", "bleeding", "khoon", "severe pain", "dard", "faint", "chakkar",
+    "contractions", "pani", "water broke", "emergency", "diarrhoea", "diarrhea",
+    "loose motion", "dast", "headache", "vomiting", "sir dard", "ulti", "sar dard"
+]
+
+def legacy_triage(raw_text: str, translated_text: str) -> str:
+    for kw in LEGACY_KEYWORDS:
+        if kw in translated_text.lower() or kw in raw_text.lower():
+            return "RED"
+    return "GREEN"
+
+# (message, expected priority)
+CORPUS = [
+    ("I have bleeding since morning", "RED"),
+    ("mujhe khoon aa raha hai", "RED"),
+    ("मुझे खून आ रहा है", "RED"),
+    ("mala chakkar yet aahe", "RED"),
+    ("पानी गिर गया है अस्पताल जाना है", "RED"),
+    ("baby is not moving since yesterday", "RED"),
+    ("उल्टियां हो रही हैं", "RED"),
+    ("severe headache and blurred vision", "RED"),
+    ("pet mein halka dard hai", "YELLOW"),
+    ("fever since yesterday night", "YELLOW"),
+    ("पैरों में सूजन है", "YELLOW"),
+    ("कल से ताप है", "YELLOW"),
+    ("मला तापाने त्रास होतो", "YELLOW"),
+    ("feeling very weak today", "YELLOW"),
+    ("my blood pressure reading was 118/76", "GREEN"),
+    ("Thank you doctor, I took the iron tablets", "GREEN"),
+    ("pani pi rahi hu, sab theek hai", "GREEN"),
+    ("रक्तचाप सामान्य है", "GREEN"),
+    ("आज तापमान बहुत ज्यादा है", "GREEN"),
+    ("Can I eat papaya?", "GREEN"),
+    ("When is my next visit?", "GREEN"),
+    ("mi aata bari aahe", "GREEN"),
+    ("I walked for twenty minutes today", "GREEN"),
+]
+
+def main(total: int = 100_000):
+    random.seed(7)
+    messages = [random.choice(CORPUS) for _ in range(total)]
+
+    print("--- Accuracy on the labelled corpus ---")
+    wrong = [(text, expected, triage(text).priority) for text, expected in CORPUS if triage(text).priority != expected]
+    print(f"{len(CORPUS) - len(wrong)}/{len(CORPUS)} correct")
+    for text, expected, got in wrong:
+        print(f"  {text!r}: expected {expected}, got {got}")
+    legacy_red = [text for text, expected in CORPUS if legacy_triage(text, text) == "RED" and expected != "RED"]
+    legacy_missed = [text for text, expected in CORPUS if legacy_triage(text, text) != "RED" and expected == "RED"]
+    print(f"Legacy loop: {len(legacy_red)} false RED, {len(legacy_missed)} missed RED (without translation)")
+
+    print(f"--- Throughput over {total} messages ---")
+    start = time.perf_counter()
+    for text, _ in messages:
+        legacy_triage(text, text)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text, _ in messages:
+        triage(text)
+    engine = time.perf_counter() - start
+
+    print(f"Legacy keyword loop: {legacy * 1e6 / total:.2f} µs/message")
+    print(f"Triage engine:       {engine * 1e6 / total:.2f} µs/message")
+    print("Either is far below a Gemini translation round trip (~1 s), which RED alerts no longer wait for.")
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,157 @@
 import os
+import time
+import threading
 from dotenv import load_dotenv
+from sqlalchemy import event, inspect
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 from sqlmodel import create_engine, SQLModel, Session
 
 load_dotenv()
 
+# Engine defaults per deployment profile; any value can be overridden with its own env var.
+ENGINE_PROFILES = {
+    "development": {"echo": True, "pool_size": 5, "max_overflow": 5, "pool_timeout": 30, "pool_recycle": 1800},
+    "production": {"echo": False, "pool_size": 10, "max_overflow": 20, "pool_timeout": 10, "pool_recycle": 300},
+}
+
+APP_ENV = os.getenv("APP_ENV", "development").lower()
+profile = ENGINE_PROFILES.get(APP_ENV, ENGINE_PROFILES["development"])
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+DB_ECHO = os.getenv("DB_ECHO", str(profile["echo"])).lower() in ("1", "true", "yes")
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", profile["pool_size"])
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", profile["max_overflow"])
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", profile["pool_timeout"])
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", profile["pool_recycle"])
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+class PoolMetrics:
+    """Tracks how long requests wait to check a connection out of the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+pool_metrics = PoolMetrics()
+
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record(time.perf_counter() - start)
+        return conn
+
 database_url = os.getenv("DATABASE_URL")
 
+pool_args = {
+    "poolclass": TimedQueuePool,
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+}
+
 if database_url:
     # Use PostgreSQL if DATABASE_URL is provided (e.g. Neon or Supabase)
     # If the URL starts with postgres://, replace it with postgresql:// for SQLAlchemy compatibility
     if database_url.startswith("postgres://"):
         database_url = database_url.replace("postgres://", "postgresql://", 1)
-    engine = create_engine(database_url, echo=True)
+    # Serverless Postgres drops idle connections, so validate on checkout and recycle before the provider does
+    engine = create_engine(database_url, echo=DB_ECHO, pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE, **pool_args)
 else:
     # Fallback to local SQLite
     sqlite_file_name = "data/matrukavach.db"
     sqlite_url = f"sqlite:///{sqlite_file_name}"
-    connect_args = {"check_same_thread": False}
-    engine = create_engine(sqlite_url, echo=True, connect_args=connect_args)
+    connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    engine = create_engine(sqlite_url, echo=DB_ECHO, connect_args=connect_args, **pool_args)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets dashboard reads proceed while an assessment or chat message is being written
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    return {
+        "profile": APP_ENV,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **pool_metrics.snapshot(),
+    }
 
 def create_db_and_tables():
-    import models 
+    import models
     SQLModel.metadata.create_all(engine)
+    ensure_columns()
+    ensure_indexes()
+
+def ensure_columns():
+    """
+    create_all never alters existing tables, so a column added to a model later
+    is missing from older databases. This adds any column that is nullable or
+    has a server default; other NOT NULL columns are left to migrate_db.py.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            if not column.nullable and column.server_default is None:
+                print(f"Cannot add required column {table.name}.{column.name}; run migrate_db.py")
+                continue
+            definition = CreateColumn(column).compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN {definition}')
+
+def ensure_indexes():
+    """
+    create_all only builds indexes for tables it creates, so databases created
+    before an index was declared in models.py never get it. This creates any
+    declared index that is missing, leaving existing ones untouched.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                print(f"Could not create index {index.name}: {e}. Run migrate_db.py to repair existing data.")
 
 def get_session():
     with Session(engine) as session:
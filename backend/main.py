@@ -1,34 +1,53 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, Depends, HTTPException, File, UploadFile
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, Query, Request, Response, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import Session, select, SQLModel
+from sqlalchemy import or_, and_, tuple_
 from typing import List, Annotated, Optional
 import json
-import requests
 
-from database import create_db_and_tables, get_session
-from models import MotherProfile, AssessmentData, RiskAssessment, VitalsInput, ChatMessage, Consultation, Document, Doctor, AshaWorker
+from database import create_db_and_tables, get_session, pool_stats
+from models import MotherProfile, AssessmentData, RiskAssessment, VitalsInput, ChatMessage, Consultation, Doctor, AshaWorker, LatestRisk, RiskFlag
 from agents.orchestrator import MatruKavachOrchestrator
+from agents.guidance_cache import guidance_cache
+from agents.llm import key_pool
+from agents.translation import translator
+from services.telegram_client import telegram_client
+from services.voice import voice_pipeline
+from services.assessments import orchestrator_kwargs, persist_assessment, with_stored_environment
+from services.jobs import AssessmentJobQueue
+from services.batch import BATCH_MAX_RECORDS, parse_vitals_csv, assess_batch
+from services.rescoring import latest_vitals, rescore
+from services.environment import env_service
+from services.env_prefetch import env_prefetcher
+from services.chat_summary import chat_summaries
+from services.documents import document_store
+from services.flags import flag_query, flag_counts, forget_flags
+from services.latest_risk import backfill as backfill_latest_risk, forget_assessment, mark_read, WORKLIST_ORDER, worklist_position
+from services.registry import ensure_search_index, mother_query, parse_fields
+from services.admin_stats import admin_stats, admin_stats_cache, workloads
+from services.pagination import NEXT_CURSOR_HEADER, CURSOR_NUMBER, encode_cursor, decode_cursor, parse_cursor_datetime, etag_response
 import socketio
 import os
-import shutil
 from fastapi import File, UploadFile, Form
 from datetime import datetime, timedelta
 
 from socket_instance import sio
-from routers import telegram_bot
+from routers import telegram_bot, environment, documents
 
 create_db_and_tables()
+ensure_search_index()
+backfill_latest_risk()
 
 app = FastAPI(title="MatruKavach AI API", version="1.0.0")
 
 socket_app = socketio.ASGIApp(sio, app)
 
 app.include_router(telegram_bot.router)
+app.include_router(environment.router)
+app.include_router(documents.router)
 
 # Read CORS origins from environment variable, fallback to localhost:3000
 origins_env = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000")
@@ -40,14 +59,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Content-Range", "Accept-Ranges"],
 )
 
 orchestrator = MatruKavachOrchestrator()
+assessment_jobs = AssessmentJobQueue(orchestrator)
 SessionDep = Annotated[Session, Depends(get_session)]
 
-import os
-os.makedirs("data/uploads", exist_ok=True)
-app.mount("/uploads", StaticFiles(directory="data/uploads"), name="uploads")
+@app.on_event("startup")
+async def start_background_workers():
+    assessment_jobs.start()
+    env_prefetcher.start()
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await assessment_jobs.stop()
+    await env_prefetcher.stop()
+    await env_service.close()
+    await telegram_client.close()
 
 @app.get("/")
 def read_root():
@@ -57,32 +86,41 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
+@app.get("/health/db")
+def database_health():
+    return pool_stats()
+
+@app.get("/health/guidance_cache")
+def guidance_cache_health():
+    return guidance_cache.stats()
+
+@app.get("/health/translation")
+def translation_health():
+    return translator.stats()
+
+@app.get("/health/voice")
+def voice_health():
+    return voice_pipeline.stats()
+
+@app.get("/health/llm")
+def llm_health():
+    return {"keys": key_pool.stats()}
+
+@app.get("/health/summaries")
+def summaries_health():
+    return chat_summaries.stats()
+
+@app.get("/health/documents")
+def documents_health():
+    return document_store.stats()
+
 @app.get("/env_data")
-def get_env_data(lat: float, lon: float):
-    try:
-        weather_res = requests.get(f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,apparent_temperature,weather_code")
-        weather_data = weather_res.json()
-        temp = weather_data.get("current", {}).get("temperature_2m", 30)
-        heat_index = weather_data.get("current", {}).get("apparent_temperature", temp)
-        
-        aqi_res = requests.get(f"https://air-quality-api.open-meteo.com/v1/air-quality?latitude={lat}&longitude={lon}&current=us_aqi,pm2_5")
-        aqi_data = aqi_res.json()
-        aqi = aqi_data.get("current", {}).get("pm2_5", 50)
+async def get_env_data(lat: float, lon: float):
+    return await env_service.get(lat, lon)
 
-        toxin = min(round(aqi * 0.05, 1), 10.0) 
-        
-        return {
-            "temperature_c": temp,
-            "heat_index": heat_index,
-            "aqi_pm25": aqi,
-            "chemical_exposure": toxin,
-            "weather_condition": "Clear or fetched"
-        }
-    except Exception as e:
-        print(f"Error fetching open-meteo: {e}")
-        return {
-            "temperature_c": 32.0, "heat_index": 34.0, "aqi_pm25": 120, "chemical_exposure": 4.5, "weather_condition": "Unknown"
-        }
+@app.get("/env_data/stats")
+def get_env_data_stats():
+    return env_service.stats()
 
 @app.post("/assess", response_model=RiskAssessment)
 async def assess_risk(vitals: VitalsInput, session: SessionDep):
@@ -91,58 +129,95 @@ async def assess_risk(vitals: VitalsInput, session: SessionDep):
     if not mother:
         raise HTTPException(status_code=404, detail="Mother not found")
 
-    result = await orchestrator.assess_mother(
-        mother_id=mother.id,
-        name=mother.name,
-        lat=mother.latitude,
-        lon=mother.longitude,
-        bp_sys=vitals.systolic_bp,
-        bp_dia=vitals.diastolic_bp,
-        weight=vitals.weight_kg,
-        hb=vitals.hemoglobin,
-        glucose=vitals.glucose,
-        gest_weeks=mother.gestational_age_weeks,
-        extra_symptoms=vitals.extra_symptoms,
-        temperature_c=vitals.temperature_c,
-        heat_index=vitals.heat_index,
-        aqi=vitals.aqi,
-        toxins=vitals.chemical_exposure
-    )
-
-    assessment_data = AssessmentData(
-        mother_id=mother.id,
-        systolic_bp=vitals.systolic_bp,
-        diastolic_bp=vitals.diastolic_bp,
-        weight_kg=vitals.weight_kg,
-        hemoglobin=vitals.hemoglobin,
-        glucose=vitals.glucose,
-        heart_rate=vitals.heart_rate,
-        timestamp=result.timestamp
-    )
-    session.add(assessment_data)
-    session.commit()
-    session.refresh(assessment_data)
-
-    result_db = RiskAssessment(
-        assessment_data_id=assessment_data.id,
-        mother_id=mother.id,
-        overall_risk_score=result.overall_risk_score,
-        risk_level=result.risk_level,
-        clinical_flags=json.dumps(result.clinical_flags),
-        environmental_flags=json.dumps(result.environmental_flags),
-        nutrition_advice=json.dumps(result.nutrition_advice),
-        medication_reminders=json.dumps(result.medication_reminders),
-        timestamp=result.timestamp
-    )
-    session.add(result_db)
-    session.commit()
-    session.refresh(result_db)
-
-    return result_db
+    vitals = with_stored_environment(session, mother, vitals)
+    result = await orchestrator.assess_mother(**orchestrator_kwargs(mother, vitals))
+    return persist_assessment(session, mother, vitals, result)
+
+@app.post("/assess/jobs", status_code=202)
+async def submit_assessment_job(vitals: VitalsInput, session: SessionDep):
+    """
+    Scores the vitals with the deterministic clinical and environmental rules,
+    stores the result and queues the LLM guidance step. Poll
+    /assess/jobs/{job_id} or listen for the "assessment_complete" event.
+    """
+    mother = session.get(MotherProfile, vitals.mother_id)
+    if not mother:
+        raise HTTPException(status_code=404, detail="Mother not found")
 
-@app.get("/mothers", response_model=List[MotherProfile])
-def get_mothers(session: SessionDep):
-    return session.exec(select(MotherProfile)).all()
+    vitals = with_stored_environment(session, mother, vitals)
+    params = orchestrator_kwargs(mother, vitals)
+    preliminary = orchestrator.preliminary_assessment(**params)
+    risk = persist_assessment(session, mother, vitals, preliminary)
+    job = assessment_jobs.submit(risk.id, mother.id, params)
+    return {"job": job, "risk": risk}
+
+@app.get("/assess/jobs/{job_id}")
+def get_assessment_job(job_id: str, session: SessionDep):
+    job = assessment_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Assessment job not found or expired")
+    return {"job": job, "risk": session.get(RiskAssessment, job.risk_assessment_id)}
+
+class BatchVitalsInput(SQLModel):
+    records: List[VitalsInput]
+    generate_guidance: bool = True
+
+def _check_batch_size(count: int):
+    if count > BATCH_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_RECORDS} records")
+
+@app.post("/assess/batch")
+async def assess_vitals_batch(batch: BatchVitalsInput, session: SessionDep):
+    """
+    Scores camp or outreach vitals in bulk. Deterministic scores are stored in one
+    transaction and returned per record; LLM guidance is queued as background jobs.
+    """
+    _check_batch_size(len(batch.records))
+    records = list(enumerate(batch.records, start=1))
+    results = assess_batch(session, records, assessment_jobs if batch.generate_guidance else None)
+    return {"results": results}
+
+@app.post("/assess/batch/csv")
+async def assess_vitals_csv(session: SessionDep, file: UploadFile = File(...), generate_guidance: bool = Form(True)):
+    records, errors = parse_vitals_csv(await file.read())
+    _check_batch_size(len(records) + len(errors))
+    results = assess_batch(session, records, assessment_jobs if generate_guidance else None)
+    return {"results": sorted(results + errors, key=lambda r: r["row"])}
+
+@app.get("/mothers")
+def get_mothers(
+    session: SessionDep,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    doctor_id: Optional[str] = None,
+    asha_id: Optional[str] = None,
+    location: Optional[str] = None,
+    min_weeks: Optional[int] = Query(None, ge=0),
+    max_weeks: Optional[int] = Query(None, ge=0),
+    risk_level: Optional[str] = None,
+    q: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Pages through the mother registry by Maternity ID. Filters narrow by
+    assigned staff, location, gestational weeks and latest risk level; `q`
+    matches part of a name or ID. `fields` (comma-separated) limits the
+    columns returned. X-Next-Cursor holds the cursor for the next page.
+    """
+    columns = parse_fields(fields)
+    query = mother_query(columns, doctor_id=doctor_id, asha_id=asha_id, location=location,
+                         min_weeks=min_weeks, max_weeks=max_weeks, risk_level=risk_level, q=q)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, str)
+        query = query.where(MotherProfile.id > after_id)
+    query = query.order_by(MotherProfile.id).limit(limit + 1)
+
+    rows = session.execute(query).mappings().all() if columns else session.exec(query).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]["id"] if columns else rows[-1].id)
+    return [dict(row) for row in rows] if columns else rows
 
 @app.get("/mother/{mother_id}", response_model=MotherProfile)
 def get_mother(mother_id: str, session: SessionDep):
@@ -152,17 +227,47 @@ def get_mother(mother_id: str, session: SessionDep):
     return mother
 
 @app.get("/mother/{mother_id}/history")
-def get_mother_history(mother_id: str, session: SessionDep):
-    assessments = session.exec(select(RiskAssessment).where(RiskAssessment.mother_id == mother_id).order_by(RiskAssessment.timestamp.desc())).all()
-    
-    history = []
-    for r in assessments:
-        data = session.get(AssessmentData, r.assessment_data_id)
-        history.append({
-            "risk": r,
-            "vitals": data
-        })
-    return history
+def get_mother_history(
+    mother_id: str,
+    session: SessionDep,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """
+    Returns a mother's assessments newest first, each with its vitals, in one
+    joined query. When more rows exist the X-Next-Cursor response header holds
+    the cursor for the next page; `start`/`end` bound the assessment timestamp.
+    """
+    query = (
+        select(RiskAssessment, AssessmentData)
+        .join(AssessmentData, RiskAssessment.assessment_data_id == AssessmentData.id, isouter=True)
+        .where(RiskAssessment.mother_id == mother_id)
+    )
+    if start:
+        query = query.where(RiskAssessment.timestamp >= start)
+    if end:
+        query = query.where(RiskAssessment.timestamp < end)
+    if cursor:
+        before_ts, before_id = decode_cursor(cursor, str, int)
+        before_ts = parse_cursor_datetime(before_ts)
+        query = query.where(or_(
+            RiskAssessment.timestamp < before_ts,
+            and_(RiskAssessment.timestamp == before_ts, RiskAssessment.id < before_id)
+        ))
+
+    rows = session.exec(
+        query.order_by(RiskAssessment.timestamp.desc(), RiskAssessment.id.desc()).limit(limit + 1)
+    ).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.timestamp, last.id)
+
+    return [{"risk": risk, "vitals": data} for risk, data in rows]
 
 @app.delete("/assessment/{assessment_data_id}")
 def delete_assessment(assessment_data_id: int, session: SessionDep):
@@ -172,7 +277,9 @@ def delete_assessment(assessment_data_id: int, session: SessionDep):
         
     risk_data = session.exec(select(RiskAssessment).where(RiskAssessment.assessment_data_id == assessment_data_id)).first()
     if risk_data:
+        forget_flags(session, risk_data.id)
         session.delete(risk_data)
+        forget_assessment(session, risk_data)
         
     session.delete(ass_data)
     session.commit()
@@ -191,9 +298,45 @@ def save_consultation_note(risk_id: int, input_data: ConsultationNoteInput, sess
     session.commit()
     return {"status": "success", "note": input_data.note}
 
+@app.post("/mother/{mother_id}/chat/read")
+def mark_chat_read(mother_id: str, session: SessionDep):
+    """Clears the mother's unread RED count once someone has opened her chat."""
+    mark_read(session, mother_id)
+    session.commit()
+    return {"status": "ok"}
+
 @app.get("/mother/{mother_id}/chat", response_model=List[ChatMessage])
-def get_chat_history(mother_id: str, session: SessionDep):
-    return session.exec(select(ChatMessage).where(ChatMessage.mother_id == mother_id).order_by(ChatMessage.timestamp)).all()
+def get_chat_history(
+    mother_id: str,
+    session: SessionDep,
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    since: Optional[datetime] = None
+):
+    """
+    Returns a window of a mother's chat, oldest first. Without a cursor this is
+    the latest `limit` messages; `before_id` pages back through older ones and
+    `after_id` / `since` return only messages newer than what the client
+    holds. Responses carry an ETag, so an unchanged chat polled with
+    If-None-Match costs a 304 and no body.
+    """
+    if before_id is not None and (after_id is not None or since):
+        raise HTTPException(status_code=400, detail="Use either before_id or after_id/since, not both")
+    query = select(ChatMessage).where(ChatMessage.mother_id == mother_id)
+    if since:
+        query = query.where(ChatMessage.timestamp > since)
+
+    if after_id is not None or since:
+        if after_id is not None:
+            query = query.where(ChatMessage.id > after_id)
+        rows = session.exec(query.order_by(ChatMessage.id).limit(limit)).all()
+    else:
+        if before_id is not None:
+            query = query.where(ChatMessage.id < before_id)
+        rows = session.exec(query.order_by(ChatMessage.id.desc()).limit(limit)).all()[::-1]
+    return etag_response(request, rows)
 
 @app.post("/chat")
 def send_chat_message(message: ChatMessage, session: SessionDep):
@@ -207,7 +350,7 @@ def get_consultations(mother_id: str, session: SessionDep):
     return session.exec(select(Consultation).where(Consultation.mother_id == mother_id).order_by(Consultation.created_at.desc())).all()
 
 @app.post("/mother/{mother_id}/consultations", response_model=Consultation)
-def create_consultation(mother_id: str, consultation: Consultation, session: SessionDep):
+def create_consultation(mother_id: str, consultation: Consultation, session: SessionDep, background_tasks: BackgroundTasks):
     mother = session.get(MotherProfile, mother_id)
     if not mother:
         raise HTTPException(status_code=404, detail="Mother not found")
@@ -227,114 +370,137 @@ def create_consultation(mother_id: str, consultation: Consultation, session: Ses
     session.refresh(consultation)
 
     if mother.telegram_id:
-        try:
-            telegram_bot.send_consultation_prescription_to_telegram(mother, consultation)
-        except Exception as e:
-            print(f"Failed to send Telegram notification: {e}")
+        # Translation and delivery happen after the response is sent
+        session.expunge(mother)
+        session.expunge(consultation)
+        background_tasks.add_task(telegram_bot.send_consultation_prescription_to_telegram, mother, consultation)
             
     return consultation
 
-UPLOAD_DIR = "data/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-@app.post("/mother/{mother_id}/documents", response_model=Document)
-async def upload_document(mother_id: str, session: SessionDep, file: UploadFile = File(...), document_type: str = Form("Report")):
-    mother = session.get(MotherProfile, mother_id)
-    if not mother:
-        raise HTTPException(status_code=404, detail="Mother not found")
-        
-    file_path = os.path.join(UPLOAD_DIR, f"{mother_id}_{file.filename}")
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    doc = Document(
-        mother_id=mother_id,
-        file_name=file.filename,
-        file_path=file_path,
-        document_type=document_type
-    )
-    session.add(doc)
-    session.commit()
-    session.refresh(doc)
-    return doc
-
-@app.get("/mother/{mother_id}/documents", response_model=List[Document])
-def get_documents(mother_id: str, session: SessionDep):
-    return session.exec(select(Document).where(Document.mother_id == mother_id).order_by(Document.uploaded_at.desc())).all()
-
-@app.get("/mother/{mother_id}/documents", response_model=List[Document])
-def get_documents(mother_id: str, session: SessionDep):
-    return session.exec(select(Document).where(Document.mother_id == mother_id).order_by(Document.uploaded_at.desc())).all()
-
-@app.post("/mother/{mother_id}/upload")
-async def upload_document(mother_id: str, session: SessionDep, file: UploadFile = File(...)):
-    
-    mother = session.get(MotherProfile, mother_id)
-    if not mother:
-        raise HTTPException(status_code=404, detail="Mother not found")
-        
-    file_path = f"data/uploads/{mother_id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
-        
-    doc = Document(
-        mother_id=mother_id,
-        file_name=file.filename,
-        file_path=file_path,
-        document_type="Report"
-    )
-    session.add(doc)
-    session.commit()
-    session.refresh(doc)
-    return doc
-
 @app.get("/mother/{mother_id}/chat/summary")
-async def get_chat_summary(mother_id: str, session: SessionDep):
-    
-    two_weeks_ago = datetime.now() - timedelta(days=14)
-    messages = session.exec(
-        select(ChatMessage)
-        .where(ChatMessage.mother_id == mother_id)
-        .where(ChatMessage.timestamp >= two_weeks_ago)
-        .order_by(ChatMessage.timestamp.asc())
-    ).all()
-    
-    summary_text = await orchestrator.generate_chat_summary(mother_id, messages)
-    return {"summary": summary_text}
+async def get_chat_summary(mother_id: str):
+    return await chat_summaries.get(mother_id)
 
 @app.get("/admin/stats")
-def get_admin_stats(session: SessionDep):
-    total_mothers = session.exec(select(MotherProfile)).all()
-    doctors = session.exec(select(Doctor)).all()
-    ashas = session.exec(select(AshaWorker)).all()
-    
-    fully_assigned = sum(1 for m in total_mothers if m.assigned_doctor_id and m.assigned_asha_id)
-    needs_assignment = len(total_mothers) - fully_assigned
-
-    doctor_workloads = [{"id": d.id, "name": d.name, "count": len(d.assigned_mothers)} for d in doctors]
-    asha_workloads = [{"id": a.id, "name": a.name, "count": len(a.assigned_mothers)} for a in ashas]
-    
-    return {
-        "total_mothers": len(total_mothers),
-        "total_doctors": len(doctors),
-        "total_ashas": len(ashas),
-        "fully_assigned": fully_assigned,
-        "needs_assignment": needs_assignment,
-        "doctor_workloads": sorted(doctor_workloads, key=lambda x: x["count"], reverse=True),
-        "asha_workloads": sorted(asha_workloads, key=lambda x: x["count"], reverse=True)
-    }
-
-@app.get("/mothers", response_model=List[MotherProfile])
-def get_all_mothers(session: SessionDep):
-    return session.exec(select(MotherProfile)).all()
-
-@app.get("/doctors", response_model=List[Doctor])
+def get_admin_stats(session: SessionDep, top: int = Query(10, ge=1, le=100)):
+    """
+    Registry totals and the `top` busiest doctors and ASHA workers, computed
+    with SQL aggregates and cached for ADMIN_STATS_TTL seconds.
+    """
+    return admin_stats(session, top)
+
+@app.get("/worklist")
+def get_worklist(
+    session: SessionDep,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    asha_id: Optional[str] = None,
+    doctor_id: Optional[str] = None,
+    risk_level: Optional[str] = None
+):
+    """
+    Mothers to follow up first. Any mother with an unread RED message comes
+    before the rest, whatever her assessment says; within each tier the order
+    is latest risk score, then unread RED count, then most recent activity.
+    Reads the LatestRisk projection in index order, so a page costs the same
+    however large the registry is. Mothers with neither an assessment nor a
+    RED message are not listed. X-Next-Cursor holds the next page's cursor.
+    """
+    query = (
+        select(LatestRisk, MotherProfile.name, MotherProfile.location, MotherProfile.phone,
+               MotherProfile.gestational_age_weeks, MotherProfile.assigned_asha_id, MotherProfile.assigned_doctor_id)
+        .join(MotherProfile, MotherProfile.id == LatestRisk.mother_id)
+    )
+    if asha_id:
+        query = query.where(MotherProfile.assigned_asha_id == asha_id)
+    if doctor_id:
+        query = query.where(MotherProfile.assigned_doctor_id == doctor_id)
+    if risk_level:
+        query = query.where(LatestRisk.risk_level == risk_level.upper())
+    if cursor:
+        tier, score, unread, activity_at, mother_id = decode_cursor(cursor, int, CURSOR_NUMBER, int, str, str)
+        query = query.where(
+            tuple_(*WORKLIST_ORDER) < tuple_(tier, score, unread, parse_cursor_datetime(activity_at), mother_id)
+        )
+
+    rows = session.exec(query.order_by(*(column.desc() for column in WORKLIST_ORDER)).limit(limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*worklist_position(rows[-1][0]))
+
+    return [
+        {**latest.model_dump(), "name": name, "location": location, "phone": phone,
+         "gestational_age_weeks": weeks, "assigned_asha_id": asha, "assigned_doctor_id": doctor}
+        for latest, name, location, phone, weeks, asha, doctor in rows
+    ]
+
+@app.get("/flags")
+def get_flags(
+    session: SessionDep,
+    response: Response,
+    code: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    location: Optional[str] = None,
+    asha_id: Optional[str] = None,
+    doctor_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """
+    Flags raised by assessments, newest first, e.g. every SEVERE_ANEMIA flag
+    this month with code=SEVERE_ANEMIA&since=2025-06-01. Codes are FlagBit
+    names; `until` is exclusive. X-Next-Cursor holds the next page's cursor.
+    """
+    query = flag_query(code, since, until, location, asha_id, doctor_id)
+    if cursor:
+        assessed_at, flag_id = decode_cursor(cursor, str, int)
+        query = query.where(tuple_(RiskFlag.assessed_at, RiskFlag.id) < tuple_(parse_cursor_datetime(assessed_at), flag_id))
+
+    rows = session.exec(query.order_by(RiskFlag.assessed_at.desc(), RiskFlag.id.desc()).limit(limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.assessed_at, last.id)
+
+    return [{**flag.model_dump(), "name": name, "location": location} for flag, name, location in rows]
+
+@app.get("/flags/counts")
+def get_flag_counts(
+    session: SessionDep,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    location: Optional[str] = None,
+    asha_id: Optional[str] = None,
+    doctor_id: Optional[str] = None
+):
+    """Assessments and distinct mothers per flag code over the period."""
+    return flag_counts(session, since=since, until=until, location=location, asha_id=asha_id, doctor_id=doctor_id)
+
+class RescoreInput(SQLModel):
+    heat_index: float
+    aqi: float
+    chemical_exposure: float
+    mother_ids: Optional[List[str]] = None
+    limit: int = 100
+
+@app.post("/admin/rescore")
+def rescore_registry(payload: RescoreInput, session: SessionDep):
+    """
+    Re-applies the risk rules to every mother's latest vitals under the given
+    environment readings and reports whose risk level would change.
+    """
+    rows = latest_vitals(session, payload.mother_ids)
+    return rescore(rows, payload.heat_index, payload.aqi, payload.chemical_exposure, limit=payload.limit)
+
+@app.get("/doctors")
 def get_all_doctors(session: SessionDep):
-    return session.exec(select(Doctor)).all()
+    return [{**d.model_dump(), "assigned_count": n} for d, n in workloads(session, Doctor, MotherProfile.assigned_doctor_id)]
 
-@app.get("/asha_workers", response_model=List[AshaWorker])
+@app.get("/asha_workers")
 def get_all_ashas(session: SessionDep):
-    return session.exec(select(AshaWorker)).all()
+    return [{**a.model_dump(), "assigned_count": n} for a, n in workloads(session, AshaWorker, MotherProfile.assigned_asha_id)]
 
 class AssignHRInput(SQLModel):
     doctor_id: Optional[str] = None
@@ -354,4 +520,5 @@ def assign_hr(mother_id: str, payload: AssignHRInput, session: SessionDep):
     session.add(mother)
     session.commit()
     session.refresh(mother)
+    admin_stats_cache.clear()
     return {"status": "success", "mother_id": mother.id, "assigned_doctor_id": mother.assigned_doctor_id, "assigned_asha_id": mother.assigned_asha_id}
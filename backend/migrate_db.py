@@ -0,0 +1,51 @@
+from sqlmodel import SQLModel, Session, select
+from sqlalchemy import func
+from database import engine, ensure_columns, ensure_indexes
+from models import MotherProfile
+from services.registry import ensure_search_index
+from services.latest_risk import backfill as backfill_latest_risk
+from services.flags import backfill as backfill_flags
+from services.documents import document_store
+
+def release_duplicate_telegram_ids():
+    """
+    The unique index on MotherProfile.telegram_id cannot be built while two
+    profiles share a chat. Keeps the first profile per chat and unlinks the rest;
+    those mothers simply re-register with /start.
+    """
+    with Session(engine) as session:
+        duplicated = session.exec(
+            select(MotherProfile.telegram_id)
+            .where(MotherProfile.telegram_id.is_not(None))
+            .group_by(MotherProfile.telegram_id)
+            .having(func.count(MotherProfile.id) > 1)
+        ).all()
+
+        for telegram_id in duplicated:
+            mothers = session.exec(
+                select(MotherProfile).where(MotherProfile.telegram_id == telegram_id).order_by(MotherProfile.id)
+            ).all()
+            for mother in mothers[1:]:
+                print(f"Unlinking Telegram chat {telegram_id} from {mother.id} (kept on {mothers[0].id})")
+                mother.telegram_id = None
+                session.add(mother)
+        session.commit()
+
+if __name__ == "__main__":
+    print("Creating missing tables...")
+    SQLModel.metadata.create_all(engine)
+    print("Adding missing columns...")
+    ensure_columns()
+    print("Releasing duplicate Telegram links...")
+    release_duplicate_telegram_ids()
+    print("Creating missing indexes...")
+    with engine.begin() as conn:
+        # Superseded by ix_latestrisk_triage
+        conn.exec_driver_sql("DROP INDEX IF EXISTS ix_latestrisk_worklist")
+    ensure_indexes()
+    print(f"Backfilled latest risk for {backfill_latest_risk()} mothers")
+    print(f"Indexed flags of {backfill_flags()} stored assessments")
+    print(f"Moved {document_store.import_legacy()} documents into the content store")
+    print("Rebuilding registry search index...")
+    print(f"Search backend: {ensure_search_index(rebuild=True)}")
+    print("Done!")
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List
 from datetime import datetime
 
@@ -18,7 +19,7 @@ class AshaWorker(SQLModel, table=True):
 
 class MotherProfile(SQLModel, table=True):
     id: str = Field(primary_key=True)
-    telegram_id: Optional[str] = Field(default=None)
+    telegram_id: Optional[str] = Field(default=None, unique=True, index=True)
     name: str
     location: Optional[str] = None
     preferred_lang: str = Field(default='en')
@@ -28,8 +29,8 @@ class MotherProfile(SQLModel, table=True):
     latitude: float
     longitude: float
 
-    assigned_doctor_id: Optional[str] = Field(default=None, foreign_key="doctor.id")
-    assigned_asha_id: Optional[str] = Field(default=None, foreign_key="ashaworker.id")
+    assigned_doctor_id: Optional[str] = Field(default=None, foreign_key="doctor.id", index=True)
+    assigned_asha_id: Optional[str] = Field(default=None, foreign_key="ashaworker.id", index=True)
 
     assigned_doctor: Optional[Doctor] = Relationship(back_populates="assigned_mothers")
     assigned_asha: Optional[AshaWorker] = Relationship(back_populates="assigned_mothers")
@@ -39,6 +40,8 @@ class MotherProfile(SQLModel, table=True):
     documents: List["Document"] = Relationship(back_populates="mother")
 
 class AssessmentData(SQLModel, table=True):
+    __table_args__ = (Index("ix_assessmentdata_mother_id_timestamp", "mother_id", "timestamp"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     mother_id: str = Field(foreign_key="motherprofile.id")
     systolic_bp: int
@@ -52,8 +55,10 @@ class AssessmentData(SQLModel, table=True):
     risk_result: Optional["RiskAssessment"] = Relationship(back_populates="assessment_data")
 
 class RiskAssessment(SQLModel, table=True):
+    __table_args__ = (Index("ix_riskassessment_mother_id_timestamp", "mother_id", "timestamp"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    assessment_data_id: int = Field(foreign_key="assessmentdata.id")
+    assessment_data_id: int = Field(foreign_key="assessmentdata.id", index=True)
     mother_id: str = Field(foreign_key="motherprofile.id")
     
     overall_risk_score: float
@@ -72,7 +77,27 @@ class RiskAssessment(SQLModel, table=True):
     mother: Optional[MotherProfile] = Relationship(back_populates="assessments")
     assessment_data: Optional[AssessmentData] = Relationship(back_populates="risk_result")
 
+class RiskFlag(SQLModel, table=True):
+    """One row per flag raised by an assessment, so reports can filter by flag without decoding JSON."""
+    __table_args__ = (
+        Index("ix_riskflag_code_assessed_at", "code", "assessed_at"),
+        Index("ix_riskflag_mother_id_assessed_at", "mother_id", "assessed_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    risk_assessment_id: int = Field(foreign_key="riskassessment.id", index=True)
+    mother_id: str = Field(foreign_key="motherprofile.id")
+    code: str  # FlagBit name from agents/scoring.py, e.g. "SEVERE_ANEMIA"
+    detail: str  # the flag as stored on the assessment, e.g. "High PM2.5 Levels (162.0)"
+    assessed_at: datetime
+
 class ChatMessage(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_chatmessage_mother_id_timestamp", "mother_id", "timestamp"),
+        # Chat pages are keyset-paginated on id
+        Index("ix_chatmessage_mother_id_id", "mother_id", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     mother_id: str = Field(foreign_key="motherprofile.id")
     sender: str = Field(default="Patient") 
@@ -85,6 +110,8 @@ class ChatMessage(SQLModel, table=True):
     mother: Optional[MotherProfile] = Relationship(back_populates="chat_messages")
 
 class Consultation(SQLModel, table=True):
+    __table_args__ = (Index("ix_consultation_mother_id_created_at", "mother_id", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     mother_id: str = Field(foreign_key="motherprofile.id")
 
@@ -104,6 +131,8 @@ class Consultation(SQLModel, table=True):
     mother: Optional[MotherProfile] = Relationship(back_populates="consultations")
 
 class Document(SQLModel, table=True):
+    __table_args__ = (Index("ix_document_mother_id_uploaded_at", "mother_id", "uploaded_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     mother_id: str = Field(foreign_key="motherprofile.id")
     
@@ -111,9 +140,65 @@ class Document(SQLModel, table=True):
     file_path: str
     document_type: str = Field(default="Report") 
     uploaded_at: datetime = Field(default_factory=datetime.now)
+    # Content address in the document store; None for files not yet imported by migrate_db.py
+    sha256: Optional[str] = Field(default=None, index=True)
+    size_bytes: Optional[int] = None
+    content_type: Optional[str] = None
 
     mother: Optional[MotherProfile] = Relationship(back_populates="documents")
 
+class EnvironmentReading(SQLModel, table=True):
+    __table_args__ = (Index("ix_environmentreading_tile_fetched_at", "tile_lat", "tile_lon", "fetched_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tile_lat: float
+    tile_lon: float
+    temperature_c: float
+    heat_index: float
+    aqi: float
+    chemical_exposure: float
+    risk_multiplier: float
+    mother_count: int = Field(default=0)
+    high_risk_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # HIGH/CRITICAL mothers at fetch time
+    fetched_at: datetime = Field(default_factory=datetime.now)
+
+class EnvironmentAffected(SQLModel, table=True):
+    # The latest prefetch run's escalations, so every worker serves the same list
+    id: Optional[int] = Field(default=None, primary_key=True)
+    generated_at: datetime
+    changed_tiles: str  # JSON list
+    escalated: str  # JSON list
+
+class ConversationState(SQLModel, table=True):
+    key: str = Field(primary_key=True)
+    step: str
+    data: str = Field(default="{}")  # JSON object
+    expires_at: datetime = Field(index=True)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class LatestRisk(SQLModel, table=True):
+    # Worklist order: unread danger signs first, then score, unread count and recent activity
+    __table_args__ = (Index(
+        "ix_latestrisk_triage", "priority_tier", "overall_risk_score", "unread_red_count", "activity_at", "mother_id"
+    ),)
+
+    mother_id: str = Field(foreign_key="motherprofile.id", primary_key=True)
+    priority_tier: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # 1 while a RED message is unread
+    risk_assessment_id: Optional[int] = None  # None until the mother's first assessment
+    overall_risk_score: float = Field(default=0.0)
+    risk_level: Optional[str] = Field(default=None, index=True)
+    assessed_at: Optional[datetime] = None
+    unread_red_count: int = Field(default=0)
+    last_red_at: Optional[datetime] = None
+    activity_at: datetime = Field(default_factory=datetime.now)  # latest of assessed_at and last_red_at
+
+class ChatSummary(SQLModel, table=True):
+    mother_id: str = Field(foreign_key="motherprofile.id", primary_key=True)
+    summary: str
+    last_message_id: int  # highest ChatMessage.id the summary covers
+    rebuilt_at: datetime  # last time it was built from the full window rather than incrementally
+    updated_at: datetime = Field(default_factory=datetime.now)
+
 class VitalsInput(SQLModel):
     mother_id: str
     systolic_bp: int
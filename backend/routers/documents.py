@@ -0,0 +1,113 @@
+import os
+from typing import Callable, List
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile
+from fastapi.responses import FileResponse
+from fastapi.routing import APIRoute
+from sqlmodel import Session, select
+from database import get_session
+from models import Document, MotherProfile
+from services.documents import document_store, inline_content_type
+
+# A document's bytes never change, so clients may keep them as long as they like
+DOCUMENT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Room for multipart boundaries and the form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class UploadLimitRoute(APIRoute):
+    """
+    FastAPI parses a multipart body, spooling the file to disk, before the
+    endpoint runs. This rejects an oversized body first: by Content-Length
+    when the client sends one, otherwise as soon as the streamed body
+    crosses the limit.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            limit = document_store.max_bytes + MULTIPART_OVERHEAD_BYTES
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > limit:
+                raise document_store.too_large()
+
+            receive = request.receive
+            received = 0
+
+            async def limited_receive():
+                nonlocal received
+                message = await receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit:
+                        raise document_store.too_large()
+                return message
+
+            return await handler(Request(request.scope, limited_receive))
+
+        return limited_handler
+
+router = APIRouter(route_class=UploadLimitRoute)
+
+@router.post("/mother/{mother_id}/documents", response_model=Document)
+async def upload_document(mother_id: str, file: UploadFile = File(...), document_type: str = Form("Report"),
+                          session: Session = Depends(get_session)):
+    mother = session.get(MotherProfile, mother_id)
+    if not mother:
+        raise HTTPException(status_code=404, detail="Mother not found")
+
+    sha256, size, path = await document_store.save(file)
+
+    # Re-uploading the same file for the same mother returns the existing record
+    existing = session.exec(
+        select(Document).where(Document.mother_id == mother_id, Document.sha256 == sha256,
+                               Document.file_name == file.filename)
+    ).first()
+    if existing:
+        return existing
+
+    doc = Document(
+        mother_id=mother_id,
+        file_name=file.filename,
+        file_path=path,
+        document_type=document_type,
+        sha256=sha256,
+        size_bytes=size,
+        content_type=file.content_type
+    )
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+    return doc
+
+@router.post("/mother/{mother_id}/upload", response_model=Document)
+async def upload_report(mother_id: str, file: UploadFile = File(...), session: Session = Depends(get_session)):
+    """Older clients' upload route; same as POST /mother/{mother_id}/documents."""
+    return await upload_document(mother_id, file, "Report", session)
+
+@router.get("/mother/{mother_id}/documents", response_model=List[Document])
+def get_documents(mother_id: str, session: Session = Depends(get_session)):
+    return session.exec(select(Document).where(Document.mother_id == mother_id).order_by(Document.uploaded_at.desc())).all()
+
+@router.get("/documents/{document_id}/file")
+def get_document_file(document_id: int, request: Request, session: Session = Depends(get_session)):
+    """
+    Serves the stored file with its sha256 as ETag. Range requests get 206 so
+    an interrupted download resumes instead of starting over, and a matching
+    If-None-Match gets 304. Only PDFs and common images open in the browser;
+    other types download as octet-stream, so an uploaded HTML or SVG file
+    cannot run script in the dashboard's origin.
+    """
+    doc = session.get(Document, document_id)
+    if not doc or not os.path.isfile(doc.file_path):
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    headers = {"X-Content-Type-Options": "nosniff"}
+    if doc.sha256:
+        etag = f'"{doc.sha256}"'
+        headers.update({"ETag": etag, "Cache-Control": DOCUMENT_CACHE_CONTROL})
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+    media_type = inline_content_type(doc.content_type)
+    return FileResponse(doc.file_path, media_type=media_type or "application/octet-stream", filename=doc.file_name,
+                        content_disposition_type="inline" if media_type else "attachment", headers=headers)
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select
+from database import get_session
+from models import EnvironmentReading
+from services.environment import env_service, snap_to_tile
+from services.env_prefetch import env_prefetcher
+
+router = APIRouter(prefix="/environment")
+
+@router.get("/heatmap")
+def get_heatmap(session: Session = Depends(get_session)):
+    """Latest stored heat/AQI reading per tile, with its mother and high-risk counts."""
+    return env_prefetcher.heatmap(session)
+
+@router.get("/affected")
+def get_affected_mothers(session: Session = Depends(get_session)):
+    """Mothers whose risk level rose because their tile's environment multiplier changed."""
+    return env_prefetcher.affected(session)
+
+@router.post("/refresh")
+async def refresh_environment():
+    return await env_prefetcher.run_once()
+
+@router.get("/history")
+def get_tile_history(lat: float, lon: float, session: Session = Depends(get_session),
+                     hours: int = Query(48, ge=1, le=24 * 30)):
+    tile_lat, tile_lon = snap_to_tile(lat, lon, env_service.tile_degrees)
+    return session.exec(
+        select(EnvironmentReading)
+        .where(EnvironmentReading.tile_lat == tile_lat)
+        .where(EnvironmentReading.tile_lon == tile_lon)
+        .where(EnvironmentReading.fetched_at >= datetime.now() - timedelta(hours=hours))
+        .order_by(EnvironmentReading.fetched_at)
+    ).all()
@@ -1,89 +1,44 @@
 import os
-import requests
-import tempfile
-import subprocess
+import asyncio
+from collections import defaultdict
+from typing import List, Optional
 from fastapi import APIRouter, Request, Depends, BackgroundTasks
+from pydantic import BaseModel
 from sqlmodel import Session, select
 from datetime import datetime
 import json
-from database import get_session
+from database import get_session, engine
 from models import MotherProfile, ChatMessage, Consultation
-from socket_instance import sio
-import google.generativeai as genai
+from socket_instance import emit_to_mother
+from agents.translation import translator, LANGUAGE_NAMES
+from agents.triage import triage, higher_priority
+from services.telegram_client import telegram_client
+from services.voice import voice_pipeline
+from services.state_store import state_store
+from services.chat_summary import chat_summaries
+from services.latest_risk import record_red_message
 
 router = APIRouter()
 
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
+REGISTRATION_STEP = "awaiting_id"
 
-GEMINI_API_KEY = os.environ.get("GOOGLE_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-2.5-flash')
-else:
-    model = None
+def _state_key(chat_id: str) -> str:
+    return f"telegram:{chat_id}"
 
-registration_state = {}
+def send_telegram_message(chat_id: str, text: str, reply_markup=None):
+    telegram_client.enqueue(chat_id, text, reply_markup)
 
-EMERGENCY_KEYWORDS = [
-    "blood", "bleeding", "khoon", "severe pain", "dard", "faint", "chakkar", 
-    "contractions", "pani", "water broke", "emergency", "diarrhoea", "diarrhea", 
-    "loose motion", "dast", "headache", "vomiting", "sir dard", "ulti", "sar dard"
-]
+async def translate_to_english(text: str) -> str:
+    translated = await translator.translate([text], "en")
+    return translated[0] if translated else f"{text} (Translated to English)"
 
-def send_telegram_message(chat_id: str, text: str, reply_markup=None):
-    payload = {"chat_id": chat_id, "text": text}
-    if reply_markup:
-        payload["reply_markup"] = reply_markup
-    res = requests.post(f"{TELEGRAM_API_URL}/sendMessage", json=payload)
-    print("SEND MSG RESPONSE:", res.status_code, res.text)
-
-def get_telegram_file_url(file_id: str) -> str:
-    res = requests.get(f"{TELEGRAM_API_URL}/getFile?file_id={file_id}").json()
-    if res.get("ok"):
-        file_path = res["result"]["file_path"]
-        return f"https://api.telegram.org/file/bot{TELEGRAM_BOT_TOKEN}/{file_path}"
-    return ""
-
-async def process_voice_note(file_id: str) -> str:
-    file_url = get_telegram_file_url(file_id)
-    if not file_url:
-        return ""
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        input_file = os.path.join(temp_dir, "audio.oga")
-        output_file = os.path.join(temp_dir, "audio.wav")
-        audio_data = requests.get(file_url).content
-        with open(input_file, "wb") as f:
-            f.write(audio_data)
-        try:
-            subprocess.run(["ffmpeg", "-y", "-i", input_file, output_file], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            return "Transcript: I am having some bleeding and pain."
-        except Exception as e:
-            print(f"Error converting audio: {e}")
-            return "Voice message could not be processed."
-
-def translate_to_english(text: str) -> str:
-    if model:
-        try:
-            response = model.generate_content(f"Translate the following patient message to English. ONLY output the translated text:\n\n{text}")
-            return response.text.strip()
-        except Exception as e:
-            print(f"Gemini Translation error: {e}")
-    return f"{text} (Translated to English)"
-
-def translate_from_english(text: str, target_lang: str) -> str:
-    lang_map = {"en": "English", "hi": "Hindi", "mr": "Marathi"}
-    target = lang_map.get(target_lang, "English")
-    if target == "English":
+async def translate_from_english(text: str, target_lang: str) -> str:
+    if LANGUAGE_NAMES.get(target_lang, "English") == "English":
         return text
-    if model:
-        try:
-            response = model.generate_content(f"Translate the following medical reply from a doctor to {target}, using an empathetic and conversational tone. ONLY output the translated text:\n\n{text}")
-            return response.text.strip()
-        except Exception as e:
-            print(f"Gemini Translation error: {e}")
-    
+    translated = await translator.translate([text], target_lang)
+    return translated[0] if translated else _untranslated(text, target_lang)
+
+def _untranslated(text: str, target_lang: str) -> str:
     if target_lang == "hi":
         return f"{text} (Translated to Hindi)"
     elif target_lang == "mr":
@@ -100,7 +55,7 @@ async def telegram_webhook(request: Request, background_tasks: BackgroundTasks,
         chosen_lang = callback["data"]
         lang_code = chosen_lang.split("_")[1]
 
-        registration_state[chat_id] = {"step": "awaiting_id", "lang": lang_code}
+        state_store.set(_state_key(chat_id), {"step": REGISTRATION_STEP, "lang": lang_code})
         id_prompts = {
             "en": "Please enter your Maternity ID (e.g., MK-2024-001):",
             "hi": "कृपया अपना 11-अक्षरों का मातृत्व आईडी दर्ज करें (उदा. MK-2024-001):",
@@ -130,25 +85,30 @@ async def telegram_webhook(request: Request, background_tasks: BackgroundTasks,
         send_telegram_message(chat_id, "Welcome to MatruKavach Saathi! Please choose your preferred language:", reply_markup=keyboard)
         return {"status": "ok"}
 
-    state = registration_state.get(chat_id)
-    if state and state.get("step") == "awaiting_id":
+    state = state_store.get(_state_key(chat_id))
+    if state and state.get("step") == REGISTRATION_STEP:
         entered_id = text.strip()
         db_mother = session.get(MotherProfile, entered_id)
         lang_code = state["lang"]
         
+        # Claim the step atomically so a duplicate delivery handled by another
+        # worker cannot register the chat twice
+        if db_mother and not state_store.transition(_state_key(chat_id), REGISTRATION_STEP, None):
+            return {"status": "ok"}
+
         if db_mother:
-            
             other_mothers = session.exec(select(MotherProfile).where(MotherProfile.telegram_id == chat_id)).all()
             for om in other_mothers:
                 if om.id != db_mother.id:
                     om.telegram_id = None
                     session.add(om)
+            # Release the chat id before claiming it so the unique index never sees two owners
+            session.flush()
 
             db_mother.telegram_id = chat_id
             db_mother.preferred_lang = lang_code
             session.add(db_mother)
             session.commit()
-            del registration_state[chat_id]
             
             success_msgs = {
                 "en": f"Authentication successful! Welcome, {db_mother.name}. You can now send me messages.",
@@ -172,43 +132,61 @@ async def telegram_webhook(request: Request, background_tasks: BackgroundTasks,
     is_voice = False
     if voice:
         is_voice = True
-        raw_text = await process_voice_note(voice["file_id"])
+        raw_text = await voice_pipeline.transcribe(voice["file_id"], voice.get("file_unique_id"))
     else:
         raw_text = text
 
-    translated_text = translate_to_english(raw_text)
-
-    priority = "GREEN"
-    for kw in EMERGENCY_KEYWORDS:
-        if kw in translated_text.lower() or kw in raw_text.lower():
-            priority = "RED"
-            break
-
+    # Triage runs on the raw text so an emergency reaches the dashboard before
+    # any translation call
+    result = triage(raw_text)
     chat_entry = ChatMessage(
         mother_id=mother.id,
         sender="Patient",
         raw_text=raw_text,
-        translated_text=translated_text,
         is_voice=is_voice,
-        priority=priority,
+        priority=result.priority,
         timestamp=datetime.now()
     )
+
+    if result.is_urgent:
+        session.add(chat_entry)
+        session.commit()
+        session.refresh(chat_entry)
+        await emit_to_mother("new_notification", _notification(chat_entry, mother, raw_text, translation_pending=True), mother)
+
+    translated_text = await translate_to_english(raw_text)
+    chat_entry.translated_text = translated_text
+    # The translation can reveal danger signs missing from the local lexicon
+    chat_entry.priority = higher_priority(chat_entry.priority, triage(translated_text).priority)
     session.add(chat_entry)
+    if chat_entry.priority == "RED":
+        record_red_message(session, mother.id, chat_entry.timestamp)
     session.commit()
     session.refresh(chat_entry)
 
-    await sio.emit("new_notification", {
+    if result.is_urgent:
+        await emit_to_mother("notification_updated", _notification(chat_entry, mother, translated_text), mother)
+    else:
+        await emit_to_mother("new_notification", _notification(chat_entry, mother, translated_text), mother)
+
+    if chat_entry.priority == "RED":
+        # Have the summary ready before a doctor opens this mother's chat
+        chat_summaries.schedule_refresh(mother.id)
+
+    return {"status": "ok"}
+
+def _notification(chat_entry: ChatMessage, mother: MotherProfile, content: str, translation_pending: bool = False) -> dict:
+    return {
         "id": str(chat_entry.id),
         "mother_id": mother.id,
         "mother_name": mother.name,
         "sender": "Patient",
-        "content": translated_text,
-        "is_urgent": priority == "RED",
-        "priority": priority,
+        "content": content,
+        "is_urgent": chat_entry.priority == "RED",
+        "priority": chat_entry.priority,
+        "translation_pending": translation_pending,
         "timestamp": str(chat_entry.timestamp)
-    })
-    
-    return {"status": "ok"}
+    }
 
 @router.post("/mother/{mother_id}/reply")
 async def send_reply(mother_id: str, request: Request, session: Session = Depends(get_session)):
@@ -222,7 +200,7 @@ async def send_reply(mother_id: str, request: Request, session: Session = Depend
     if not mother or not mother.telegram_id:
         return {"error": "Mother or Telegram ID not found"}
 
-    translated_reply = translate_from_english(content_english, mother.preferred_lang)
+    translated_reply = await translate_from_english(content_english, mother.preferred_lang)
     
     reply_entry = ChatMessage(
         mother_id=mother_id,
@@ -240,34 +218,118 @@ async def send_reply(mother_id: str, request: Request, session: Session = Depend
     
     return {"status": "sent", "content": translated_reply}
 
-def send_consultation_prescription_to_telegram(mother: MotherProfile, consultation: Consultation):
+async def send_consultation_prescription_to_telegram(mother: MotherProfile, consultation: Consultation):
     """
     Sends a formatted and translated prescription/consultation summary to the patient via Telegram.
+    Runs as a background task, so the instances passed in must be detached from their session.
     """
     if not mother.telegram_id:
         return
         
-    date_str = "Not scheduled"
-    if consultation.next_consultation_date:
-        date_str = consultation.next_consultation_date.strftime('%B %d, %Y')
-
-    summary_lines = [
-        f"Hello {mother.name}, here are the details from your recent doctor consultation:",
-        f"Health Status: {consultation.health_status or 'N/A'}",
-        f"Vitals: BP {consultation.systolic_bp}/{consultation.diastolic_bp}, Weight {consultation.weight_kg}kg"
+    # Boilerplate lines are translated as templates, so their translations are
+    # cached across mothers; only the free-text plans are new for each visit
+    segments = [
+        ("Hello {name}, here are the details from your recent doctor consultation:", {"name": mother.name}),
+        ("Health Status: {status}", {"status": consultation.health_status or "N/A"}),
+        ("Vitals: BP {systolic}/{diastolic}, Weight {weight}kg", {
+            "systolic": consultation.systolic_bp, "diastolic": consultation.diastolic_bp,
+            "weight": consultation.weight_kg
+        }),
     ]
-    
     if consultation.medication_plan:
-        summary_lines.append(f"\nMedication Plan:\n{consultation.medication_plan}")
-        
+        segments += [("Medication Plan:", {}), (consultation.medication_plan, None)]
     if consultation.nutrition_plan:
-        summary_lines.append(f"\nNutrition Plan:\n{consultation.nutrition_plan}")
-        
+        segments += [("Nutrition Plan:", {}), (consultation.nutrition_plan, None)]
     if consultation.next_consultation_date:
-        summary_lines.append(f"\nYour next visit is scheduled for: {date_str}")
-        
-    english_summary = "\n".join(summary_lines)
+        segments.append(("Your next visit is scheduled for: {date}", {
+            "date": consultation.next_consultation_date.strftime('%B %d, %Y')
+        }))
+
+    def render(texts: List[str]) -> str:
+        """
+        Fills the placeholders by plain replacement, since a translation may
+        contain other braces. Raises ValueError when one did not survive.
+        """
+        lines = []
+        for text, (source, values) in zip(texts, segments):
+            # Section headings and the next-visit line start a new paragraph
+            if values == {} or source.startswith("Your next visit"):
+                lines.append("")
+            for key, value in (values or {}).items():
+                placeholder = "{" + key + "}"
+                if placeholder not in text:
+                    raise ValueError(f"{placeholder} missing from {text!r}")
+                text = text.replace(placeholder, str(value))
+            lines.append(text)
+        return "\n".join(lines)
+
+    try:
+        lang = mother.preferred_lang
+        texts = [text for text, _ in segments]
+        message = render(texts)
+        if LANGUAGE_NAMES.get(lang, "English") != "English":
+            translated = await translator.translate(texts, lang)
+            try:
+                message = render(translated) if translated else _untranslated(message, lang)
+            except ValueError as e:
+                # Better the English prescription than none at all
+                print(f"Translated prescription could not be rendered, sending English: {e}")
+                message = _untranslated(message, lang)
+        send_telegram_message(mother.telegram_id, message)
+    except Exception as e:
+        print(f"Failed to send Telegram notification: {e}")
+
+class BroadcastInput(BaseModel):
+    message: str
+    mother_ids: Optional[List[str]] = None
+    asha_id: Optional[str] = None
+    doctor_id: Optional[str] = None
+
+async def deliver_broadcast(message: str, recipients_by_lang: dict):
+    """Translates the alert once per language, records it in each chat and fans it out."""
+    langs = list(recipients_by_lang)
+    translations = dict(zip(langs, await asyncio.gather(*[translate_from_english(message, lang) for lang in langs])))
+
+    def record():
+        with Session(engine) as session:
+            now = datetime.now()
+            session.add_all([
+                ChatMessage(mother_id=mother_id, sender="bot", raw_text=translations[lang],
+                            translated_text=message, is_voice=False, priority="GREEN", timestamp=now)
+                for lang, recipients in recipients_by_lang.items() for mother_id, _ in recipients
+            ])
+            session.commit()
+    await asyncio.to_thread(record)
+
+    result = await telegram_client.broadcast([
+        (chat_id, translations[lang])
+        for lang, recipients in recipients_by_lang.items() for _, chat_id in recipients
+    ])
+    print(f"Broadcast delivered to {result['sent']} chats, {len(result['failed'])} failed")
+
+@router.post("/telegram/broadcast", status_code=202)
+async def broadcast_message(payload: BroadcastInput, background_tasks: BackgroundTasks, session: Session = Depends(get_session)):
+    query = select(MotherProfile.id, MotherProfile.telegram_id, MotherProfile.preferred_lang).where(
+        MotherProfile.telegram_id.is_not(None)
+    )
+    if payload.mother_ids is not None:
+        query = query.where(MotherProfile.id.in_(payload.mother_ids))
+    if payload.asha_id:
+        query = query.where(MotherProfile.assigned_asha_id == payload.asha_id)
+    if payload.doctor_id:
+        query = query.where(MotherProfile.assigned_doctor_id == payload.doctor_id)
+
+    recipients_by_lang = defaultdict(list)
+    for mother_id, chat_id, lang in session.exec(query).all():
+        recipients_by_lang[lang or "en"].append((mother_id, chat_id))
 
-    translated_summary = translate_from_english(english_summary, mother.preferred_lang)
+    if recipients_by_lang:
+        background_tasks.add_task(deliver_broadcast, payload.message, dict(recipients_by_lang))
+    return {
+        "queued": sum(len(r) for r in recipients_by_lang.values()),
+        "languages": {lang: len(r) for lang, r in recipients_by_lang.items()}
+    }
 
-    send_telegram_message(mother.telegram_id, translated_summary)
+@router.get("/telegram/stats")
+def telegram_stats():
+    return telegram_client.stats()
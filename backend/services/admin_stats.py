@@ -0,0 +1,61 @@
+import os
+from typing import List, Optional, Tuple
+from sqlalchemy import func, case
+from sqlmodel import Session, select
+from models import MotherProfile, Doctor, AshaWorker
+from services.cache import TTLCache
+
+ADMIN_STATS_TTL = float(os.environ.get("ADMIN_STATS_TTL", "30"))
+
+# Keyed by the top-N size; assignments clear it so the console sees its own edits
+admin_stats_cache = TTLCache(maxsize=16, ttl=ADMIN_STATS_TTL)
+
+def workloads(session: Session, model, assigned_column, limit: Optional[int] = None) -> List[Tuple]:
+    """
+    Mothers assigned to each doctor or ASHA worker, busiest first, counted with
+    one outer-joined GROUP BY so staff without mothers are listed with zero.
+    """
+    count = func.count(MotherProfile.id).label("count")
+    query = (
+        select(model, count)
+        .join(MotherProfile, assigned_column == model.id, isouter=True)
+        .group_by(model.id)
+        .order_by(count.desc(), model.id)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return session.exec(query).all()
+
+def admin_stats(session: Session, top: int) -> dict:
+    cached = admin_stats_cache.get(top)
+    if cached is not None:
+        return cached
+
+    fully_assigned = case(
+        (MotherProfile.assigned_doctor_id.is_not(None) & MotherProfile.assigned_asha_id.is_not(None), 1),
+        else_=0
+    )
+    total_mothers, assigned, total_doctors, total_ashas = session.exec(select(
+        func.count(MotherProfile.id),
+        func.coalesce(func.sum(fully_assigned), 0),
+        select(func.count(Doctor.id)).scalar_subquery(),
+        select(func.count(AshaWorker.id)).scalar_subquery()
+    )).one()
+
+    stats = {
+        "total_mothers": total_mothers,
+        "total_doctors": total_doctors,
+        "total_ashas": total_ashas,
+        "fully_assigned": assigned,
+        "needs_assignment": total_mothers - assigned,
+        "doctor_workloads": [
+            {"id": d.id, "name": d.name, "count": n}
+            for d, n in workloads(session, Doctor, MotherProfile.assigned_doctor_id, top)
+        ],
+        "asha_workloads": [
+            {"id": a.id, "name": a.name, "count": n}
+            for a, n in workloads(session, AshaWorker, MotherProfile.assigned_asha_id, top)
+        ],
+    }
+    admin_stats_cache.set(top, stats)
+    return stats
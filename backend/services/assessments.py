@@ -0,0 +1,108 @@
+import json
+from typing import Optional
+from sqlmodel import Session
+from models import MotherProfile, AssessmentData, RiskAssessment, VitalsInput
+from agents.geospatial import get_environmental_data
+from services.environment import env_service, latest_tile_reading, snap_to_tile
+from services.latest_risk import record_assessments
+from services.flags import record_flags
+
+ENVIRONMENT_FIELDS = {"temperature_c", "heat_index", "aqi", "chemical_exposure"}
+
+def with_stored_environment(session: Session, mother: MotherProfile, vitals: VitalsInput,
+                            tile_readings: Optional[dict] = None) -> VitalsInput:
+    """
+    Vitals submitted without environment readings are scored against the latest
+    prefetched reading for the mother's tile, read through the geospatial tool.
+    Readings the client sent, and tiles with no recent reading, keep the
+    submitted values. Pass a dict as tile_readings to share lookups across a batch.
+    """
+    if vitals.model_fields_set & ENVIRONMENT_FIELDS:
+        return vitals
+    if tile_readings is None:
+        tile_readings = {}
+    tile = snap_to_tile(mother.latitude, mother.longitude, env_service.tile_degrees)
+    if tile not in tile_readings:
+        reading = latest_tile_reading(session, mother.latitude, mother.longitude)
+        tile_readings[tile] = reading and get_environmental_data.invoke({
+            "latitude": mother.latitude, "longitude": mother.longitude, "reading": reading.model_dump()
+        })
+    env = tile_readings[tile]
+    if not env:
+        return vitals
+    return vitals.model_copy(update={
+        "temperature_c": env["temperature_c"], "heat_index": env["heat_index"],
+        "aqi": env["aqi_pm25"], "chemical_exposure": env["chemical_exposure"]
+    })
+
+def orchestrator_kwargs(mother: MotherProfile, vitals: VitalsInput) -> dict:
+    """Maps a mother's profile and submitted vitals onto MatruKavachOrchestrator arguments."""
+    return {
+        "mother_id": mother.id,
+        "name": mother.name,
+        "lat": mother.latitude,
+        "lon": mother.longitude,
+        "bp_sys": vitals.systolic_bp,
+        "bp_dia": vitals.diastolic_bp,
+        "weight": vitals.weight_kg,
+        "hb": vitals.hemoglobin,
+        "glucose": vitals.glucose,
+        "gest_weeks": mother.gestational_age_weeks,
+        "extra_symptoms": vitals.extra_symptoms,
+        "temperature_c": vitals.temperature_c,
+        "heat_index": vitals.heat_index,
+        "aqi": vitals.aqi,
+        "toxins": vitals.chemical_exposure
+    }
+
+def persist_assessment(session: Session, mother: MotherProfile, vitals: VitalsInput, result: RiskAssessment) -> RiskAssessment:
+    """
+    Stores the submitted vitals and the orchestrator result in a single transaction.
+    """
+    assessment_data = AssessmentData(
+        mother_id=mother.id,
+        systolic_bp=vitals.systolic_bp,
+        diastolic_bp=vitals.diastolic_bp,
+        weight_kg=vitals.weight_kg,
+        hemoglobin=vitals.hemoglobin,
+        glucose=vitals.glucose,
+        heart_rate=vitals.heart_rate,
+        timestamp=result.timestamp
+    )
+    session.add(assessment_data)
+    session.flush()
+
+    result_db = RiskAssessment(
+        assessment_data_id=assessment_data.id,
+        mother_id=mother.id,
+        overall_risk_score=result.overall_risk_score,
+        risk_level=result.risk_level,
+        clinical_flags=json.dumps(result.clinical_flags),
+        environmental_flags=json.dumps(result.environmental_flags),
+        nutrition_advice=json.dumps(result.nutrition_advice),
+        medication_reminders=json.dumps(result.medication_reminders),
+        environmental_impact=result.environmental_impact,
+        clinical_justification=result.clinical_justification,
+        timestamp=result.timestamp
+    )
+    session.add(result_db)
+    session.flush()
+    record_assessments(session, [result_db])
+    record_flags(session, [result_db])
+    session.commit()
+    session.refresh(result_db)
+    return result_db
+
+def apply_guidance(session: Session, risk: RiskAssessment, result: RiskAssessment) -> RiskAssessment:
+    """
+    Fills the LLM-generated guidance from a full graph run into a stored
+    preliminary assessment. Scores and flags are deterministic and left untouched.
+    """
+    risk.nutrition_advice = json.dumps(result.nutrition_advice)
+    risk.medication_reminders = json.dumps(result.medication_reminders)
+    risk.environmental_impact = result.environmental_impact
+    risk.clinical_justification = result.clinical_justification
+    session.add(risk)
+    session.commit()
+    session.refresh(risk)
+    return risk
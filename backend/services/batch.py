@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import List, Tuple
+from pydantic import ValidationError
+from sqlmodel import Session, select
+from models import MotherProfile, AssessmentData, RiskAssessment, VitalsInput
+from agents.scoring import score_population, clinical_flag_lists, environmental_flag_lists, environmental_impact_strings
+from agents.nutrition import generate_nutrition_advice
+from services.assessments import orchestrator_kwargs, with_stored_environment
+from services.latest_risk import record_assessments
+from services.flags import record_flags
+
+BATCH_MAX_RECORDS = int(os.environ.get("BATCH_MAX_RECORDS", "1000"))
+
+def parse_vitals_csv(content: bytes) -> Tuple[List[Tuple[int, VitalsInput]], List[dict]]:
+    """
+    Reads a camp CSV whose header uses VitalsInput field names. Returns the valid
+    records with their 1-based data row number and an error entry for every row
+    that failed validation.
+    """
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    records, errors = [], []
+    for row_number, row in enumerate(reader, start=1):
+        values = {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip() != ""}
+        try:
+            records.append((row_number, VitalsInput.model_validate(values)))
+        except ValidationError as e:
+            errors.append({"row": row_number, "mother_id": values.get("mother_id"), "status": "error", "error": _describe(e)})
+    return records, errors
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+
+def assess_batch(session: Session, records: List[Tuple[int, VitalsInput]], job_queue=None) -> List[dict]:
+    """
+    Scores a batch of vitals in one vectorized pass, stores every assessment in a
+    single transaction and, when a job queue is given, queues the LLM guidance
+    for each stored assessment. Returns one result entry per input record.
+    """
+    mother_ids = {vitals.mother_id for _, vitals in records}
+    mothers = {
+        m.id: m for m in session.exec(select(MotherProfile).where(MotherProfile.id.in_(mother_ids))).all()
+    } if mother_ids else {}
+
+    results = {}
+    scored: List[Tuple[int, VitalsInput]] = []
+    tile_readings = {}
+    for row_number, vitals in records:
+        if vitals.mother_id in mothers:
+            scored.append((row_number, with_stored_environment(session, mothers[vitals.mother_id], vitals, tile_readings)))
+        else:
+            results[row_number] = {"row": row_number, "mother_id": vitals.mother_id, "status": "error", "error": "Mother not found"}
+
+    if scored:
+        vitals_list = [v for _, v in scored]
+        heat_index = [v.heat_index for v in vitals_list]
+        aqi = [v.aqi for v in vitals_list]
+        toxins = [v.chemical_exposure for v in vitals_list]
+        symptoms = [v.extra_symptoms or "" for v in vitals_list]
+
+        scores = score_population(
+            systolic_bp=[v.systolic_bp for v in vitals_list],
+            diastolic_bp=[v.diastolic_bp for v in vitals_list],
+            hemoglobin=[v.hemoglobin for v in vitals_list],
+            glucose=[v.glucose for v in vitals_list],
+            heat_index=heat_index, aqi=aqi, toxins=toxins,
+            extra_symptoms=symptoms
+        )
+        clinical_flags = clinical_flag_lists(scores, symptoms)
+        env_flags = environmental_flag_lists(scores, heat_index, aqi, toxins)
+        impacts = environmental_impact_strings(scores, heat_index, aqi)
+
+        now = datetime.now()
+        vitals_rows = [
+            AssessmentData(
+                mother_id=v.mother_id,
+                systolic_bp=v.systolic_bp,
+                diastolic_bp=v.diastolic_bp,
+                weight_kg=v.weight_kg,
+                hemoglobin=v.hemoglobin,
+                glucose=v.glucose,
+                heart_rate=v.heart_rate,
+                timestamp=now
+            )
+            for v in vitals_list
+        ]
+        session.add_all(vitals_rows)
+        session.flush()
+
+        risk_rows = []
+        for i, (v, data) in enumerate(zip(vitals_list, vitals_rows)):
+            base_advice = generate_nutrition_advice.invoke({
+                "clinical_flags": clinical_flags[i] + env_flags[i],
+                "weather_condition": f"Temp: {v.temperature_c}, AQI: {v.aqi}, Toxins: {v.chemical_exposure}"
+            })
+            risk_rows.append(RiskAssessment(
+                assessment_data_id=data.id,
+                mother_id=v.mother_id,
+                overall_risk_score=round(float(scores["final_score"][i]), 1),
+                risk_level=scores["risk_level"][i],
+                clinical_flags=json.dumps(clinical_flags[i]),
+                environmental_flags=json.dumps(env_flags[i]),
+                nutrition_advice=json.dumps({"Preliminary Guidance": base_advice}),
+                medication_reminders=json.dumps([]),
+                environmental_impact=impacts[i],
+                timestamp=now
+            ))
+        session.add_all(risk_rows)
+        session.flush()
+        record_assessments(session, risk_rows)
+        record_flags(session, risk_rows)
+
+        # Read generated ids before commit expires the instances, avoiding a reload per row
+        stored = [
+            (row_number, v, risk.id, risk.assessment_data_id, risk.overall_risk_score, risk.risk_level,
+             orchestrator_kwargs(mothers[v.mother_id], v))
+            for (row_number, v), risk in zip(scored, risk_rows)
+        ]
+        session.commit()
+
+        for i, (row_number, v, risk_id, data_id, score, level, params) in enumerate(stored):
+            job = None
+            if job_queue is not None:
+                job = job_queue.submit(risk_id, v.mother_id, params)
+            results[row_number] = {
+                "row": row_number,
+                "mother_id": v.mother_id,
+                "status": "ok",
+                "risk_assessment_id": risk_id,
+                "assessment_data_id": data_id,
+                "overall_risk_score": score,
+                "risk_level": level,
+                "clinical_flags": clinical_flags[i],
+                "environmental_flags": env_flags[i],
+                "job_id": job.job_id if job else None
+            }
+
+    return [results[row_number] for row_number, _ in records]
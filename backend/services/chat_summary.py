@@ -0,0 +1,198 @@
+import asyncio
+import os
+import weakref
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlmodel import Session, select
+from database import engine
+from models import ChatMessage, ChatSummary
+from agents.llm import key_pool, generate_text
+
+CHAT_SUMMARY_WINDOW_DAYS = int(os.environ.get("CHAT_SUMMARY_WINDOW_DAYS", "14"))
+# Incremental updates never forget anything, so the summary is periodically
+# rebuilt from the window alone to let old events age out
+CHAT_SUMMARY_REBUILD_DAYS = int(os.environ.get("CHAT_SUMMARY_REBUILD_DAYS", "7"))
+
+NO_HISTORY = "No recent chat history found."
+NOT_CONFIGURED = "AI model not configured for summary generation (no keys found)."
+
+def _format(messages: List[ChatMessage]) -> str:
+    lines = []
+    for msg in messages:
+        sender = "Mother" if msg.sender == "Patient" else msg.sender
+        text = msg.translated_text if msg.translated_text else msg.raw_text
+        lines.append(f"[{msg.timestamp.strftime('%Y-%m-%d %H:%M')}] {sender}: {text}")
+    return "\n".join(lines)
+
+class ChatSummaryService:
+    """
+    Rolling per-mother chat summaries stored in the ChatSummary table.
+
+    Each summary records the highest message id it covers. Opening a summary
+    with no newer messages is a database read; otherwise Gemini updates the
+    stored summary with only the new messages instead of re-reading the whole
+    window. Work for one mother is serialized, so a doctor opening a summary
+    while a RED message is being summarized waits for that result instead of
+    paying for a second call.
+    """
+
+    def __init__(self, window_days: int = CHAT_SUMMARY_WINDOW_DAYS, rebuild_days: int = CHAT_SUMMARY_REBUILD_DAYS):
+        self.window = timedelta(days=window_days)
+        self.rebuild_after = timedelta(days=rebuild_days)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._pending = set()
+        self._tasks = set()
+        self.cached = 0
+        self.incremental = 0
+        self.rebuilds = 0
+        self.failures = 0
+
+    def _lock(self, mother_id: str) -> asyncio.Lock:
+        lock = self._locks.get(mother_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[mother_id] = lock
+        return lock
+
+    async def get(self, mother_id: str) -> dict:
+        async with self._lock(mother_id):
+            return await self._refresh(mother_id)
+
+    def schedule_refresh(self, mother_id: str):
+        """Brings the summary up to date in the background, e.g. after a RED message."""
+        if mother_id in self._pending:
+            return  # the queued refresh has not read the messages yet, so it will include this one
+        self._pending.add(mother_id)
+        task = asyncio.create_task(self._background_refresh(mother_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _background_refresh(self, mother_id: str):
+        async with self._lock(mother_id):
+            self._pending.discard(mother_id)
+            try:
+                await self._refresh(mother_id)
+            except Exception as e:
+                print(f"Background chat summary for {mother_id} failed: {e}")
+
+    async def _refresh(self, mother_id: str) -> dict:
+        now = datetime.now()
+        window_start = now - self.window
+        stored, latest_id = await asyncio.to_thread(self._load, mother_id, window_start)
+        if latest_id is None:
+            return {"summary": NO_HISTORY, "last_message_id": None, "updated_at": None, "cached": False}
+
+        rebuild = stored is None or stored.rebuilt_at < now - self.rebuild_after
+        if stored and not rebuild and stored.last_message_id >= latest_id:
+            self.cached += 1
+            return self._payload(stored, cached=True)
+        if not key_pool.keys:
+            return self._payload(stored, cached=True) if stored else \
+                {"summary": NOT_CONFIGURED, "last_message_id": None, "updated_at": None, "cached": False}
+
+        after_id = 0 if rebuild else stored.last_message_id
+        messages = await asyncio.to_thread(self._messages, mother_id, window_start, after_id)
+        try:
+            if rebuild:
+                summary = await generate_text(self._full_prompt(messages))
+            else:
+                summary = await generate_text(self._update_prompt(stored.summary, messages))
+        except Exception as e:
+            self.failures += 1
+            print(f"Summary generation failed: {e}")
+            if stored:
+                return {**self._payload(stored, cached=True), "stale": True}
+            return {"summary": f"Failed to generate summary due to an AI error: {e}",
+                    "last_message_id": None, "updated_at": None, "cached": False}
+
+        if rebuild:
+            self.rebuilds += 1
+        else:
+            self.incremental += 1
+        stored = await asyncio.to_thread(
+            self._save, mother_id, summary.strip(), messages[-1].id,
+            now if rebuild else stored.rebuilt_at
+        )
+        return self._payload(stored, cached=False)
+
+    @staticmethod
+    def _full_prompt(messages: List[ChatMessage]) -> str:
+        return f"""
+        You are an AI assisting a doctor. Please provide a brief, clinical summary of the following chat history from the past two weeks between a pregnant mother and an ASHA worker/bot.
+        Focus on symptoms reported, emergencies, overall tone, and any concerns raised. Keep the summary concise (1-2 paragraphs). Let it be direct.
+
+        Chat History:
+        {_format(messages)}
+        """
+
+    @staticmethod
+    def _update_prompt(summary: str, messages: List[ChatMessage]) -> str:
+        return f"""
+        You are an AI assisting a doctor. Below is your existing clinical summary of the recent chat between a pregnant mother and an ASHA worker/bot, followed by messages sent since it was written.
+        Rewrite the summary to take the new messages into account. Keep earlier symptoms, emergencies and concerns unless the new messages resolve them, and call out anything new or worsening. Keep the summary concise (1-2 paragraphs). Let it be direct.
+
+        Existing Summary:
+        {summary}
+
+        New Messages:
+        {_format(messages)}
+        """
+
+    @staticmethod
+    def _payload(stored: ChatSummary, cached: bool) -> dict:
+        return {
+            "summary": stored.summary,
+            "last_message_id": stored.last_message_id,
+            "updated_at": stored.updated_at,
+            "cached": cached,
+        }
+
+    @staticmethod
+    def _load(mother_id: str, window_start: datetime) -> Tuple[Optional[ChatSummary], Optional[int]]:
+        with Session(engine) as session:
+            stored = session.get(ChatSummary, mother_id)
+            latest_id = session.exec(
+                select(func.max(ChatMessage.id))
+                .where(ChatMessage.mother_id == mother_id, ChatMessage.timestamp >= window_start)
+            ).one()
+            return stored, latest_id
+
+    @staticmethod
+    def _messages(mother_id: str, window_start: datetime, after_id: int) -> List[ChatMessage]:
+        with Session(engine) as session:
+            return session.exec(
+                select(ChatMessage)
+                .where(ChatMessage.mother_id == mother_id, ChatMessage.timestamp >= window_start,
+                       ChatMessage.id > after_id)
+                .order_by(ChatMessage.id)
+            ).all()
+
+    @staticmethod
+    def _save(mother_id: str, summary: str, last_message_id: int, rebuilt_at: datetime) -> ChatSummary:
+        with Session(engine) as session:
+            stored = session.get(ChatSummary, mother_id)
+            # Another worker may have summarized further while this call was running
+            if stored and stored.last_message_id > last_message_id:
+                return stored
+            stored = stored or ChatSummary(mother_id=mother_id, summary=summary,
+                                           last_message_id=last_message_id, rebuilt_at=rebuilt_at)
+            stored.summary = summary
+            stored.last_message_id = last_message_id
+            stored.rebuilt_at = rebuilt_at
+            stored.updated_at = datetime.now()
+            session.add(stored)
+            session.commit()
+            session.refresh(stored)
+            return stored
+
+    def stats(self) -> dict:
+        return {
+            "cached": self.cached,
+            "incremental": self.incremental,
+            "rebuilds": self.rebuilds,
+            "failures": self.failures,
+            "pending": len(self._pending),
+        }
+
+chat_summaries = ChatSummaryService()
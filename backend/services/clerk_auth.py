@@ -0,0 +1,49 @@
+import os
+from typing import Optional, Tuple
+import jwt
+
+# Clerk session tokens are RS256 JWTs. CLERK_JWT_KEY (the PEM public key shown
+# in the Clerk dashboard) verifies them without a network call; otherwise the
+# signing keys are fetched from CLERK_JWKS_URL and cached.
+CLERK_JWT_KEY = os.environ.get("CLERK_JWT_KEY", "").replace("\\n", "\n")
+CLERK_JWKS_URL = os.environ.get("CLERK_JWKS_URL", "")
+# Dashboard origins accepted in the token's azp claim, e.g. https://dashboard.example.org
+CLERK_AUTHORIZED_PARTIES = [p.strip() for p in os.environ.get("CLERK_AUTHORIZED_PARTIES", "").split(",") if p.strip()]
+CLERK_CLOCK_SKEW = 5
+
+STAFF_ROLES = ("admin", "asha", "doctor")
+
+class AuthError(Exception):
+    pass
+
+_jwks_client = jwt.PyJWKClient(CLERK_JWKS_URL, cache_keys=True) if CLERK_JWKS_URL else None
+
+def auth_configured() -> bool:
+    return bool(CLERK_JWT_KEY or _jwks_client)
+
+def verify_session_token(token: Optional[str]) -> dict:
+    """Returns the token's claims. May fetch the JWKS, so call it off the event loop."""
+    if not token:
+        raise AuthError("missing session token")
+    try:
+        key = CLERK_JWT_KEY or _jwks_client.get_signing_key_from_jwt(token).key
+        claims = jwt.decode(token, key, algorithms=["RS256"], leeway=CLERK_CLOCK_SKEW,
+                            options={"require": ["exp", "sub"]})
+    except jwt.PyJWTError as e:
+        raise AuthError(str(e))
+    if CLERK_AUTHORIZED_PARTIES and claims.get("azp") not in CLERK_AUTHORIZED_PARTIES:
+        raise AuthError(f"token issued for {claims.get('azp')}")
+    return claims
+
+def staff_scope(claims: dict) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (role, staff_id) from the user's Clerk public metadata, e.g.
+    {"role": "asha", "staff_id": "ASHA-01"}. The session token template must
+    expose it as {"metadata": "{{user.public_metadata}}"}. Users without a
+    staff role get (None, None).
+    """
+    metadata = claims.get("metadata") or {}
+    role = metadata.get("role")
+    if role not in STAFF_ROLES:
+        return None, None
+    return role, metadata.get("staff_id")
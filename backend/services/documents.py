@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from sqlmodel import Session, select
+from database import engine
+from models import Document
+
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "data/uploads")
+DOCUMENT_MAX_BYTES = int(os.environ.get("DOCUMENT_MAX_BYTES", str(25 * 1024 * 1024)))
+DOCUMENT_CHUNK_BYTES = 1024 * 1024
+# Types browsers may render in place; anything else is served as a download,
+# since the stored type comes from the uploading client
+INLINE_CONTENT_TYPES = {"application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp"}
+
+def inline_content_type(content_type: Optional[str]) -> Optional[str]:
+    """The normalized type when it is safe to serve inline, else None."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return media_type if media_type in INLINE_CONTENT_TYPES else None
+
+class DocumentStore:
+    """
+    Content-addressed file store for uploaded documents.
+
+    Uploads are streamed to a temporary file in chunks while being hashed, so
+    a large scan never sits in memory, and are then renamed to
+    objects/<sha256[:2]>/<sha256>. Identical files, even for different
+    mothers, share one object; Document rows keep the per-mother name and
+    type. An upload over max_bytes is rejected with 413 as soon as it crosses
+    the limit; routers.documents also rejects oversized request bodies before
+    they are parsed.
+    """
+
+    def __init__(self, root: str = UPLOAD_DIR, max_bytes: int = DOCUMENT_MAX_BYTES,
+                 chunk_bytes: int = DOCUMENT_CHUNK_BYTES):
+        self.objects_dir = os.path.join(root, "objects")
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes
+        self.stored = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.bytes_written = 0
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    async def save(self, upload: UploadFile) -> Tuple[str, int, str]:
+        """Streams the upload into the store and returns (sha256, size, path)."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := await upload.read(self.chunk_bytes):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise self.too_large()
+                    digest.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+            sha256 = digest.hexdigest()
+            return sha256, size, await asyncio.to_thread(self._commit, tmp_path, sha256, size)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def too_large(self) -> HTTPException:
+        self.rejected += 1
+        return HTTPException(status_code=413, detail=f"Document exceeds the {self.max_bytes // (1024 * 1024)} MB limit")
+
+    def _commit(self, tmp_path: str, sha256: str, size: int) -> str:
+        path = self.object_path(sha256)
+        if os.path.exists(path):
+            self.deduplicated += 1
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomic, so a concurrent upload of the same file just replaces identical bytes
+        os.replace(tmp_path, path)
+        self.stored += 1
+        self.bytes_written += size
+        return path
+
+    def import_legacy(self) -> int:
+        """
+        Moves files uploaded before the store existed ({mother_id}_{name} in
+        the upload root) into it and records their hash and size. Returns the
+        number of Document rows updated.
+        """
+        imported = 0
+        moved = {}  # rows that overwrote each other share one legacy file
+        with Session(engine) as session:
+            documents = session.exec(select(Document).where(Document.sha256.is_(None))).all()
+            for doc in documents:
+                legacy_path = doc.file_path
+                if legacy_path not in moved:
+                    if not os.path.isfile(legacy_path):
+                        print(f"Document {doc.id}: {legacy_path} is missing, skipped")
+                        continue
+                    digest = hashlib.sha256()
+                    with open(legacy_path, "rb") as f:
+                        while chunk := f.read(self.chunk_bytes):
+                            digest.update(chunk)
+                    sha256 = digest.hexdigest()
+                    size = os.path.getsize(legacy_path)
+                    path = self.object_path(sha256)
+                    if os.path.exists(path):
+                        os.remove(legacy_path)
+                    else:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        os.replace(legacy_path, path)
+                    moved[legacy_path] = (sha256, size, path)
+                doc.sha256, doc.size_bytes, doc.file_path = moved[legacy_path]
+                session.add(doc)
+                imported += 1
+            session.commit()
+        return imported
+
+    def stats(self) -> dict:
+        return {
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "bytes_written": self.bytes_written,
+            "max_bytes": self.max_bytes,
+        }
+
+document_store = DocumentStore()
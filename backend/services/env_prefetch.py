@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, and_
+from sqlmodel import Session, select
+from database import engine
+from models import MotherProfile, EnvironmentReading, EnvironmentAffected
+from agents.graph import PlanetaryIntelligence, environment_multiplier
+from services.environment import env_service, snap_to_tile, Tile, ENV_READING_MAX_AGE_HOURS
+from services.rescoring import latest_vitals, rescore
+from socket_instance import sio, ADMIN_ROOM, ALL_ROOM
+
+# Off by default: enable it on exactly one process, or every worker fetches and alerts
+ENV_PREFETCH_ENABLED = os.environ.get("ENV_PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes")
+ENV_PREFETCH_INTERVAL = int(os.environ.get("ENV_PREFETCH_INTERVAL", "1800"))
+ENV_PREFETCH_CONCURRENCY = int(os.environ.get("ENV_PREFETCH_CONCURRENCY", "8"))
+
+HIGH_RISK_LEVELS = ("HIGH", "CRITICAL")
+
+class EnvironmentPrefetcher:
+    """
+    Periodically fetches environment readings once per tile that has registered
+    mothers and appends them, with each tile's mother and high-risk counts, to
+    the EnvironmentReading time series that the regional heatmap is read from.
+
+    When a tile's risk multiplier changes, the mothers in it are rescored in one
+    vectorized pass and those whose risk level would rise are published as an
+    "environment_alert" event and stored for affected(). Only one worker process
+    should run the loop (ENV_PREFETCH_ENABLED); heatmap() and affected() read
+    the database, so every worker serves the same data.
+    """
+
+    def __init__(self, interval: int = ENV_PREFETCH_INTERVAL, concurrency: int = ENV_PREFETCH_CONCURRENCY):
+        self.interval = interval
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(self):
+        if ENV_PREFETCH_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @staticmethod
+    def heatmap(session: Session, max_age_hours: int = ENV_READING_MAX_AGE_HOURS) -> dict:
+        """The newest reading of every tile fetched in the last max_age_hours, riskiest first."""
+        latest = (
+            select(EnvironmentReading.tile_lat, EnvironmentReading.tile_lon,
+                   func.max(EnvironmentReading.fetched_at).label("latest"))
+            .where(EnvironmentReading.fetched_at >= datetime.now() - timedelta(hours=max_age_hours))
+            .group_by(EnvironmentReading.tile_lat, EnvironmentReading.tile_lon)
+            .subquery()
+        )
+        readings = session.exec(
+            select(EnvironmentReading)
+            .join(latest, and_(
+                EnvironmentReading.tile_lat == latest.c.tile_lat,
+                EnvironmentReading.tile_lon == latest.c.tile_lon,
+                EnvironmentReading.fetched_at == latest.c.latest
+            ))
+            .order_by(EnvironmentReading.risk_multiplier.desc(), EnvironmentReading.heat_index.desc())
+        ).all()
+        return {
+            "generated_at": max((r.fetched_at for r in readings), default=None),
+            "tiles": [
+                {
+                    "lat": r.tile_lat, "lon": r.tile_lon,
+                    "temperature_c": r.temperature_c, "heat_index": r.heat_index,
+                    "aqi_pm25": r.aqi, "chemical_exposure": r.chemical_exposure,
+                    "risk_multiplier": r.risk_multiplier,
+                    "mother_count": r.mother_count,
+                    "high_risk_count": r.high_risk_count,
+                }
+                for r in readings
+            ]
+        }
+
+    @staticmethod
+    def affected(session: Session) -> dict:
+        latest = session.exec(select(EnvironmentAffected).order_by(EnvironmentAffected.generated_at.desc())).first()
+        if latest is None:
+            return {"generated_at": None, "changed_tiles": [], "escalated": []}
+        return {
+            "generated_at": latest.generated_at,
+            "changed_tiles": json.loads(latest.changed_tiles),
+            "escalated": json.loads(latest.escalated),
+        }
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Environment prefetch failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> dict:
+        async with self._lock:
+            mothers_by_tile = await asyncio.to_thread(self._mothers_by_tile)
+            previous = await asyncio.to_thread(self._previous_multipliers)
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(tile: Tile):
+                async with semaphore:
+                    return tile, await env_service.get(*tile)
+
+            readings = {}
+            for tile, reading in await asyncio.gather(*[fetch(tile) for tile in mothers_by_tile]):
+                # Fallback or stale readings would pollute the time series and raise false alerts
+                if not reading.get("stale"):
+                    readings[tile] = reading
+
+            multipliers = {
+                tile: environment_multiplier(PlanetaryIntelligence(
+                    temperature_c=r["temperature_c"], heat_index=r["heat_index"],
+                    aqi=r["aqi_pm25"], toxins=r["chemical_exposure"]
+                ))
+                for tile, r in readings.items()
+            }
+            changed = [tile for tile, m in multipliers.items() if tile in previous and previous[tile] != m]
+
+            now = datetime.now()
+            rows = await asyncio.to_thread(self._load_vitals)
+
+            tile_of = {mother_id: tile for tile, ids in mothers_by_tile.items() for mother_id in ids}
+            high_risk = defaultdict(int)
+            for row in rows:
+                if row.risk_level in HIGH_RISK_LEVELS:
+                    high_risk[tile_of.get(row.mother_id)] += 1
+
+            changed_set = set(changed)
+            affected_rows = [row for row in rows if tile_of.get(row.mother_id) in changed_set]
+            escalated = []
+            if affected_rows:
+                env = [readings[tile_of[row.mother_id]] for row in affected_rows]
+                result = rescore(
+                    affected_rows,
+                    heat_index=[r["heat_index"] for r in env],
+                    aqi=[r["aqi_pm25"] for r in env],
+                    toxins=[r["chemical_exposure"] for r in env],
+                    limit=len(affected_rows)
+                )
+                escalated = result["escalated"]
+
+            affected = {
+                "generated_at": now.isoformat(),
+                "changed_tiles": [
+                    {"lat": t[0], "lon": t[1], "previous_multiplier": previous[t], "risk_multiplier": multipliers[t]}
+                    for t in changed
+                ],
+                "escalated": escalated,
+            }
+            await asyncio.to_thread(self._store, readings, multipliers, mothers_by_tile, high_risk, affected, now)
+            if escalated:
+                # Lists mothers from every care team, so only admins receive it
+                await sio.emit("environment_alert", affected, to=[ADMIN_ROOM, ALL_ROOM])
+            return affected
+
+    @staticmethod
+    def _mothers_by_tile() -> Dict[Tile, List[str]]:
+        with Session(engine) as session:
+            rows = session.exec(select(MotherProfile.id, MotherProfile.latitude, MotherProfile.longitude)).all()
+        tiles = defaultdict(list)
+        for mother_id, lat, lon in rows:
+            tiles[snap_to_tile(lat, lon, env_service.tile_degrees)].append(mother_id)
+        return tiles
+
+    @staticmethod
+    def _previous_multipliers() -> Dict[Tile, float]:
+        with Session(engine) as session:
+            latest = (
+                select(EnvironmentReading.tile_lat, EnvironmentReading.tile_lon,
+                       func.max(EnvironmentReading.fetched_at).label("latest"))
+                .group_by(EnvironmentReading.tile_lat, EnvironmentReading.tile_lon)
+                .subquery()
+            )
+            rows = session.exec(
+                select(EnvironmentReading.tile_lat, EnvironmentReading.tile_lon, EnvironmentReading.risk_multiplier)
+                .join(latest, and_(
+                    EnvironmentReading.tile_lat == latest.c.tile_lat,
+                    EnvironmentReading.tile_lon == latest.c.tile_lon,
+                    EnvironmentReading.fetched_at == latest.c.latest
+                ))
+            ).all()
+        return {(lat, lon): multiplier for lat, lon, multiplier in rows}
+
+    @staticmethod
+    def _load_vitals() -> list:
+        with Session(engine) as session:
+            return latest_vitals(session)
+
+    @staticmethod
+    def _store(readings: Dict[Tile, dict], multipliers: Dict[Tile, float], mothers_by_tile: Dict[Tile, List[str]],
+               high_risk: Dict[Tile, int], affected: dict, now: datetime):
+        with Session(engine) as session:
+            session.add_all([
+                EnvironmentReading(
+                    tile_lat=tile[0], tile_lon=tile[1],
+                    temperature_c=r["temperature_c"], heat_index=r["heat_index"],
+                    aqi=r["aqi_pm25"], chemical_exposure=r["chemical_exposure"],
+                    risk_multiplier=multipliers[tile],
+                    mother_count=len(mothers_by_tile[tile]),
+                    high_risk_count=high_risk[tile],
+                    fetched_at=now
+                )
+                for tile, r in readings.items()
+            ])
+            # Only the latest run's list is served
+            session.execute(delete(EnvironmentAffected))
+            session.add(EnvironmentAffected(
+                generated_at=now,
+                changed_tiles=json.dumps(affected["changed_tiles"]),
+                escalated=json.dumps(affected["escalated"])
+            ))
+            session.commit()
+
+env_prefetcher = EnvironmentPrefetcher()
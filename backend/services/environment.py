@@ -0,0 +1,148 @@
+import asyncio
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import httpx
+from sqlmodel import Session, select
+from models import EnvironmentReading
+from services.cache import TTLCache
+
+# ~5.5 km at the equator; mothers in the same ward share one Open-Meteo grid cell
+ENV_TILE_DEGREES = float(os.environ.get("ENV_TILE_DEGREES", "0.05"))
+ENV_CACHE_TTL = int(os.environ.get("ENV_CACHE_TTL", "900"))
+ENV_CACHE_SIZE = int(os.environ.get("ENV_CACHE_SIZE", "2048"))
+ENV_HTTP_TIMEOUT = float(os.environ.get("ENV_HTTP_TIMEOUT", "5"))
+# Stored prefetch readings older than this are not used for assessments or the heatmap
+ENV_READING_MAX_AGE_HOURS = int(os.environ.get("ENV_READING_MAX_AGE_HOURS", "6"))
+OPEN_METEO_FORECAST_URL = os.environ.get("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+OPEN_METEO_AIR_QUALITY_URL = os.environ.get("OPEN_METEO_AIR_QUALITY_URL", "https://air-quality-api.open-meteo.com/v1/air-quality")
+
+FALLBACK_READING = {
+    "temperature_c": 32.0, "heat_index": 34.0, "aqi_pm25": 120, "chemical_exposure": 4.5, "weather_condition": "Unknown"
+}
+
+Tile = Tuple[float, float]
+
+def snap_to_tile(lat: float, lon: float, tile_degrees: float = ENV_TILE_DEGREES) -> Tile:
+    """Returns the centre of the grid tile containing the coordinates."""
+    def centre(value: float) -> float:
+        return round(math.floor(value / tile_degrees) * tile_degrees + tile_degrees / 2, 6)
+    return centre(lat), centre(lon)
+
+class EnvironmentService:
+    """
+    Fetches current weather and air quality from Open-Meteo per grid tile.
+
+    Readings are cached per tile with a TTL and LRU bound, both upstream APIs are
+    queried concurrently over one pooled client, concurrent requests for the same
+    tile share a single fetch, and the last good reading is served (marked
+    stale) while the upstream is failing.
+    """
+
+    def __init__(self, forecast_url: str = OPEN_METEO_FORECAST_URL,
+                 air_quality_url: str = OPEN_METEO_AIR_QUALITY_URL,
+                 tile_degrees: float = ENV_TILE_DEGREES, ttl: int = ENV_CACHE_TTL,
+                 maxsize: int = ENV_CACHE_SIZE, timeout: float = ENV_HTTP_TIMEOUT):
+        self.forecast_url = forecast_url
+        self.air_quality_url = air_quality_url
+        self.tile_degrees = tile_degrees
+        self.timeout = timeout
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[Tile, asyncio.Task] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, lat: float, lon: float) -> dict:
+        tile = snap_to_tile(lat, lon, self.tile_degrees)
+        reading = self.cache.get(tile)
+        if reading is not None:
+            return reading
+
+        task = self._inflight.get(tile)
+        if task is None:
+            task = asyncio.create_task(self._fetch(tile))
+            self._inflight[tile] = task
+            task.add_done_callback(lambda _: self._inflight.pop(tile, None))
+
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            self.upstream_errors += 1
+            print(f"Error fetching open-meteo for tile {tile}: {e}")
+            stale = self.cache.get_stale(tile)
+            if stale is not None:
+                return {**stale, "stale": True}
+            return {**FALLBACK_READING, "tile": {"lat": tile[0], "lon": tile[1]}, "stale": True}
+
+    async def _fetch(self, tile: Tile) -> dict:
+        lat, lon = tile
+        self.upstream_calls += 1
+        weather_res, aqi_res = await asyncio.gather(
+            self.client.get(self.forecast_url, params={
+                "latitude": lat, "longitude": lon,
+                "current": "temperature_2m,apparent_temperature,weather_code"
+            }),
+            self.client.get(self.air_quality_url, params={
+                "latitude": lat, "longitude": lon,
+                "current": "us_aqi,pm2_5"
+            })
+        )
+        weather_res.raise_for_status()
+        aqi_res.raise_for_status()
+
+        current_weather = weather_res.json().get("current", {})
+        temp = current_weather.get("temperature_2m", 30)
+        heat_index = current_weather.get("apparent_temperature", temp)
+        aqi = aqi_res.json().get("current", {}).get("pm2_5", 50)
+        toxin = min(round(aqi * 0.05, 1), 10.0)
+
+        reading = {
+            "temperature_c": temp,
+            "heat_index": heat_index,
+            "aqi_pm25": aqi,
+            "chemical_exposure": toxin,
+            "weather_condition": "Clear or fetched",
+            "tile": {"lat": lat, "lon": lon},
+            "fetched_at": datetime.now().isoformat(),
+            "stale": False
+        }
+        self.cache.set(tile, reading)
+        return reading
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "upstream_calls": self.upstream_calls,
+            "upstream_errors": self.upstream_errors,
+            "inflight": len(self._inflight),
+        }
+
+env_service = EnvironmentService()
+
+def latest_tile_reading(session: Session, latitude: float, longitude: float,
+                        max_age_hours: int = ENV_READING_MAX_AGE_HOURS) -> Optional[EnvironmentReading]:
+    """The newest stored reading for the location's tile, if one is recent enough."""
+    tile_lat, tile_lon = snap_to_tile(latitude, longitude, env_service.tile_degrees)
+    return session.exec(
+        select(EnvironmentReading)
+        .where(EnvironmentReading.tile_lat == tile_lat)
+        .where(EnvironmentReading.tile_lon == tile_lon)
+        .where(EnvironmentReading.fetched_at >= datetime.now() - timedelta(hours=max_age_hours))
+        .order_by(EnvironmentReading.fetched_at.desc())
+    ).first()
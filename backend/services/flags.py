@@ -0,0 +1,92 @@
+import json
+from datetime import datetime
+from typing import Iterable, Optional
+from fastapi import HTTPException
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+from database import engine
+from models import MotherProfile, RiskAssessment, RiskFlag
+from agents.scoring import FlagBit, flag_bit
+
+BACKFILL_BATCH_SIZE = 1000
+
+def parse_flag_code(code: str) -> str:
+    try:
+        return FlagBit[code.strip().upper()].name
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown flag code: {code}. Expected one of: {', '.join(b.name for b in FlagBit)}")
+
+def _flag_rows(risk: RiskAssessment):
+    seen = set()
+    for column in (risk.clinical_flags, risk.environmental_flags):
+        try:
+            labels = json.loads(column or "[]")
+        except ValueError:
+            continue
+        for label in labels:
+            bit = flag_bit(str(label))
+            # The graph copies environmental flags into clinical_flags too
+            if bit is None or bit in seen:
+                continue
+            seen.add(bit)
+            yield RiskFlag(risk_assessment_id=risk.id, mother_id=risk.mother_id, code=bit.name,
+                           detail=str(label), assessed_at=risk.timestamp)
+
+def record_flags(session: Session, risks: Iterable[RiskAssessment]):
+    """Stages the flag rows of freshly flushed assessments; the caller commits."""
+    session.add_all([flag for risk in risks for flag in _flag_rows(risk)])
+
+def forget_flags(session: Session, risk_assessment_id: int):
+    session.execute(delete(RiskFlag).where(RiskFlag.risk_assessment_id == risk_assessment_id))
+
+def flag_query(code: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None,
+               location: Optional[str] = None, asha_id: Optional[str] = None, doctor_id: Optional[str] = None):
+    query = select(RiskFlag, MotherProfile.name, MotherProfile.location).join(
+        MotherProfile, MotherProfile.id == RiskFlag.mother_id
+    )
+    if code:
+        query = query.where(RiskFlag.code == parse_flag_code(code))
+    if since:
+        query = query.where(RiskFlag.assessed_at >= since)
+    if until:
+        query = query.where(RiskFlag.assessed_at < until)
+    if location:
+        query = query.where(func.lower(MotherProfile.location) == location.lower())
+    if asha_id:
+        query = query.where(MotherProfile.assigned_asha_id == asha_id)
+    if doctor_id:
+        query = query.where(MotherProfile.assigned_doctor_id == doctor_id)
+    return query
+
+def flag_counts(session: Session, **filters) -> dict:
+    """Assessments and distinct mothers per flag code, for district reports."""
+    counted = flag_query(**filters).subquery()
+    rows = session.exec(
+        select(counted.c.code, func.count(), func.count(func.distinct(counted.c.mother_id)))
+        .group_by(counted.c.code)
+    ).all()
+    return {code: {"assessments": assessments, "mothers": mothers} for code, assessments, mothers in rows}
+
+def backfill() -> int:
+    """
+    Creates flag rows for assessments stored before RiskFlag existed, reading
+    the JSON columns in batches. Assessments with no recognised flags are
+    re-read on every run, so this belongs in migrate_db.py, not startup.
+    """
+    converted = 0
+    last_id = 0
+    with Session(engine) as session:
+        while True:
+            risks = session.exec(
+                select(RiskAssessment)
+                .where(RiskAssessment.id > last_id)
+                .where(~select(RiskFlag.id).where(RiskFlag.risk_assessment_id == RiskAssessment.id).exists())
+                .order_by(RiskAssessment.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not risks:
+                return converted
+            last_id = risks[-1].id
+            record_flags(session, risks)
+            session.commit()
+            converted += len(risks)
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from sqlmodel import Session
+from database import engine
+from models import MotherProfile, RiskAssessment
+from socket_instance import sio, mother_rooms
+from services.assessments import apply_guidance
+
+ASSESSMENT_WORKERS = int(os.environ.get("ASSESSMENT_WORKERS", "4"))
+ASSESSMENT_JOB_TTL = int(os.environ.get("ASSESSMENT_JOB_TTL", "3600"))
+
+class AssessmentJob(BaseModel):
+    job_id: str
+    mother_id: str
+    risk_assessment_id: int
+    status: str = "queued"  # queued -> running -> completed | failed
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    params: Dict[str, Any] = Field(default_factory=dict, exclude=True)
+
+class AssessmentJobQueue:
+    """
+    Runs the LLM guidance step of assessments in a pool of background workers.
+
+    The deterministic score is stored before a job is queued, so a job only has
+    to fill in the Gemini reasoning trace. When it finishes the updated
+    RiskAssessment is pushed to dashboards as an "assessment_complete" event.
+    Job records live in process memory for ASSESSMENT_JOB_TTL seconds after
+    they finish; the assessment itself is always readable from the database.
+    """
+
+    def __init__(self, orchestrator, workers: int = ASSESSMENT_WORKERS, ttl: int = ASSESSMENT_JOB_TTL):
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.ttl = ttl
+        self.jobs: Dict[str, AssessmentJob] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks = []
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, risk_assessment_id: int, mother_id: str, params: Dict[str, Any]) -> AssessmentJob:
+        self._expire()
+        job = AssessmentJob(
+            job_id=uuid.uuid4().hex,
+            mother_id=mother_id,
+            risk_assessment_id=risk_assessment_id,
+            params=params
+        )
+        self.jobs[job.job_id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AssessmentJob]:
+        self._expire()
+        return self.jobs.get(job_id)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at and job.finished_at.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AssessmentJob):
+        job.status = "running"
+        risk_payload = None
+        try:
+            result = await self.orchestrator.assess_mother(**job.params)
+            risk_payload = await asyncio.to_thread(self._store_guidance, job.risk_assessment_id, result)
+            job.status = "completed"
+        except Exception as e:
+            print(f"Assessment job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = datetime.now()
+
+        mother = await asyncio.to_thread(self._load_mother, job.mother_id)
+        await sio.emit("assessment_complete", {
+            "job": job.model_dump(mode="json"),
+            "risk": risk_payload
+        }, to=mother_rooms(job.mother_id, mother and mother.assigned_asha_id, mother and mother.assigned_doctor_id))
+
+    @staticmethod
+    def _load_mother(mother_id: str) -> Optional[MotherProfile]:
+        with Session(engine) as session:
+            return session.get(MotherProfile, mother_id)
+
+    @staticmethod
+    def _store_guidance(risk_assessment_id: int, result: RiskAssessment) -> dict:
+        with Session(engine) as session:
+            risk = session.get(RiskAssessment, risk_assessment_id)
+            if not risk:
+                raise LookupError(f"Risk Assessment {risk_assessment_id} was deleted before guidance completed")
+            risk = apply_guidance(session, risk, result)
+            return risk.model_dump(mode="json")
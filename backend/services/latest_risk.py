@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import func, and_, update
+from sqlmodel import Session, select
+from database import engine
+from models import LatestRisk, RiskAssessment
+
+# Worklist sort order, all descending; matches the ix_latestrisk_triage index
+WORKLIST_ORDER = (
+    LatestRisk.priority_tier, LatestRisk.overall_risk_score, LatestRisk.unread_red_count,
+    LatestRisk.activity_at, LatestRisk.mother_id
+)
+
+def worklist_position(row: LatestRisk) -> tuple:
+    return (row.priority_tier, row.overall_risk_score, row.unread_red_count, row.activity_at, row.mother_id)
+
+# These helpers only stage changes; the caller commits them together with the
+# write that caused them, so the projection never disagrees with its source.
+
+def _latest(*times: Optional[datetime]) -> datetime:
+    return max((t for t in times if t is not None), default=datetime.now())
+
+def record_assessments(session: Session, risks: Iterable[RiskAssessment]):
+    """Points each mother's projection at the given assessments when they are her newest."""
+    newest = {}
+    for risk in risks:
+        current = newest.get(risk.mother_id)
+        if current is None or (risk.timestamp, risk.id) > (current.timestamp, current.id):
+            newest[risk.mother_id] = risk
+    if not newest:
+        return
+    rows = {
+        row.mother_id: row
+        for row in session.exec(select(LatestRisk).where(LatestRisk.mother_id.in_(list(newest)))).all()
+    }
+    for mother_id, risk in newest.items():
+        row = rows.get(mother_id)
+        if row is None:
+            row = LatestRisk(mother_id=mother_id)
+        elif row.assessed_at is not None and row.assessed_at > risk.timestamp:
+            continue
+        _point_at(row, risk)
+        session.add(row)
+
+def _point_at(row: LatestRisk, risk: Optional[RiskAssessment]):
+    row.risk_assessment_id = risk.id if risk else None
+    row.overall_risk_score = risk.overall_risk_score if risk else 0.0
+    row.risk_level = risk.risk_level if risk else None
+    row.assessed_at = risk.timestamp if risk else None
+    row.activity_at = _latest(row.assessed_at, row.last_red_at)
+
+def forget_assessment(session: Session, risk: RiskAssessment):
+    """Call after deleting `risk`; falls back to the mother's previous assessment."""
+    row = session.get(LatestRisk, risk.mother_id)
+    if row is None or row.risk_assessment_id != risk.id:
+        return
+    session.flush()
+    previous = session.exec(
+        select(RiskAssessment)
+        .where(RiskAssessment.mother_id == risk.mother_id)
+        .order_by(RiskAssessment.timestamp.desc(), RiskAssessment.id.desc())
+        .limit(1)
+    ).first()
+    _point_at(row, previous)
+    session.add(row)
+
+def record_red_message(session: Session, mother_id: str, at: datetime):
+    # An upsert increments in the database, so concurrent webhook deliveries cannot lose a count
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        greatest = func.greatest
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+        greatest = func.max
+    statement = insert(LatestRisk).values(mother_id=mother_id, priority_tier=1, unread_red_count=1,
+                                          last_red_at=at, activity_at=at)
+    session.execute(statement.on_conflict_do_update(
+        index_elements=["mother_id"],
+        set_={
+            "priority_tier": 1,
+            "unread_red_count": LatestRisk.unread_red_count + 1,
+            "last_red_at": at,
+            "activity_at": greatest(LatestRisk.activity_at, at),
+        }
+    ))
+
+def mark_read(session: Session, mother_id: str):
+    session.execute(update(LatestRisk).where(LatestRisk.mother_id == mother_id).values(priority_tier=0, unread_red_count=0))
+
+def backfill() -> int:
+    """
+    Points the projection at the newest assessment of every mother whose row
+    has none yet, e.g. on a database created before LatestRisk existed. Unread
+    counts start at zero because earlier messages have no read state.
+    """
+    with Session(engine) as session:
+        ranked = (
+            select(
+                RiskAssessment.id,
+                func.row_number().over(
+                    partition_by=RiskAssessment.mother_id,
+                    order_by=(RiskAssessment.timestamp.desc(), RiskAssessment.id.desc())
+                ).label("rank")
+            )
+            .where(RiskAssessment.mother_id.not_in(
+                select(LatestRisk.mother_id).where(LatestRisk.risk_assessment_id.is_not(None))
+            ))
+            .subquery()
+        )
+        risks = session.exec(
+            select(RiskAssessment).join(ranked, and_(RiskAssessment.id == ranked.c.id, ranked.c.rank == 1))
+        ).all()
+        record_assessments(session, risks)
+        # Rows written before the priority tier existed start in tier 0
+        session.execute(
+            update(LatestRisk)
+            .where(LatestRisk.unread_red_count > 0, LatestRisk.priority_tier == 0)
+            .values(priority_tier=1)
+        )
+        session.commit()
+        return len(risks)
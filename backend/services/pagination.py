@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values) -> str:
+    """
+    Packs the sort key of the last row of a page into an opaque, URL-safe token.
+    Datetimes are stored as ISO strings and must be converted back by the caller.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+# For cursor values that may be stored as either
+CURSOR_NUMBER = (int, float)
+
+def decode_cursor(cursor: str, *types) -> list:
+    """
+    Unpacks a token from encode_cursor, given the expected type of each value
+    (datetimes travel as str). Any mismatch is a 400, so a crafted cursor
+    never reaches a SQL comparison.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types) or not all(
+        isinstance(value, expected) and not isinstance(value, bool) for value, expected in zip(values, types)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def parse_cursor_datetime(value) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def etag_response(request: Request, payload, headers: Optional[dict] = None) -> Response:
+    """
+    Serializes payload to JSON with a strong ETag over the body. When the
+    client's If-None-Match already names that ETag the body is dropped and a
+    304 is returned, so pollers only download data that changed.
+    """
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
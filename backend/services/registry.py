@@ -0,0 +1,123 @@
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import func, or_, text
+from sqlmodel import select
+from database import engine
+from models import MotherProfile, LatestRisk
+
+MOTHER_COLUMNS = tuple(MotherProfile.__table__.columns.keys())
+
+# FTS5's trigram tokenizer needs at least three characters to use its index
+TRIGRAM_MIN_LENGTH = 3
+
+# Set by ensure_search_index(): "trigram" (Postgres pg_trgm), "fts5" (SQLite) or "like"
+search_backend = "like"
+
+SQLITE_FTS_OBJECTS = ("motherprofile_fts", "motherprofile_fts_ai", "motherprofile_fts_ad", "motherprofile_fts_au")
+SQLITE_FTS_SETUP = [
+    # External-content table over motherprofile's rowid, kept in sync by triggers
+    """CREATE VIRTUAL TABLE motherprofile_fts USING fts5(
+        id, name, content='motherprofile', content_rowid='rowid', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER motherprofile_fts_ai AFTER INSERT ON motherprofile BEGIN
+        INSERT INTO motherprofile_fts(rowid, id, name) VALUES (new.rowid, new.id, new.name);
+    END""",
+    """CREATE TRIGGER motherprofile_fts_ad AFTER DELETE ON motherprofile BEGIN
+        INSERT INTO motherprofile_fts(motherprofile_fts, rowid, id, name) VALUES ('delete', old.rowid, old.id, old.name);
+    END""",
+    """CREATE TRIGGER motherprofile_fts_au AFTER UPDATE OF id, name ON motherprofile BEGIN
+        INSERT INTO motherprofile_fts(motherprofile_fts, rowid, id, name) VALUES ('delete', old.rowid, old.id, old.name);
+        INSERT INTO motherprofile_fts(rowid, id, name) VALUES (new.rowid, new.id, new.name);
+    END""",
+]
+
+POSTGRES_TRGM_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_motherprofile_name_trgm ON motherprofile USING gin (lower(name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_motherprofile_id_trgm ON motherprofile USING gin (lower(id) gin_trgm_ops)",
+]
+
+def ensure_search_index(rebuild: bool = False) -> str:
+    """
+    Creates the index behind registry search for the current database:
+    trigram GIN indexes on Postgres, an FTS5 trigram table on SQLite. Without
+    one, search falls back to an unindexed LIKE scan. `rebuild` refills the
+    SQLite index, which is needed after a VACUUM renumbers rowids.
+    """
+    global search_backend
+    try:
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                for statement in POSTGRES_TRGM_SETUP:
+                    conn.exec_driver_sql(statement)
+                search_backend = "trigram"
+            elif engine.dialect.name == "sqlite":
+                found = {row[0] for row in conn.exec_driver_sql(
+                    f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(repr(n) for n in SQLITE_FTS_OBJECTS)})"
+                )}
+                # Dropping motherprofile also drops its triggers, which would leave the index stale
+                complete = found == set(SQLITE_FTS_OBJECTS)
+                if not complete:
+                    for trigger in SQLITE_FTS_OBJECTS[1:]:
+                        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+                    conn.exec_driver_sql("DROP TABLE IF EXISTS motherprofile_fts")
+                    for statement in SQLITE_FTS_SETUP:
+                        conn.exec_driver_sql(statement)
+                if rebuild or not complete:
+                    conn.exec_driver_sql("INSERT INTO motherprofile_fts(motherprofile_fts) VALUES ('rebuild')")
+                search_backend = "fts5"
+    except Exception as e:
+        search_backend = "like"
+        print(f"Registry search index unavailable ({e}); search will scan with LIKE")
+    return search_backend
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in MOTHER_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # The cursor is built from id, so it is always returned
+    return ["id"] + [f for f in requested if f != "id"]
+
+def _like_pattern(q: str) -> str:
+    escaped = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def search_clause(q: str):
+    """Case-insensitive substring match on name or Maternity ID."""
+    if search_backend == "fts5" and len(q) >= TRIGRAM_MIN_LENGTH:
+        phrase = '"' + q.replace('"', '""') + '"'
+        return text(
+            "motherprofile.rowid IN (SELECT rowid FROM motherprofile_fts WHERE motherprofile_fts MATCH :q)"
+        ).bindparams(q=phrase)
+    pattern = _like_pattern(q)
+    return or_(
+        func.lower(MotherProfile.name).like(pattern, escape="\\"),
+        func.lower(MotherProfile.id).like(pattern, escape="\\")
+    )
+
+def mother_query(fields: Optional[List[str]] = None, doctor_id: Optional[str] = None,
+                 asha_id: Optional[str] = None, location: Optional[str] = None,
+                 min_weeks: Optional[int] = None, max_weeks: Optional[int] = None,
+                 risk_level: Optional[str] = None, q: Optional[str] = None):
+    columns = [getattr(MotherProfile, f) for f in fields] if fields else [MotherProfile]
+    query = select(*columns)
+    if doctor_id:
+        query = query.where(MotherProfile.assigned_doctor_id == doctor_id)
+    if asha_id:
+        query = query.where(MotherProfile.assigned_asha_id == asha_id)
+    if location:
+        query = query.where(func.lower(MotherProfile.location) == location.lower())
+    if min_weeks is not None:
+        query = query.where(MotherProfile.gestational_age_weeks >= min_weeks)
+    if max_weeks is not None:
+        query = query.where(MotherProfile.gestational_age_weeks <= max_weeks)
+    if risk_level:
+        query = query.where(MotherProfile.id.in_(
+            select(LatestRisk.mother_id).where(LatestRisk.risk_level == risk_level.upper())
+        ))
+    if q and q.strip():
+        query = query.where(search_clause(q.strip()))
+    return query
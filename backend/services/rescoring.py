@@ -0,0 +1,87 @@
+import numpy as np
+from typing import List, Optional, Sequence, Union
+from sqlalchemy import func, and_
+from sqlmodel import Session, select
+from models import AssessmentData, RiskAssessment
+from agents.scoring import score_population, flag_names, RISK_LEVELS
+
+def latest_vitals(session: Session, mother_ids: Optional[Sequence[str]] = None) -> list:
+    """
+    Returns one row per mother with her most recent vitals and stored risk,
+    selected as plain columns so thousands of rows load without ORM overhead.
+    """
+    # Ranked rather than joined on max(timestamp): a batch stamps all its rows
+    # with one time, and ties must still yield a single row per mother
+    latest = select(
+        RiskAssessment.id,
+        func.row_number().over(
+            partition_by=RiskAssessment.mother_id,
+            order_by=(RiskAssessment.timestamp.desc(), RiskAssessment.id.desc())
+        ).label("rank")
+    )
+    if mother_ids:
+        latest = latest.where(RiskAssessment.mother_id.in_(mother_ids))
+    latest = latest.subquery()
+
+    query = (
+        select(
+            RiskAssessment.mother_id,
+            RiskAssessment.overall_risk_score,
+            RiskAssessment.risk_level,
+            RiskAssessment.clinical_flags,
+            AssessmentData.systolic_bp,
+            AssessmentData.diastolic_bp,
+            AssessmentData.hemoglobin,
+            AssessmentData.glucose,
+        )
+        .join(latest, and_(RiskAssessment.id == latest.c.id, latest.c.rank == 1))
+        .join(AssessmentData, RiskAssessment.assessment_data_id == AssessmentData.id)
+    )
+    return session.exec(query).all()
+
+def rescore(rows: list, heat_index: Union[float, Sequence[float]], aqi: Union[float, Sequence[float]],
+            toxins: Union[float, Sequence[float]], limit: int = 100) -> dict:
+    """
+    Re-applies the risk rules to stored vitals under new environment readings.
+    Readings are either scalars for the whole set or arrays aligned with rows.
+    Nothing is written; the result lists mothers whose risk level would change.
+    """
+    if not rows:
+        return {"rescored": 0, "level_counts": {}, "escalated": [], "deescalated": []}
+
+    # Symptoms are not stored with the vitals, only as a clinical flag on the assessment
+    symptoms = ["reported" if '"Reported Symptoms:' in (r.clinical_flags or "") else "" for r in rows]
+    result = score_population(
+        systolic_bp=[r.systolic_bp for r in rows],
+        diastolic_bp=[r.diastolic_bp for r in rows],
+        hemoglobin=[r.hemoglobin for r in rows],
+        glucose=[r.glucose for r in rows],
+        heat_index=heat_index, aqi=aqi, toxins=toxins,
+        extra_symptoms=symptoms
+    )
+
+    level_rank = {level: i for i, level in enumerate(RISK_LEVELS)}
+    previous_index = np.array([level_rank.get(r.risk_level, 0) for r in rows], dtype=np.int8)
+    new_index = result["level_index"]
+
+    def describe(indices: np.ndarray) -> List[dict]:
+        ordered = indices[np.argsort(-result["final_score"][indices], kind="stable")][:limit]
+        return [
+            {
+                "mother_id": rows[i].mother_id,
+                "previous_level": rows[i].risk_level,
+                "previous_score": rows[i].overall_risk_score,
+                "risk_level": result["risk_level"][i],
+                "score": round(float(result["final_score"][i]), 1),
+                "flags": flag_names(int(result["flags"][i])),
+            }
+            for i in ordered
+        ]
+
+    levels, counts = np.unique(result["risk_level"].astype(str), return_counts=True)
+    return {
+        "rescored": len(rows),
+        "level_counts": {str(level): int(count) for level, count in zip(levels, counts)},
+        "escalated": describe(np.flatnonzero(new_index > previous_index)),
+        "deescalated": describe(np.flatnonzero(new_index < previous_index)),
+    }
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from database import engine
+from models import ConversationState
+from services.cache import TTLCache
+
+STATE_STORE = os.environ.get("STATE_STORE", "sql")
+STATE_TTL = int(os.environ.get("STATE_TTL", "3600"))
+
+class MemoryStateStore:
+    """
+    Per-process conversation state. Only correct with a single worker; use it
+    for tests and local development.
+    """
+
+    def __init__(self, ttl: int = STATE_TTL, maxsize: int = 10000):
+        self.ttl = ttl
+        self._data = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._data.get(key)
+
+    def set(self, key: str, state: dict, ttl: Optional[int] = None):
+        self._data.set(key, dict(state), ttl)
+
+    def delete(self, key: str):
+        self._data.pop(key)
+
+    def transition(self, key: str, expected_step: Optional[str], state: Optional[dict],
+                   ttl: Optional[int] = None) -> bool:
+        with self._lock:
+            current = self._data.get(key)
+            if (current or {}).get("step") != expected_step:
+                return False
+            if state is None:
+                self._data.pop(key)
+            else:
+                self._data.set(key, dict(state), ttl)
+            return True
+
+class SQLStateStore:
+    """
+    Conversation state in the ConversationState table, shared by every worker
+    process. transition() is a compare-and-set on the current step done in a
+    single UPDATE/DELETE/INSERT statement, so when two workers handle the same
+    chat concurrently exactly one of them advances the flow.
+    """
+
+    def __init__(self, ttl: int = STATE_TTL):
+        self.ttl = ttl
+        self._writes = 0
+
+    def _expiry(self, ttl: Optional[int]) -> datetime:
+        return datetime.now() + timedelta(seconds=self.ttl if ttl is None else ttl)
+
+    @staticmethod
+    def _encode(state: dict) -> str:
+        return json.dumps({k: v for k, v in state.items() if k != "step"})
+
+    def get(self, key: str) -> Optional[dict]:
+        with Session(engine) as session:
+            row = session.get(ConversationState, key)
+            if row is None or row.expires_at <= datetime.now():
+                return None
+            return {**json.loads(row.data), "step": row.step}
+
+    def set(self, key: str, state: dict, ttl: Optional[int] = None):
+        with Session(engine) as session:
+            session.merge(ConversationState(
+                key=key, step=state["step"], data=self._encode(state),
+                expires_at=self._expiry(ttl), updated_at=datetime.now()
+            ))
+            session.commit()
+        self._purge_expired()
+
+    def delete(self, key: str):
+        with Session(engine) as session:
+            session.execute(delete(ConversationState).where(ConversationState.key == key))
+            session.commit()
+
+    def transition(self, key: str, expected_step: Optional[str], state: Optional[dict],
+                   ttl: Optional[int] = None) -> bool:
+        now = datetime.now()
+        with Session(engine) as session:
+            if expected_step is None:
+                if state is None:
+                    return self.get(key) is None
+                row = ConversationState(key=key, step=state["step"], data=self._encode(state),
+                                        expires_at=self._expiry(ttl), updated_at=now)
+                session.add(row)
+                try:
+                    session.commit()
+                    return True
+                except IntegrityError:
+                    session.rollback()
+                # A row exists; it only counts as "no state" if it has expired
+                result = session.execute(
+                    update(ConversationState)
+                    .where(ConversationState.key == key, ConversationState.expires_at <= now)
+                    .values(step=state["step"], data=self._encode(state),
+                            expires_at=self._expiry(ttl), updated_at=now)
+                )
+            else:
+                current = (ConversationState.key == key, ConversationState.step == expected_step,
+                           ConversationState.expires_at > now)
+                if state is None:
+                    result = session.execute(delete(ConversationState).where(*current))
+                else:
+                    result = session.execute(
+                        update(ConversationState).where(*current)
+                        .values(step=state["step"], data=self._encode(state),
+                                expires_at=self._expiry(ttl), updated_at=now)
+                    )
+            session.commit()
+            return result.rowcount == 1
+
+    def _purge_expired(self):
+        self._writes += 1
+        if self._writes % 100:
+            return
+        with Session(engine) as session:
+            session.execute(delete(ConversationState).where(ConversationState.expires_at <= datetime.now()))
+            session.commit()
+
+def load_state_store(kind: str = STATE_STORE):
+    if kind == "memory":
+        return MemoryStateStore()
+    if kind == "sql":
+        return SQLStateStore()
+    raise ValueError(f"Unknown STATE_STORE '{kind}', expected 'memory' or 'sql'")
+
+state_store = load_state_store()
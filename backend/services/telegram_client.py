@@ -0,0 +1,209 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org")
+TELEGRAM_HTTP_TIMEOUT = float(os.environ.get("TELEGRAM_HTTP_TIMEOUT", "10"))
+# Bot API limits: ~30 messages/second overall and about one per second per chat
+TELEGRAM_GLOBAL_RATE = float(os.environ.get("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_INTERVAL = float(os.environ.get("TELEGRAM_CHAT_INTERVAL", "1.0"))
+TELEGRAM_MAX_RETRIES = int(os.environ.get("TELEGRAM_MAX_RETRIES", "3"))
+TELEGRAM_SEND_WORKERS = int(os.environ.get("TELEGRAM_SEND_WORKERS", "8"))
+
+class TelegramAPIError(Exception):
+    def __init__(self, method: str, status: int, description: str):
+        self.status = status
+        super().__init__(f"Telegram {method} failed ({status}): {description[:200]}")
+
+class TelegramClient:
+    """
+    Outbound Bot API client over one pooled httpx connection.
+
+    Sends go through a per-chat lock (messages to one mother stay in order and
+    at most one per TELEGRAM_CHAT_INTERVAL) and a global slot reservation
+    (TELEGRAM_GLOBAL_RATE messages per second). A 429 is retried after the
+    `retry_after` Telegram returns, and network or 5xx errors are retried with
+    backoff. enqueue() hands a message to the background send workers so
+    request handlers never wait on Telegram; broadcast() fans one alert out to
+    many chats through the same limits. The base URL is configurable so tests
+    can point it at a local fake Bot API.
+    """
+
+    def __init__(self, token: str, base_url: str = TELEGRAM_API_BASE,
+                 global_rate: float = TELEGRAM_GLOBAL_RATE, chat_interval: float = TELEGRAM_CHAT_INTERVAL,
+                 max_retries: int = TELEGRAM_MAX_RETRIES, workers: int = TELEGRAM_SEND_WORKERS,
+                 timeout: float = TELEGRAM_HTTP_TIMEOUT):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.global_interval = 1.0 / global_rate
+        self.chat_interval = chat_interval
+        self.max_retries = max_retries
+        self.workers = workers
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._next_global = 0.0
+        self._next_chat: Dict[str, float] = {}
+        # chat_id -> [lock, senders holding or waiting on it]
+        self._chat_locks: Dict[str, list] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return self._client
+
+    def _redact(self, value) -> str:
+        text = str(value)
+        return text.replace(self.token, "<token>") if self.token else text
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self, drain_timeout: float = 5.0):
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"Dropping {self._queue.qsize()} queued Telegram messages on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def call(self, method: str, payload: Optional[dict] = None, chat_id: Optional[str] = None) -> dict:
+        """Calls a Bot API method and returns its `result`, retrying 429s and transient failures."""
+        url = f"{self.base_url}/bot{self.token}/{method}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                res = await self.client.post(url, json=payload or {})
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise TelegramAPIError(method, 0, self._redact(e))
+                self.retried += 1
+                await asyncio.sleep(2 ** attempt * 0.5)
+                continue
+
+            try:
+                body = res.json()
+            except ValueError:
+                body = {"ok": False, "description": res.text}
+            if res.status_code == 200 and body.get("ok"):
+                return body.get("result")
+
+            if attempt < self.max_retries and res.status_code == 429:
+                retry_after = float(body.get("parameters", {}).get("retry_after", 1))
+                if chat_id is not None:
+                    self._next_chat[chat_id] = time.monotonic() + retry_after
+                self.retried += 1
+                await asyncio.sleep(retry_after)
+                continue
+            if attempt < self.max_retries and res.status_code >= 500:
+                self.retried += 1
+                await asyncio.sleep(2 ** attempt * 0.5)
+                continue
+            raise TelegramAPIError(method, res.status_code, body.get("description", ""))
+
+    async def _wait_for_slot(self, chat_id: str):
+        chat_ready = self._next_chat.get(chat_id, 0.0) - time.monotonic()
+        if chat_ready > 0:
+            await asyncio.sleep(chat_ready)
+        # Global slots are reserved synchronously, so concurrent senders line up
+        # behind each other instead of all waking at once
+        now = time.monotonic()
+        slot = max(now, self._next_global)
+        self._next_global = slot + self.global_interval
+        self._next_chat[chat_id] = slot + self.chat_interval
+        if len(self._next_chat) > 10000:
+            self._next_chat = {c: t for c, t in self._next_chat.items() if t > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def send_message(self, chat_id: str, text: str, reply_markup: Optional[dict] = None) -> dict:
+        chat_id = str(chat_id)
+        payload = {"chat_id": chat_id, "text": text}
+        if reply_markup:
+            payload["reply_markup"] = reply_markup
+
+        entry = self._chat_locks.setdefault(chat_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await self._wait_for_slot(chat_id)
+                result = await self.call("sendMessage", payload, chat_id=chat_id)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._chat_locks.pop(chat_id, None)
+        self.sent += 1
+        return result
+
+    def enqueue(self, chat_id: str, text: str, reply_markup: Optional[dict] = None):
+        """Queues a message for background delivery; must be called from the event loop."""
+        self.start()
+        self._queue.put_nowait((str(chat_id), text, reply_markup))
+
+    async def broadcast(self, messages: List[Tuple[str, str]]) -> dict:
+        """Sends (chat_id, text) pairs concurrently within the rate limits and reports failures."""
+        results = await asyncio.gather(
+            *[self.send_message(chat_id, text) for chat_id, text in messages], return_exceptions=True
+        )
+        failures = [
+            {"chat_id": chat_id, "error": self._redact(r)}
+            for (chat_id, _), r in zip(messages, results) if isinstance(r, Exception)
+        ]
+        return {"sent": len(messages) - len(failures), "failed": failures}
+
+    async def _worker(self):
+        while True:
+            chat_id, text, reply_markup = await self._queue.get()
+            try:
+                await self.send_message(chat_id, text, reply_markup)
+            except Exception as e:
+                print(f"Telegram delivery to {chat_id} failed: {self._redact(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def get_file_url(self, file_id: str) -> str:
+        try:
+            result = await self.call("getFile", {"file_id": file_id})
+        except TelegramAPIError as e:
+            print(f"Telegram getFile failed: {e}")
+            return ""
+        return f"{self.base_url}/file/bot{self.token}/{result['file_path']}"
+
+    async def iter_file(self, url: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        async with self.client.stream("GET", url) as res:
+            res.raise_for_status()
+            async for chunk in res.aiter_bytes(chunk_size):
+                yield chunk
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "active_chats": len(self._chat_locks),
+        }
+
+telegram_client = TelegramClient(os.getenv("TELEGRAM_BOT_TOKEN", ""))
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import threading
+from typing import Callable, Dict, Optional
+from services.cache import TTLCache
+from services.telegram_client import telegram_client, TelegramClient
+
+FFMPEG_BIN = os.environ.get("FFMPEG_BIN", "ffmpeg")
+# Telegram bots can only download files up to 20 MB
+VOICE_MAX_BYTES = int(os.environ.get("VOICE_MAX_BYTES", str(20 * 1024 * 1024)))
+VOICE_TRANSCODE_WORKERS = int(os.environ.get("VOICE_TRANSCODE_WORKERS", "2"))
+VOICE_TRANSCODE_TIMEOUT = float(os.environ.get("VOICE_TRANSCODE_TIMEOUT", "60"))
+VOICE_TRANSCRIBE_WORKERS = int(os.environ.get("VOICE_TRANSCRIBE_WORKERS", "1"))
+VOICE_TRANSCRIBER = os.environ.get("VOICE_TRANSCRIBER", "auto")
+VOICE_WHISPER_MODEL = os.environ.get("VOICE_WHISPER_MODEL", "small")
+VOICE_CACHE_TTL = int(os.environ.get("VOICE_CACHE_TTL", str(24 * 3600)))
+VOICE_CACHE_SIZE = int(os.environ.get("VOICE_CACHE_SIZE", "1024"))
+
+SAMPLE_RATE = 16000
+UNAVAILABLE_TRANSCRIPT = "Voice message received (transcription unavailable)."
+FAILED_TRANSCRIPT = "Voice message could not be processed."
+
+class FasterWhisperTranscriber:
+    """Local CPU transcription with faster-whisper (optional dependency)."""
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str = VOICE_WHISPER_MODEL):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
+
+    def transcribe(self, pcm: bytes) -> str:
+        import numpy as np
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = self.model.transcribe(audio, beam_size=1, vad_filter=True)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+class UnavailableTranscriber:
+    """Used when no speech-to-text backend is installed; the note is still recorded."""
+    name = "none"
+
+    def transcribe(self, pcm: bytes) -> str:
+        return UNAVAILABLE_TRANSCRIPT
+
+class MockTranscriber:
+    """Fixed transcript for demos, matching the bot's original placeholder."""
+    name = "mock"
+
+    def transcribe(self, pcm: bytes) -> str:
+        return "Transcript: I am having some bleeding and pain."
+
+def load_transcriber(kind: str = VOICE_TRANSCRIBER):
+    if kind == "mock":
+        return MockTranscriber()
+    if kind in ("auto", "faster-whisper"):
+        try:
+            return FasterWhisperTranscriber()
+        except ImportError:
+            if kind == "faster-whisper":
+                raise
+            print("faster-whisper is not installed; voice notes will not be transcribed")
+    return UnavailableTranscriber()
+
+class TranscodeError(Exception):
+    pass
+
+class VoicePipeline:
+    """
+    Turns a Telegram voice note into text without blocking the event loop.
+
+    The file is streamed from Telegram straight into ffmpeg's stdin and read
+    back from stdout as 16 kHz mono PCM, with no temp files. At most
+    VOICE_TRANSCODE_WORKERS ffmpeg processes and VOICE_TRANSCRIBE_WORKERS
+    transcriptions run at once; transcription is CPU-bound and runs in a
+    thread. Results are cached by Telegram's file_unique_id, and concurrent
+    requests for the same note (retried webhook deliveries) share one run.
+    """
+
+    def __init__(self, client: TelegramClient = telegram_client, transcriber=None,
+                 transcriber_factory: Callable = load_transcriber,
+                 transcode_workers: int = VOICE_TRANSCODE_WORKERS,
+                 transcribe_workers: int = VOICE_TRANSCRIBE_WORKERS,
+                 max_bytes: int = VOICE_MAX_BYTES, timeout: float = VOICE_TRANSCODE_TIMEOUT):
+        self.client = client
+        self._transcriber = transcriber
+        self._transcriber_factory = transcriber_factory
+        self._load_lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.transcode_slots = asyncio.Semaphore(transcode_workers)
+        self.transcribe_slots = asyncio.Semaphore(transcribe_workers)
+        self.cache = TTLCache(maxsize=VOICE_CACHE_SIZE, ttl=VOICE_CACHE_TTL)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.failures = 0
+
+    def _run_transcriber(self, pcm: bytes) -> str:
+        # Loading a speech model takes seconds, so it happens on the first voice
+        # note, in the worker thread, and only once however many notes arrive together
+        if self._transcriber is None:
+            with self._load_lock:
+                if self._transcriber is None:
+                    self._transcriber = self._transcriber_factory()
+        return self._transcriber.transcribe(pcm)
+
+    async def transcribe(self, file_id: str, file_unique_id: Optional[str] = None) -> str:
+        key = file_unique_id or file_id
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._process(file_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            text = await asyncio.shield(task)
+        except Exception as e:
+            self.failures += 1
+            print(f"Voice note {key} failed: {e}")
+            return FAILED_TRANSCRIPT
+        self.cache.set(key, text)
+        return text
+
+    async def _process(self, file_id: str) -> str:
+        url = await self.client.get_file_url(file_id)
+        if not url:
+            raise TranscodeError("file not available from Telegram")
+        async with self.transcode_slots:
+            pcm = await asyncio.wait_for(self.transcode(url), self.timeout)
+        async with self.transcribe_slots:
+            return await asyncio.to_thread(self._run_transcriber, pcm)
+
+    async def transcode(self, url: str) -> bytes:
+        proc = await asyncio.create_subprocess_exec(
+            FFMPEG_BIN, "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+
+        async def feed():
+            received = 0
+            try:
+                async for chunk in self.client.iter_file(url):
+                    received += len(chunk)
+                    if received > self.max_bytes:
+                        raise TranscodeError(f"voice note larger than {self.max_bytes} bytes")
+                    proc.stdin.write(chunk)
+                    await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # ffmpeg gave up on the input; its exit code and stderr explain why
+            finally:
+                proc.stdin.close()
+
+        try:
+            _, pcm, stderr = await asyncio.gather(feed(), proc.stdout.read(), proc.stderr.read())
+            returncode = await proc.wait()
+        except BaseException:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+        if returncode != 0:
+            raise TranscodeError(f"ffmpeg exited with {returncode}: {stderr.decode(errors='replace')[:200]}")
+        return pcm
+
+    def stats(self) -> dict:
+        return {
+            "transcriber": self._transcriber.name if self._transcriber else None,
+            "cache": self.cache.stats(),
+            "inflight": len(self._inflight),
+            "failures": self.failures,
+        }
+
+voice_pipeline = VoicePipeline()
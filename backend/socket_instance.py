@@ -1,3 +1,93 @@
+import asyncio
+import os
+from typing import List, Optional
 import socketio
+from sqlmodel import Session
+from database import engine
+from models import MotherProfile
+from services.clerk_auth import AuthError, auth_configured, staff_scope, verify_session_token
 
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins=[])
+# Empty runs a single process; redis://... or amqp://... fans events out to
+# every worker and node subscribed to the same channel
+SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE", "")
+SOCKETIO_CHANNEL = os.environ.get("SOCKETIO_CHANNEL", "matrukavach")
+
+# Only used when Clerk verification is not configured (local development):
+# every client joins it and receives every event
+ALL_ROOM = "all"
+ADMIN_ROOM = "admin"
+
+def load_client_manager(url: str = SOCKETIO_MESSAGE_QUEUE, channel: str = SOCKETIO_CHANNEL, write_only: bool = False):
+    if not url:
+        return socketio.AsyncManager()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return socketio.AsyncRedisManager(url, channel=channel, write_only=write_only)
+    if url.startswith(("amqp://", "amqps://")):
+        return socketio.AsyncAioPikaManager(url, channel=channel, write_only=write_only)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE '{url}', expected redis:// or amqp://")
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins=[], client_manager=load_client_manager())
+
+def mother_rooms(mother_id: str, asha_id: Optional[str] = None, doctor_id: Optional[str] = None) -> List[str]:
+    """Rooms that should see events about a mother: her care team, open chats and admins."""
+    rooms = [f"mother:{mother_id}", ADMIN_ROOM, ALL_ROOM]
+    if asha_id:
+        rooms.append(f"asha:{asha_id}")
+    if doctor_id:
+        rooms.append(f"doctor:{doctor_id}")
+    return rooms
+
+async def emit_to_mother(event: str, data: dict, mother) -> None:
+    # A list of rooms is a single emit, so a client in several of them gets the event once
+    await sio.emit(event, data, to=mother_rooms(mother.id, mother.assigned_asha_id, mother.assigned_doctor_id))
+
+if not auth_configured():
+    print("CLERK_JWT_KEY/CLERK_JWKS_URL not set: Socket.IO clients are not authenticated and receive every event")
+
+@sio.event
+async def connect(sid, environ, auth=None):
+    """
+    Dashboards send the signed-in user's Clerk session token as {"token": ...}.
+    Rooms come from the verified token's staff metadata, never from the
+    client: admins join ADMIN_ROOM, ASHA workers and doctors their own room.
+    """
+    if not auth_configured():
+        await sio.save_session(sid, {"role": "admin", "staff_id": None})
+        await sio.enter_room(sid, ALL_ROOM)
+        return
+
+    token = auth.get("token") if isinstance(auth, dict) else None
+    try:
+        claims = await asyncio.to_thread(verify_session_token, token)
+    except AuthError as e:
+        raise socketio.exceptions.ConnectionRefusedError(f"Unauthorized: {e}")
+    role, staff_id = staff_scope(claims)
+    if role is None or (role != "admin" and not staff_id):
+        raise socketio.exceptions.ConnectionRefusedError("Forbidden: no staff role on this account")
+
+    await sio.save_session(sid, {"role": role, "staff_id": staff_id})
+    await sio.enter_room(sid, ADMIN_ROOM if role == "admin" else f"{role}:{staff_id}")
+
+def _may_watch(role: str, staff_id: Optional[str], mother_id: str) -> bool:
+    if role == "admin":
+        return True
+    with Session(engine) as session:
+        mother = session.get(MotherProfile, mother_id)
+        if mother is None:
+            return False
+        assigned = mother.assigned_asha_id if role == "asha" else mother.assigned_doctor_id
+        return assigned == staff_id
+
+@sio.event
+async def watch_mother(sid, mother_id):
+    """Follows one mother's chat; staff may only watch mothers assigned to them."""
+    if not isinstance(mother_id, str) or not mother_id:
+        return
+    session = await sio.get_session(sid)
+    if await asyncio.to_thread(_may_watch, session["role"], session["staff_id"], mother_id):
+        await sio.enter_room(sid, f"mother:{mother_id}")
+
+@sio.event
+async def unwatch_mother(sid, mother_id):
+    if isinstance(mother_id, str) and mother_id:
+        await sio.leave_room(sid, f"mother:{mother_id}")
@@ -1,36 +1,176 @@
-import requests
-import time
-import sys
-
+import asyncio
+import json
 import os
+from typing import Dict, Optional, Set
+import httpx
+from agents.triage import triage
 
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-API_URL = f"https://api.telegram.org/bot{TOKEN}"
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+API_URL = f"{TELEGRAM_API_BASE.rstrip('/')}/bot{TOKEN}"
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 WEBHOOK_URL = f"{BACKEND_URL}/webhook/telegram"
 
+# Fetched updates not yet accepted by the backend; polling pauses above this
+POLLER_MAX_IN_FLIGHT = int(os.getenv("POLLER_MAX_IN_FLIGHT", "32"))
+POLLER_WEBHOOK_TIMEOUT = float(os.getenv("POLLER_WEBHOOK_TIMEOUT", "120"))
+POLLER_STATE_FILE = os.getenv("POLLER_STATE_FILE", "data/telegram_offset.json")
+POLL_TIMEOUT = 30
+
+def chat_id_of(update: dict) -> Optional[str]:
+    if "callback_query" in update:
+        return str(update["callback_query"]["message"]["chat"]["id"])
+    if "message" in update:
+        return str(update["message"]["chat"]["id"])
+    return None
+
+def is_urgent(update: dict) -> bool:
+    return triage(update.get("message", {}).get("text") or "").is_urgent
+
+class UpdateDispatcher:
+    """
+    Forwards Telegram updates to the backend webhook concurrently.
+
+    Updates from one chat are delivered one at a time and in order by a
+    per-chat worker, while different chats proceed in parallel over one pooled
+    connection. Polling pauses while POLLER_MAX_IN_FLIGHT updates are
+    outstanding, so a slow backend builds no unbounded backlog. Urgent
+    messages do not count towards that limit, so a full backlog never holds
+    them back, but they still wait for earlier messages from their own chat.
+
+    getUpdates acknowledges everything below the offset it is sent, so the
+    state file stores the next offset together with every fetched update the
+    backend has not yet accepted. It is replaced atomically, and on restart
+    those updates are re-dispatched: nothing is dropped and completed updates
+    are not replayed.
+    """
+
+    def __init__(self, state_file: str = POLLER_STATE_FILE, max_in_flight: int = POLLER_MAX_IN_FLIGHT):
+        self.state_file = state_file
+        self.offset = 0
+        self.pending: Dict[int, dict] = {}
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0  # non-urgent updates queued or being delivered
+        self.has_room = asyncio.Event()
+        self.has_room.set()
+        self.chat_queues: Dict[str, asyncio.Queue] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(POLLER_WEBHOOK_TIMEOUT, connect=10),
+            limits=httpx.Limits(max_connections=max_in_flight + 8)
+        )
+
+    def load_state(self):
+        if not os.path.exists(self.state_file):
+            return
+        with open(self.state_file) as f:
+            state = json.load(f)
+        self.offset = state.get("offset", 0)
+        self.pending = {u["update_id"]: u for u in state.get("pending", [])}
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"offset": self.offset, "pending": list(self.pending.values())}, f)
+        os.replace(tmp, self.state_file)
+
+    async def poll(self):
+        print("Deleting webhook to enable getUpdates...")
+        await self.client.get(f"{API_URL}/deleteWebhook")
+
+        self.load_state()
+        replay = sorted(self.pending.values(), key=lambda u: u["update_id"])
+        if replay:
+            print(f"Re-dispatching {len(replay)} updates left unfinished by the last run")
+        for update in replay:
+            self.dispatch(update)
+
+        print(f"Starting Telegram Poller, forwarding to {WEBHOOK_URL}...")
+        backoff = 1
+        while True:
+            await self.has_room.wait()
+            try:
+                res = await self.client.get(
+                    f"{API_URL}/getUpdates",
+                    params={"offset": self.offset, "timeout": POLL_TIMEOUT},
+                    timeout=POLL_TIMEOUT + 10
+                )
+                body = res.json()
+                if not body.get("ok"):
+                    raise RuntimeError(body.get("description", res.status_code))
+            except Exception as e:
+                print(f"Polling error: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+            backoff = 1
+
+            updates = body["result"]
+            if not updates:
+                continue
+            for update in updates:
+                if chat_id_of(update) is not None:
+                    self.pending[update["update_id"]] = update
+            self.offset = updates[-1]["update_id"] + 1
+            self.save_state()
+            for update in updates:
+                if update["update_id"] in self.pending:
+                    self.dispatch(update)
+
+    def dispatch(self, update: dict):
+        counted = not is_urgent(update)
+        if counted:
+            self.in_flight += 1
+            if self.in_flight >= self.max_in_flight:
+                self.has_room.clear()
+        chat_id = chat_id_of(update)
+        queue = self.chat_queues.get(chat_id)
+        if queue is None:
+            queue = self.chat_queues[chat_id] = asyncio.Queue()
+            self._spawn(self._chat_worker(chat_id, queue))
+        queue.put_nowait((update, counted))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _chat_worker(self, chat_id: str, queue: asyncio.Queue):
+        while True:
+            update, counted = queue.get_nowait()
+            try:
+                await self._deliver(update)
+            finally:
+                if counted:
+                    self.in_flight -= 1
+                    if self.in_flight < self.max_in_flight:
+                        self.has_room.set()
+            if queue.empty():
+                del self.chat_queues[chat_id]
+                return
+
+    async def _deliver(self, update: dict):
+        update_id = update["update_id"]
+        delay = 1
+        while True:
+            try:
+                res = await self.client.post(WEBHOOK_URL, json=update)
+                if res.status_code < 500:
+                    print(f"Forwarded update {update_id}, status: {res.status_code}")
+                    break
+                error = f"status {res.status_code}"
+            except httpx.HTTPError as e:
+                error = repr(e)
+            # The backend is down or overloaded: hold the update and back off
+            print(f"Forwarding update {update_id} failed ({error}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+        self.pending.pop(update_id, None)
+        self.save_state()
+
 def main():
-    print("Deleting webhook to enable getUpdates...")
-    requests.get(f"{API_URL}/deleteWebhook")
-
-    offset = 0
-    print(f"Starting Telegram Poller, forwarding to {WEBHOOK_URL}...")
-    while True:
-        try:
-            response = requests.get(f"{API_URL}/getUpdates?offset={offset}&timeout=30").json()
-            if response.get("ok"):
-                for update in response["result"]:
-                    print(f"Received update: {update['update_id']}")
-                    if "message" in update or "callback_query" in update:
-                        try:
-                            res = requests.post(WEBHOOK_URL, json=update)
-                            print(f"Forwarded update {update['update_id']}, status: {res.status_code}")
-                        except Exception as e:
-                            print(f"Error forwarding: {e}")
-                    offset = update["update_id"] + 1
-        except Exception as e:
-            print(f"Polling error: {e}")
-        time.sleep(1)
+    asyncio.run(UpdateDispatcher().poll())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+# A throwaway database, so the script never touches data/matrukavach.db
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'env_prefetch.db')}"
+os.environ.setdefault("DB_ECHO", "0")
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer
+from sqlmodel import Session
+from database import engine, create_db_and_tables
+from models import MotherProfile, EnvironmentReading, VitalsInput
+from agents.orchestrator import MatruKavachOrchestrator
+from services.assessments import orchestrator_kwargs, persist_assessment, with_stored_environment
+from services.environment import env_service, snap_to_tile
+from services.env_prefetch import EnvironmentPrefetcher, env_prefetcher
+from test_env_service import StubOpenMeteo
+
+LAT, LON = 19.07, 72.87
+
+def seed(session: Session) -> MotherProfile:
+    mother = MotherProfile(id="MK-TEST", name="Test", age=25, gestational_age_weeks=30,
+                           phone="0", latitude=LAT, longitude=LON)
+    session.add(mother)
+    # Mild conditions at her last assessment
+    vitals = VitalsInput(mother_id=mother.id, systolic_bp=138, diastolic_bp=88, weight_kg=60, hemoglobin=10.5,
+                         glucose=95, heart_rate=80, temperature_c=27, heat_index=28, aqi=40, chemical_exposure=1)
+    result = MatruKavachOrchestrator().preliminary_assessment(**orchestrator_kwargs(mother, vitals))
+    persist_assessment(session, mother, vitals, result)
+    tile = snap_to_tile(LAT, LON, env_service.tile_degrees)
+    session.add(EnvironmentReading(tile_lat=tile[0], tile_lon=tile[1], temperature_c=27, heat_index=28, aqi=40,
+                                   chemical_exposure=1, risk_multiplier=1.0, mother_count=1,
+                                   fetched_at=datetime.now() - timedelta(hours=1)))
+    session.commit()
+    session.refresh(mother)
+    return mother
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenMeteo)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    env_service.forecast_url = f"{base}/v1/forecast"
+    env_service.air_quality_url = f"{base}/v1/air-quality"
+    StubOpenMeteo.delay = 0
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        mother = seed(session)
+
+    print("--- A prefetch run under a heatwave escalates the tile's mothers ---")
+    affected = await env_prefetcher.run_once()
+    print(f"Escalated: {[(e['mother_id'], e['previous_level'], e['risk_level']) for e in affected['escalated']]}")
+
+    print("--- Another worker, which never ran the loop, serves the same data ---")
+    other_worker = EnvironmentPrefetcher()
+    with Session(engine) as session:
+        heatmap = other_worker.heatmap(session)
+        stored = other_worker.affected(session)
+    tile = heatmap["tiles"][0]
+    print(f"Heatmap tiles: {len(heatmap['tiles'])}, heat index {tile['heat_index']}, "
+          f"multiplier {tile['risk_multiplier']}, high risk {tile['high_risk_count']}/{tile['mother_count']}")
+    print(f"Affected list matches: {stored['escalated'] == affected['escalated']}")
+
+    print("--- Vitals without readings are assessed under the stored reading ---")
+    vitals = VitalsInput(mother_id=mother.id, systolic_bp=138, diastolic_bp=88, weight_kg=60,
+                         hemoglobin=10.5, glucose=95, heart_rate=80)
+    with Session(engine) as session:
+        assessed = with_stored_environment(session, mother, vitals)
+        explicit = with_stored_environment(session, mother, VitalsInput(**{**vitals.model_dump(), "heat_index": 29.0}))
+    result = MatruKavachOrchestrator().preliminary_assessment(**orchestrator_kwargs(mother, assessed))
+    print(f"Heat index used: {assessed.heat_index} (submitted default {vitals.heat_index})")
+    print(f"Environmental flags: {result.environmental_flags}")
+    print(f"Explicit reading kept: {explicit.heat_index == 29.0}")
+
+    await env_service.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
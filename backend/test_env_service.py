@@ -0,0 +1,66 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.environment import EnvironmentService
+
+class StubOpenMeteo(BaseHTTPRequestHandler):
+    """Local stand-in for the forecast and air-quality APIs."""
+    calls = 0
+    failing = False
+    delay = 0.2
+
+    def do_GET(self):
+        StubOpenMeteo.calls += 1
+        time.sleep(StubOpenMeteo.delay)
+        if StubOpenMeteo.failing:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path.startswith("/v1/forecast"):
+            body = {"current": {"temperature_2m": 36.5, "apparent_temperature": 42.1, "weather_code": 0}}
+        else:
+            body = {"current": {"us_aqi": 160, "pm2_5": 155.0}}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenMeteo)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    service = EnvironmentService(forecast_url=f"{base}/v1/forecast", air_quality_url=f"{base}/v1/air-quality", ttl=1)
+
+    print("--- Concurrent requests for one ward share a single fetch ---")
+    start = time.perf_counter()
+    readings = await asyncio.gather(*[service.get(19.088 + i * 0.001, 72.908) for i in range(20)])
+    print(f"20 requests in {(time.perf_counter() - start) * 1000:.0f} ms, upstream HTTP requests: {StubOpenMeteo.calls}")
+    print(f"Reading: {readings[0]}")
+
+    print("--- Second request is served from cache ---")
+    await service.get(19.09, 72.91)
+    print(f"Upstream HTTP requests: {StubOpenMeteo.calls}")
+
+    print("--- Upstream failure after TTL serves the stale reading ---")
+    await asyncio.sleep(1.1)
+    StubOpenMeteo.failing = True
+    reading = await service.get(19.09, 72.91)
+    print(f"Stale: {reading['stale']}, heat index: {reading['heat_index']}")
+
+    print("--- Upstream failure for an unseen tile falls back to defaults ---")
+    reading = await service.get(12.97, 77.59)
+    print(f"Stale: {reading['stale']}, heat index: {reading['heat_index']}")
+
+    print(f"Stats: {service.stats()}")
+    await service.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -24,7 +24,7 @@ async def main():
     
     print("Invoking graph...")
     try:
-        final_state = matrukavach_graph.invoke(initial_state)
+        final_state = await matrukavach_graph.ainvoke(initial_state)
         print("Final State:", final_state)
     except Exception as e:
         print(f"Exception out: {e}")
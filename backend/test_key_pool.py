@@ -0,0 +1,60 @@
+import asyncio
+from agents.llm import KeyPool, KeyPoolExhausted
+
+class FakeClient:
+    """Stands in for a Gemini client; fails the way the real API does for bad keys."""
+    created = 0
+    failed = set()
+    calls_after_failure = 0
+
+    def __init__(self, key: str):
+        FakeClient.created += 1
+        self.key = key
+        self.calls = 0
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.key in FakeClient.failed:
+            FakeClient.calls_after_failure += 1
+        await asyncio.sleep(0.01)
+        if self.key == "quota-key-0001":
+            FakeClient.failed.add(self.key)
+            raise RuntimeError("429 RESOURCE_EXHAUSTED. retry_delay { seconds: 30 }")
+        if self.key == "broken-key-0002":
+            FakeClient.failed.add(self.key)
+            raise RuntimeError("400 API_KEY_INVALID")
+        if prompt == "bad prompt":
+            raise RuntimeError("400 INVALID_ARGUMENT: Request contains an invalid argument.")
+        return f"{self.key}: {prompt}"
+
+async def main():
+    pool = KeyPool(
+        ["quota-key-0001", "broken-key-0002", "good-key-0003", "good-key-0004"],
+        {"fake": FakeClient}, semaphore=asyncio.Semaphore(4)
+    )
+
+    results = await asyncio.gather(*[pool.call("fake", lambda c, i=i: c.generate(f"msg {i}")) for i in range(20)])
+    print(f"20 calls answered by: {sorted({r.split(':')[0] for r in results})}")
+    print(f"Clients created: {FakeClient.created} (one per key, reused afterwards)")
+
+    bad_calls = [pool.client("fake", k).calls for k in ("quota-key-0001", "broken-key-0002")]
+    print(f"Calls that reached failing keys: {bad_calls}, of which started after the key failed: "
+          f"{FakeClient.calls_after_failure} (only calls already in flight can hit a failing key)")
+
+    try:
+        await pool.call("fake", lambda c: c.generate("bad prompt"))
+    except RuntimeError as e:
+        cooling = [k for k in ("good-key-0003", "good-key-0004") if pool.health[k].cooldown_until > 0]
+        print(f"Bad request returned to the caller ({e}); good keys put on cooldown: {cooling}")
+
+    for entry in pool.stats():
+        print(entry)
+
+    empty = KeyPool([], {"fake": FakeClient})
+    try:
+        await empty.call("fake", lambda c: c.generate("hi"))
+    except KeyPoolExhausted as e:
+        print(f"No keys configured: {e}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
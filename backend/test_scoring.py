@@ -0,0 +1,63 @@
+import random
+import time
+from agents.clinical import assess_clinical_risk
+from agents.graph import PlanetaryIntelligence, environment_flags, apply_environment, risk_level_for
+from agents.scoring import score_population, clinical_flag_lists, environmental_flag_lists, environmental_impact_strings, flag_names
+
+def per_record(v):
+    clinical = assess_clinical_risk.invoke({
+        "systolic_bp": v["systolic_bp"], "diastolic_bp": v["diastolic_bp"], "weight_kg": 60.0,
+        "hemoglobin": v["hemoglobin"], "glucose": v["glucose"], "gestational_age_weeks": 30,
+        "extra_symptoms": v["extra_symptoms"]
+    })
+    env = PlanetaryIntelligence(temperature_c=30.0, heat_index=v["heat_index"], aqi=v["aqi"], toxins=v["toxins"])
+    final_score, impact = apply_environment(clinical["clinical_risk_score"], env)
+    return final_score, risk_level_for(final_score), clinical["flags"], environment_flags(env), impact
+
+def random_vitals():
+    return {
+        "systolic_bp": random.randint(90, 190),
+        "diastolic_bp": random.randint(55, 125),
+        "hemoglobin": round(random.uniform(5.0, 14.0), 1),
+        "glucose": random.randint(70, 260),
+        "heat_index": round(random.uniform(25.0, 50.0), 1),
+        "aqi": round(random.uniform(20.0, 320.0), 1),
+        "toxins": round(random.uniform(0.0, 10.0), 1),
+        "extra_symptoms": random.choice(["", "", "headache", "swelling in feet"]),
+    }
+
+def main(n: int = 5000):
+    print(f"Comparing vectorized scoring against the per-record rules for {n} mothers...")
+    records = [random_vitals() for _ in range(n)]
+    columns = {key: [r[key] for r in records] for key in records[0]}
+
+    start = time.perf_counter()
+    expected = [per_record(r) for r in records]
+    per_record_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = score_population(
+        systolic_bp=columns["systolic_bp"], diastolic_bp=columns["diastolic_bp"],
+        hemoglobin=columns["hemoglobin"], glucose=columns["glucose"],
+        heat_index=columns["heat_index"], aqi=columns["aqi"], toxins=columns["toxins"],
+        extra_symptoms=columns["extra_symptoms"]
+    )
+    vectorized_s = time.perf_counter() - start
+
+    clinical_flags = clinical_flag_lists(result, columns["extra_symptoms"])
+    env_flags = environmental_flag_lists(result, columns["heat_index"], columns["aqi"], columns["toxins"])
+    impacts = environmental_impact_strings(result, columns["heat_index"], columns["aqi"])
+
+    mismatches = 0
+    for i, (score, level, c_flags, e_flags, impact) in enumerate(expected):
+        got = (float(result["final_score"][i]), result["risk_level"][i], clinical_flags[i], env_flags[i], impacts[i])
+        if got != (score, level, c_flags, e_flags, impact):
+            mismatches += 1
+            print(f"Mismatch for {records[i]}: expected {(score, level, c_flags, e_flags, impact)}, got {got}")
+            print(f"  flag mask: {flag_names(int(result['flags'][i]))}")
+
+    print(f"Per-record rules: {per_record_s * 1000:.1f} ms, vectorized: {vectorized_s * 1000:.1f} ms")
+    print("All results identical." if mismatches == 0 else f"{mismatches} mismatches.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.telegram_client import TelegramClient
+
+class FakeBotAPI(BaseHTTPRequestHandler):
+    """Local stand-in for the Telegram Bot API sendMessage method."""
+    received = defaultdict(list)
+    throttled_once = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        chat_id = body["chat_id"]
+        time.sleep(0.05)
+        with FakeBotAPI.lock:
+            if chat_id == "429" and chat_id not in FakeBotAPI.throttled_once:
+                FakeBotAPI.throttled_once.add(chat_id)
+                self._reply(429, {"ok": False, "description": "Too Many Requests: retry after 1",
+                                  "parameters": {"retry_after": 1}})
+                return
+            FakeBotAPI.received[chat_id].append((time.monotonic(), body["text"]))
+        self._reply(200, {"ok": True, "result": {"message_id": 1, "chat": {"id": chat_id}}})
+
+    def _reply(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBotAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = TelegramClient("TEST_TOKEN", base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                            global_rate=30, chat_interval=0.5)
+
+    print("--- Queued messages to one chat stay in order and are spaced ---")
+    for i in range(4):
+        client.enqueue("1001", f"msg {i}")
+    await client._queue.join()
+    sent = FakeBotAPI.received["1001"]
+    gaps = [round(b[0] - a[0], 2) for a, b in zip(sent, sent[1:])]
+    print(f"Order: {[text for _, text in sent]}, gaps (s): {gaps}")
+
+    print("--- A 429 is retried after retry_after ---")
+    await client.send_message("429", "hello")
+    print(f"Delivered after throttle: {[text for _, text in FakeBotAPI.received['429']]}")
+
+    print("--- Broadcast to 90 chats respects the global rate ---")
+    start = time.perf_counter()
+    result = await client.broadcast([(str(2000 + i), "Heatwave alert") for i in range(90)])
+    print(f"Sent {result['sent']} ({len(result['failed'])} failed) in {time.perf_counter() - start:.2f}s (>= ~3s at 30/s)")
+
+    print(f"Stats: {client.stats()}")
+    await client.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
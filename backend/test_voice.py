@@ -0,0 +1,94 @@
+import asyncio
+import io
+import shutil
+import time
+import wave
+from services.voice import VoicePipeline, FAILED_TRANSCRIPT, FFMPEG_BIN, SAMPLE_RATE
+
+def wav_bytes(seconds: float) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(b"\x00\x01" * int(SAMPLE_RATE * seconds))
+    return buffer.getvalue()
+
+class FakeTelegram:
+    """Serves voice notes from memory instead of the Bot API file endpoint."""
+
+    def __init__(self, files: dict):
+        self.files = files
+        self.downloads = 0
+
+    async def get_file_url(self, file_id: str) -> str:
+        return file_id if file_id in self.files else ""
+
+    async def iter_file(self, url: str, chunk_size: int = 64 * 1024):
+        self.downloads += 1
+        data = self.files[url]
+        for i in range(0, len(data), chunk_size):
+            await asyncio.sleep(0)
+            yield data[i:i + chunk_size]
+
+class StubTranscriber:
+    name = "stub"
+    loads = 0
+
+    def __init__(self):
+        # Stands in for loading a Whisper model, which blocks for seconds
+        StubTranscriber.loads += 1
+        time.sleep(1.0)
+
+    def transcribe(self, pcm: bytes) -> str:
+        time.sleep(0.05)
+        return f"{len(pcm)} bytes of speech"
+
+async def loop_stall(work) -> tuple:
+    """Runs `work` while measuring the longest the event loop went without a tick."""
+    longest = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal longest
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    result = await work
+    running = False
+    await tick
+    return result, longest
+
+async def main():
+    files = {f"note-{i}": wav_bytes(1 + i) for i in range(3)}
+    telegram = FakeTelegram(files)
+    pipeline = VoicePipeline(client=telegram, transcriber_factory=StubTranscriber, transcribe_workers=2)
+    if shutil.which(FFMPEG_BIN) is None:
+        print(f"{FFMPEG_BIN} not found; transcoding is replaced by a passthrough")
+        async def passthrough(url: str) -> bytes:
+            return b"".join([chunk async for chunk in telegram.iter_file(url)])
+        pipeline.transcode = passthrough
+
+    print("--- The first notes load the model off the event loop, once ---")
+    texts, stall = await loop_stall(asyncio.gather(*[pipeline.transcribe(f) for f in files]))
+    print(f"Transcripts: {texts}")
+    print(f"Model loads: {StubTranscriber.loads}, longest event loop stall: {stall * 1000:.0f} ms (model load takes 1000 ms)")
+
+    print("--- Retried deliveries of one note share a run, then hit the cache ---")
+    files["note-new"] = wav_bytes(0.5)
+    before = telegram.downloads
+    texts = await asyncio.gather(*[pipeline.transcribe("note-new", "unique-new") for _ in range(5)])
+    again = await pipeline.transcribe("note-new", "unique-new")
+    print(f"5 concurrent + 1 later: {len(set(texts + [again]))} distinct transcript, downloads: {telegram.downloads - before}")
+
+    print("--- A note Telegram cannot serve fails softly ---")
+    print(f"Missing file: {await pipeline.transcribe('gone') == FAILED_TRANSCRIPT}")
+    print(f"Stats: {pipeline.stats()}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import os
+import tempfile
+
+# A throwaway database, so the script never touches data/matrukavach.db
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'worklist.db')}"
+os.environ.setdefault("DB_ECHO", "0")
+os.environ.setdefault("ENV_PREFETCH_ENABLED", "false")
+
+from datetime import datetime, timedelta
+from fastapi import Response
+from sqlmodel import Session
+from database import engine, create_db_and_tables
+from models import MotherProfile, RiskAssessment
+from services.latest_risk import record_assessments, record_red_message, mark_read
+from main import get_worklist
+
+def add_mother(session: Session, mother_id: str):
+    session.add(MotherProfile(id=mother_id, name=mother_id, age=25, gestational_age_weeks=30,
+                              phone="0", latitude=19.0, longitude=72.8))
+
+def assess(session: Session, mother_id: str, score: float, at: datetime):
+    risk = RiskAssessment(assessment_data_id=0, mother_id=mother_id, overall_risk_score=score,
+                          risk_level="HIGH" if score >= 7 else "MODERATE", clinical_flags="[]",
+                          environmental_flags="[]", nutrition_advice="{}", medication_reminders="[]",
+                          environmental_impact="", timestamp=at)
+    session.add(risk)
+    session.flush()
+    record_assessments(session, [risk])
+
+def worklist(session: Session, limit: int = 50, cursor: str = None):
+    response = Response()
+    rows = get_worklist(session, response, limit=limit, cursor=cursor,
+                        asha_id=None, doctor_id=None, risk_level=None)
+    return rows, response.headers.get("x-next-cursor")
+
+def paged(session: Session) -> list:
+    seen, cursor = [], None
+    while True:
+        rows, cursor = worklist(session, limit=1, cursor=cursor)
+        seen += [row["mother_id"] for row in rows]
+        if not cursor:
+            return seen
+
+def main():
+    create_db_and_tables()
+    now = datetime.now()
+    with Session(engine) as session:
+        for mother_id in ("HIGH-SCORE", "RED-ONLY", "RED-TWICE", "RED-ONCE", "MODERATE"):
+            add_mother(session, mother_id)
+        assess(session, "HIGH-SCORE", 9.0, now)
+        assess(session, "MODERATE", 5.0, now - timedelta(hours=1))
+        assess(session, "RED-TWICE", 5.0, now - timedelta(days=2))
+        assess(session, "RED-ONCE", 5.0, now - timedelta(days=2))
+        # No assessment at all, only a danger-sign message
+        record_red_message(session, "RED-ONLY", now - timedelta(days=3))
+        record_red_message(session, "RED-TWICE", now - timedelta(days=2))
+        record_red_message(session, "RED-TWICE", now - timedelta(days=2))
+        record_red_message(session, "RED-ONCE", now - timedelta(minutes=5))
+        session.commit()
+
+        print("--- Unread RED messages rank ahead of score and recency ---")
+        rows, _ = worklist(session)
+        for row in rows:
+            print(f"{row['mother_id']:<11} tier={row['priority_tier']} score={row['overall_risk_score']} "
+                  f"unread={row['unread_red_count']}")
+        order = [row["mother_id"] for row in rows]
+        expected = ["RED-TWICE", "RED-ONCE", "RED-ONLY", "HIGH-SCORE", "MODERATE"]
+        print(f"Order as expected: {order == expected}")
+        print(f"Paging with a cursor matches: {paged(session) == order}")
+
+        print("--- Reading the chat drops a mother back to her score ---")
+        mark_read(session, "RED-TWICE")
+        session.commit()
+        order = [row["mother_id"] for row in worklist(session)[0]]
+        print(f"Order: {order}")
+        print(f"Order as expected: {order == ['RED-ONCE', 'RED-ONLY', 'HIGH-SCORE', 'MODERATE', 'RED-TWICE']}")
+        print(f"Paging with a cursor matches: {paged(session) == order}")
+
+if __name__ == "__main__":
+    main()
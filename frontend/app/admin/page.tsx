@@ -8,11 +8,12 @@ import { Shield, RefreshCw, Users, UserPlus, Activity, CheckCircle2, AlertTriang
 import { motion, AnimatePresence } from "framer-motion";
 
 import { API_BASE_URL } from "@/lib/api";
+import { useMothers } from "@/lib/useMothers";
 
 export default function AdminDashboard() {
     const [activeTab, setActiveTab] = useState("overview");
     const [stats, setStats] = useState<any>(null);
-    const [mothers, setMothers] = useState<any[]>([]);
+    const { mothers, setMothers, loading: mothersLoading, hasMore, loadMore } = useMothers("name,phone,location,assigned_asha_id,assigned_doctor_id");
     const [doctors, setDoctors] = useState<any[]>([]);
     const [ashas, setAshas] = useState<any[]>([]);
     const [loading, setLoading] = useState(true);
@@ -20,15 +21,13 @@ export default function AdminDashboard() {
     const fetchData = async () => {
         setLoading(true);
         try {
-            const [statsRes, mothersRes, docsRes, ashasRes] = await Promise.all([
+            const [statsRes, docsRes, ashasRes] = await Promise.all([
                 fetch(`${API_BASE_URL}/admin/stats`),
-                fetch(`${API_BASE_URL}/mothers`),
                 fetch(`${API_BASE_URL}/doctors`),
                 fetch(`${API_BASE_URL}/asha_workers`),
             ]);
 
             if (statsRes.ok) setStats(await statsRes.json());
-            if (mothersRes.ok) setMothers(await mothersRes.json());
             if (docsRes.ok) setDoctors(await docsRes.json());
             if (ashasRes.ok) setAshas(await ashasRes.json());
         } catch (e) {
@@ -55,7 +54,12 @@ export default function AdminDashboard() {
             });
 
             if (res.ok) {
-
+                const updated = await res.json();
+                setMothers(prev => prev.map(m => m.id === motherId ? {
+                    ...m,
+                    assigned_doctor_id: updated.assigned_doctor_id,
+                    assigned_asha_id: updated.assigned_asha_id
+                } : m));
                 fetchData();
             } else {
                 alert("Failed to assign.");
@@ -199,7 +203,7 @@ export default function AdminDashboard() {
                         <motion.div initial={{ opacity: 0, y: 10 }} animate={{ opacity: 1, y: 0 }} exit={{ opacity: 0, y: -10 }}>
                             <Card className="p-0 shadow-sm border border-gray-100 overflow-hidden">
                                 <div className="p-6 border-b border-gray-100 flex justify-between items-center">
-                                    <h2 className="text-lg font-bold text-gray-900">Manage Mothers ({mothers.length})</h2>
+                                    <h2 className="text-lg font-bold text-gray-900">Manage Mothers ({stats?.total_mothers ?? mothers.length})</h2>
                                 </div>
                                 <div className="overflow-x-auto">
                                     <table className="w-full text-left border-collapse">
@@ -251,6 +255,13 @@ export default function AdminDashboard() {
                                         </tbody>
                                     </table>
                                 </div>
+                                {hasMore && (
+                                    <div className="p-4 border-t border-gray-100 flex justify-center">
+                                        <Button variant="secondary" onClick={loadMore} disabled={mothersLoading}>
+                                            {mothersLoading ? "Loading..." : "Load more"}
+                                        </Button>
+                                    </div>
+                                )}
                             </Card>
                         </motion.div>
                     )}
@@ -260,7 +271,7 @@ export default function AdminDashboard() {
                             <h2 className="text-lg font-bold text-gray-900 mb-6">Manage ASHA Workers ({ashas.length})</h2>
                             <div className="space-y-4">
                                 {ashas.map((asha) => {
-                                    const assignedCount = stats?.asha_workloads.find((a: any) => a.id === asha.id)?.count || 0;
+                                    const assignedCount = asha.assigned_count || 0;
                                     return (
                                         <Card key={asha.id} className="p-6 flex flex-col sm:flex-row justify-between items-start sm:items-center gap-4 sm:gap-0 shadow-sm border border-gray-100 hover:shadow-md transition-shadow">
                                             <div className="flex items-center gap-4">
@@ -291,7 +302,7 @@ export default function AdminDashboard() {
                             <h2 className="text-lg font-bold text-gray-900 mb-6">Manage Doctors ({doctors.length})</h2>
                             <div className="space-y-4">
                                 {doctors.map((doc) => {
-                                    const assignedCount = stats?.doctor_workloads.find((d: any) => d.id === doc.id)?.count || 0;
+                                    const assignedCount = doc.assigned_count || 0;
                                     return (
                                         <Card key={doc.id} className="p-6 flex flex-col sm:flex-row justify-between items-start sm:items-center gap-4 sm:gap-0 shadow-sm border border-gray-100 hover:shadow-md transition-shadow">
                                             <div className="flex items-center gap-4">
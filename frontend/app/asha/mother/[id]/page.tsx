@@ -10,6 +10,7 @@ import Link from "next/link";
 import { Input } from "@/components/ui/Input";
 import { ChatWindow } from "@/components/ChatWindow";
 import { API_BASE_URL } from "@/lib/api";
+import { useAssessmentHistory } from "@/lib/useAssessmentHistory";
 
 export default function MotherDetailPage() {
     const params = useParams();
@@ -17,7 +18,7 @@ export default function MotherDetailPage() {
 
     const [activeTab, setActiveTab] = useState("assessments");
     const [mother, setMother] = useState<any>(null);
-    const [history, setHistory] = useState<any[]>([]);
+    const { history, setHistory, loading: loadingHistory, hasMore: hasMoreHistory, loadMore: loadMoreHistory } = useAssessmentHistory(motherId);
     const [documents, setDocuments] = useState<any[]>([]);
     const [loading, setLoading] = useState(true);
     const [uploading, setUploading] = useState(false);
@@ -29,9 +30,6 @@ export default function MotherDetailPage() {
                 const motherRes = await fetch(`${API_BASE_URL}/mother/${motherId}`);
                 if (motherRes.ok) setMother(await motherRes.json());
 
-                const histRes = await fetch(`${API_BASE_URL}/mother/${motherId}/history`);
-                if (histRes.ok) setHistory(await histRes.json());
-
                 const docsRes = await fetch(`${API_BASE_URL}/mother/${motherId}/documents`);
                 if (docsRes.ok) setDocuments(await docsRes.json());
 
@@ -165,7 +163,7 @@ export default function MotherDetailPage() {
                         {activeTab === 'assessments' && (
                             <motion.div initial={{ opacity: 0, y: 10 }} animate={{ opacity: 1, y: 0 }} exit={{ opacity: 0, y: -10 }} className="space-y-4">
                                 <div className="flex justify-between items-center mb-2">
-                                    <h3 className="font-bold text-gray-900">Assessment History ({history.length})</h3>
+                                    <h3 className="font-bold text-gray-900">Assessment History ({history.length}{hasMoreHistory ? "+" : ""})</h3>
                                     <Button size="sm" variant="secondary">Download Report</Button>
                                 </div>
                                 {history.map((record, i) => (
@@ -214,6 +212,13 @@ export default function MotherDetailPage() {
                                         )}
                                     </Card>
                                 ))}
+                                {hasMoreHistory && (
+                                    <div className="flex justify-center">
+                                        <Button variant="secondary" onClick={loadMoreHistory} disabled={loadingHistory}>
+                                            {loadingHistory ? "Loading..." : "Load older assessments"}
+                                        </Button>
+                                    </div>
+                                )}
                             </motion.div>
                         )}
 
@@ -252,7 +257,7 @@ export default function MotherDetailPage() {
                                                         <p className="text-xs text-gray-500 font-medium mt-1 uppercase tracking-wider">{new Date(doc.uploaded_at).toLocaleString()}</p>
                                                     </div>
                                                 </div>
-                                                <a href={`${API_BASE_URL}/${doc.file_path}`} target="_blank" rel="noreferrer">
+                                                <a href={`${API_BASE_URL}/documents/${doc.id}/file`} target="_blank" rel="noreferrer">
                                                     <Button variant="secondary" size="sm">View</Button>
                                                 </a>
                                             </div>
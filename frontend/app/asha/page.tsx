@@ -1,30 +1,17 @@
 "use client";
 
-import React, { useState, useEffect } from "react";
+import React, { useState } from "react";
 import { Button } from "@/components/ui/Button";
 import { Card } from "@/components/ui/Card";
 import { Plus, Search, MapPin, AlertCircle } from "lucide-react";
 import Link from "next/link";
 import { Input } from "@/components/ui/Input";
 
-import { API_BASE_URL } from "@/lib/api";
+import { useMothers } from "@/lib/useMothers";
 
 export default function AshaDashboard() {
-    const [mothers, setMothers] = useState<any[]>([]);
-    const [loading, setLoading] = useState(true);
-
-    useEffect(() => {
-        fetch(`${API_BASE_URL}/mothers`)
-            .then(res => res.json())
-            .then(data => {
-                setMothers(data);
-                setLoading(false);
-            })
-            .catch(err => {
-                console.error("Failed to fetch mothers:", err);
-                setLoading(false);
-            });
-    }, []);
+    const [search, setSearch] = useState("");
+    const { mothers, loading, hasMore, loadMore } = useMothers("name,location,age,gestational_age_weeks", search);
 
     return (
         <div className="space-y-8">
@@ -37,12 +24,12 @@ export default function AshaDashboard() {
 
             <div className="flex flex-col sm:flex-row gap-4">
                 <div className="flex-1 w-full">
-                    <Input placeholder="Search by name or ID..." className="bg-white w-full" />
+                    <Input placeholder="Search by name or ID..." className="bg-white w-full" value={search} onChange={(e) => setSearch(e.target.value)} />
                 </div>
                 <Button variant="secondary" className="w-full sm:w-auto">Filter</Button>
             </div>
 
-            {loading ? (
+            {loading && mothers.length === 0 ? (
                 <div className="text-center py-10 text-gray-900 animate-pulse">Loading Patient Profiles...</div>
             ) : (
                 <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
@@ -77,6 +64,14 @@ export default function AshaDashboard() {
                     ))}
                 </div>
             )}
+
+            {hasMore && (
+                <div className="flex justify-center">
+                    <Button variant="secondary" onClick={loadMore} disabled={loading}>
+                        {loading ? "Loading..." : "Load more"}
+                    </Button>
+                </div>
+            )}
         </div>
     );
 }
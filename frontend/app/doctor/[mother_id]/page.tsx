@@ -8,6 +8,7 @@ import { Button } from "@/components/ui/Button";
 import { MapPin, Calendar, Clock, Activity, FileText, Pill, FileUp, Apple, ClipboardList, CheckCircle2, MessageSquare, AlertCircle, RefreshCw } from "lucide-react";
 import { ChatWindow } from "@/components/ChatWindow";
 import { API_BASE_URL } from "@/lib/api";
+import { useAssessmentHistory } from "@/lib/useAssessmentHistory";
 
 export default function DoctorPatientDetail() {
     const params = useParams();
@@ -15,7 +16,7 @@ export default function DoctorPatientDetail() {
     const motherId = params.mother_id as string;
 
     const [mother, setMother] = useState<any>(null);
-    const [history, setHistory] = useState<any[]>([]);
+    const { history, loading: loadingHistory, hasMore: hasMoreHistory, loadMore: loadMoreHistory } = useAssessmentHistory(motherId);
     const [consultations, setConsultations] = useState<any[]>([]);
     const [documents, setDocuments] = useState<any[]>([]);
     const [loading, setLoading] = useState(true);
@@ -34,13 +35,11 @@ export default function DoctorPatientDetail() {
     useEffect(() => {
         Promise.all([
             fetch(`${API_BASE_URL}/mother/${motherId}`).then(res => res.json()),
-            fetch(`${API_BASE_URL}/mother/${motherId}/history`).then(res => res.json()),
             fetch(`${API_BASE_URL}/mother/${motherId}/consultations`).then(res => res.json()),
             fetch(`${API_BASE_URL}/mother/${motherId}/documents`).then(res => res.json())
         ])
-            .then(([motherData, historyData, consultationData, documentData]) => {
+            .then(([motherData, consultationData, documentData]) => {
                 setMother(motherData);
-                setHistory(historyData);
                 setConsultations(Array.isArray(consultationData) ? consultationData : []);
                 setDocuments(Array.isArray(documentData) ? documentData : []);
                 setLoading(false);
@@ -291,7 +290,7 @@ export default function DoctorPatientDetail() {
                     {activeTab === "assessments" && (
                         <div className="space-y-6">
                             <h3 className="font-heading text-xl font-medium tracking-tight">On-Ground ASHA Assessments</h3>
-                            {history.length === 0 ? <p className="text-gray-500">No assessments found.</p> : (
+                            {history.length === 0 ? <p className="text-gray-500">{loadingHistory ? "Loading assessments..." : "No assessments found."}</p> : (
                                 history.map((record, i) => {
                                     const date = new Date(record.risk.timestamp);
                                     let flags = [];
@@ -362,6 +361,13 @@ export default function DoctorPatientDetail() {
                                     );
                                 })
                             )}
+                            {hasMoreHistory && (
+                                <div className="flex justify-center">
+                                    <Button variant="secondary" onClick={loadMoreHistory} disabled={loadingHistory}>
+                                        {loadingHistory ? "Loading..." : "Load older assessments"}
+                                    </Button>
+                                </div>
+                            )}
                         </div>
                     )}
 
@@ -381,7 +387,7 @@ export default function DoctorPatientDetail() {
                             {documents.length === 0 ? <p className="text-gray-500 bg-white p-8 rounded-xl text-center border border-gray-100">No documents uploaded yet.</p> : (
                                 <div className="grid sm:grid-cols-2 lg:grid-cols-3 gap-4">
                                     {documents.map(doc => (
-                                        <Card key={doc.id} className="p-4 flex items-center gap-4 bg-white border border-gray-200 hover:shadow-md transition-shadow cursor-pointer group">
+                                        <Card key={doc.id} onClick={() => window.open(`${API_BASE_URL}/documents/${doc.id}/file`, "_blank")} className="p-4 flex items-center gap-4 bg-white border border-gray-200 hover:shadow-md transition-shadow cursor-pointer group">
                                             <div className="w-12 h-12 bg-blue-50 text-blue-600 rounded-xl flex items-center justify-center group-hover:bg-blue-600 group-hover:text-white transition-colors">
                                                 <FileText className="w-6 h-6" />
                                             </div>
@@ -1,5 +1,5 @@
 "use client";
-import React, { useState, useEffect } from "react";
+import React, { useState } from "react";
 import { Button } from "@/components/ui/Button";
 import { Card } from "@/components/ui/Card";
 import { MapPin, Search } from "lucide-react";
@@ -7,24 +7,11 @@ import Link from "next/link";
 import { Input } from "@/components/ui/Input";
 import { Header } from "@/components/layout/Header";
 
-import { API_BASE_URL } from "@/lib/api";
+import { useMothers } from "@/lib/useMothers";
 
 export default function DoctorDashboard() {
-    const [mothers, setMothers] = useState<any[]>([]);
-    const [loading, setLoading] = useState(true);
-
-    useEffect(() => {
-        fetch(`${API_BASE_URL}/mothers`)
-            .then(res => res.json())
-            .then(data => {
-                setMothers(data);
-                setLoading(false);
-            })
-            .catch(err => {
-                console.error("Failed to fetch mothers:", err);
-                setLoading(false);
-            });
-    }, []);
+    const [search, setSearch] = useState("");
+    const { mothers, loading, hasMore, loadMore } = useMothers("name,location,age,gestational_age_weeks,phone", search);
 
     return (
         <div className="min-h-screen font-body selection:bg-accent/30 flex flex-col">
@@ -40,14 +27,14 @@ export default function DoctorDashboard() {
 
                     <div className="flex flex-col sm:flex-row gap-4">
                         <div className="flex-1 w-full">
-                            <Input placeholder="Search patient by name or ID..." className="bg-white/60 backdrop-blur-sm border-gray-200 w-full" />
+                            <Input placeholder="Search patient by name or ID..." className="bg-white/60 backdrop-blur-sm border-gray-200 w-full" value={search} onChange={(e) => setSearch(e.target.value)} />
                         </div>
                         <button className="bg-gray-900 w-full sm:w-auto hover:bg-black text-white px-6 py-2 rounded-lg font-medium shadow-sm flex items-center justify-center gap-2 transition-all">
                             <Search className="w-4 h-4" /> Search
                         </button>
                     </div>
 
-                    {loading ? (
+                    {loading && mothers.length === 0 ? (
                         <div className="text-center py-10 text-gray-900 animate-pulse font-medium">Loading Patient Records...</div>
                     ) : (
                         <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
@@ -85,6 +72,14 @@ export default function DoctorDashboard() {
                             ))}
                         </div>
                     )}
+
+                    {hasMore && (
+                        <div className="flex justify-center">
+                            <Button variant="secondary" onClick={loadMore} disabled={loading}>
+                                {loading ? "Loading..." : "Load more"}
+                            </Button>
+                        </div>
+                    )}
                 </div>
             </div>
         </div>
@@ -4,7 +4,8 @@ import React, { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/Button";
 import { Input } from "@/components/ui/Input";
 import { Send, User, Mic, PlayCircle } from "lucide-react";
-import { API_BASE_URL, socket } from "@/lib/api";
+import { API_BASE_URL, connectSocket, socket } from "@/lib/api";
+import { useAuth } from "@clerk/nextjs";
 
 interface ChatMessage {
     id: string;
@@ -16,6 +17,21 @@ interface ChatMessage {
     priority?: string;
 }
 
+function toChatMessage(m: any): ChatMessage {
+    return {
+        id: m.id || m.message_id,
+        sender: m.sender || "Patient",
+        content: m.translated_text || m.raw_text,
+        timestamp: m.timestamp,
+        original_content: m.raw_text,
+        is_urgent: m.priority === "RED",
+        priority: m.priority || "GREEN"
+    };
+}
+
+// Messages fetched per page; matches the backend's default window
+const CHAT_PAGE = 100;
+
 interface ChatWindowProps {
     motherId: string;
 }
@@ -25,23 +41,24 @@ export function ChatWindow({ motherId }: ChatWindowProps) {
     const [loading, setLoading] = useState(true);
     const [newMessage, setNewMessage] = useState("");
     const [sending, setSending] = useState(false);
+    const [hasOlder, setHasOlder] = useState(false);
+    const [loadingOlder, setLoadingOlder] = useState(false);
     const messagesEndRef = useRef<HTMLDivElement>(null);
+    const lastIdRef = useRef(0);
+    const prependedRef = useRef(false);
+    const { isLoaded, getToken } = useAuth();
 
     useEffect(() => {
-        fetch(`${API_BASE_URL}/mother/${motherId}/chat`)
+        lastIdRef.current = 0;
+        fetch(`${API_BASE_URL}/mother/${motherId}/chat?limit=${CHAT_PAGE}`)
             .then(res => res.json())
             .then(data => {
-                
-                setMessages(data.map((m: any) => ({
-                    id: m.id || m.message_id,
-                    sender: m.sender || "Patient",
-                    content: m.translated_text || m.raw_text,
-                    timestamp: m.timestamp,
-                    original_content: m.raw_text,
-                    is_urgent: m.priority === "RED",
-                    priority: m.priority || "GREEN"
-                })));
+                setMessages(data.map(toChatMessage));
+                setHasOlder(data.length === CHAT_PAGE);
+                lastIdRef.current = Math.max(0, ...data.map((m: any) => m.id || 0));
                 setLoading(false);
+                // Opening the chat clears the mother's unread RED count on the worklist
+                fetch(`${API_BASE_URL}/mother/${motherId}/chat/read`, { method: "POST" }).catch(() => {});
             })
             .catch(err => {
                 console.error("Failed to load chat history:", err);
@@ -50,11 +67,35 @@ export function ChatWindow({ motherId }: ChatWindowProps) {
     }, [motherId]);
 
     useEffect(() => {
-        if (!socket.connected) socket.connect();
+        if (!isLoaded) return;
+        connectSocket(getToken);
+
+        // Join this mother's room now and again after every reconnect, fetching
+        // only the messages that arrived while disconnected
+        const watch = () => {
+            socket.emit("watch_mother", motherId);
+            if (!lastIdRef.current) return;
+            fetch(`${API_BASE_URL}/mother/${motherId}/chat?after_id=${lastIdRef.current}`)
+                .then(res => res.json())
+                .then(data => {
+                    if (!data.length) return;
+                    lastIdRef.current = Math.max(lastIdRef.current, ...data.map((m: any) => m.id));
+                    setMessages(prev => {
+                        const seen = new Set(prev.map(m => String(m.id)));
+                        return [...prev, ...data.map(toChatMessage).filter((m: ChatMessage) => !seen.has(String(m.id)))];
+                    });
+                })
+                .catch(err => console.error("Failed to catch up chat:", err));
+        };
+        if (socket.connected) watch();
+        socket.on("connect", watch);
 
         socket.on("new_notification", (data: any) => {
             if (data.mother_id === motherId) {
-                
+                // The server sends ids as strings
+                const id = Number(data.id);
+                if (Number.isFinite(id)) lastIdRef.current = Math.max(lastIdRef.current, id);
+
                 const newMsg: ChatMessage = {
                     id: data.id || Date.now().toString(),
                     sender: data.sender || "Patient",
@@ -63,19 +104,54 @@ export function ChatWindow({ motherId }: ChatWindowProps) {
                     is_urgent: data.is_urgent,
                     priority: data.priority || "GREEN"
                 };
-                setMessages(prev => [...prev, newMsg]);
+                setMessages(prev => prev.some(m => String(m.id) === String(newMsg.id)) ? prev : [...prev, newMsg]);
+            }
+        });
+
+        socket.on("notification_updated", (data: any) => {
+            if (data.mother_id === motherId) {
+                setMessages(prev => prev.map(m => String(m.id) === String(data.id) ? { ...m, content: data.content } : m));
             }
         });
 
         return () => {
+            socket.emit("unwatch_mother", motherId);
+            socket.off("connect", watch);
             socket.off("new_notification");
+            socket.off("notification_updated");
         };
-    }, [motherId]);
+    }, [motherId, isLoaded, getToken]);
 
     useEffect(() => {
+        // Keep the reader's place when older messages are added above
+        if (prependedRef.current) {
+            prependedRef.current = false;
+            return;
+        }
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
     }, [messages]);
 
+    const loadOlder = async () => {
+        const ids = messages.map(m => Number(m.id)).filter(Number.isFinite);
+        if (!ids.length) return;
+
+        setLoadingOlder(true);
+        try {
+            const res = await fetch(`${API_BASE_URL}/mother/${motherId}/chat?before_id=${Math.min(...ids)}&limit=${CHAT_PAGE}`);
+            const data = await res.json();
+            setHasOlder(data.length === CHAT_PAGE);
+            prependedRef.current = true;
+            setMessages(prev => {
+                const seen = new Set(prev.map(m => String(m.id)));
+                return [...data.map(toChatMessage).filter((m: ChatMessage) => !seen.has(String(m.id))), ...prev];
+            });
+        } catch (err) {
+            console.error("Failed to load older messages:", err);
+        } finally {
+            setLoadingOlder(false);
+        }
+    };
+
     const handleSend = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!newMessage.trim()) return;
@@ -116,6 +192,13 @@ export function ChatWindow({ motherId }: ChatWindowProps) {
             </div>
 
             <div className="flex-1 overflow-y-auto p-4 space-y-4">
+                {!loading && hasOlder && (
+                    <div className="text-center">
+                        <Button type="button" variant="ghost" size="sm" isLoading={loadingOlder} onClick={loadOlder}>
+                            Load older messages
+                        </Button>
+                    </div>
+                )}
                 {loading ? (
                     <div className="text-center text-gray-400 py-10">Loading history...</div>
                 ) : messages.length === 0 ? (
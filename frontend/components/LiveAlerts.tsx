@@ -1,7 +1,8 @@
 "use client";
 
 import React, { useState, useEffect } from "react";
-import { socket } from "@/lib/api";
+import { connectSocket, socket } from "@/lib/api";
+import { useAuth } from "@clerk/nextjs";
 import { X, Bell, AlertTriangle } from "lucide-react";
 import { motion, AnimatePresence } from "framer-motion";
 import Link from "next/link";
@@ -20,9 +21,11 @@ interface Alert {
 export function LiveAlerts() {
     const [alerts, setAlerts] = useState<Alert[]>([]);
     const [isOpen, setIsOpen] = useState(true); 
+    const { isLoaded, getToken } = useAuth();
 
     useEffect(() => {
-        if (!socket.connected) socket.connect();
+        if (!isLoaded) return;
+        connectSocket(getToken);
 
         socket.on("new_notification", (data: any) => {
             console.log("New Notification:", data);
@@ -42,10 +45,16 @@ export function LiveAlerts() {
             ]);
         });
 
+        // Urgent alerts arrive untranslated first; swap in the translation when it is ready
+        socket.on("notification_updated", (data: any) => {
+            setAlerts(prev => prev.map(a => a.id === data.id ? { ...a, content: data.content, priority: data.priority || a.priority } : a));
+        });
+
         return () => {
             socket.off("new_notification");
+            socket.off("notification_updated");
         };
-    }, []);
+    }, [isLoaded, getToken]);
 
     const removeAlert = (id: string, e: React.MouseEvent) => {
         e.preventDefault();  
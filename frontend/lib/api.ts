@@ -4,5 +4,15 @@ export const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost
 
 export const socket = io(API_BASE_URL, {
     transports: ["websocket"],
-    autoConnect: true,
+    autoConnect: false,
 });
+
+// The server verifies the signed-in user's Clerk session token and picks the
+// rooms (own mothers, or everything for admins) from it. The token is fetched
+// again on every reconnect because Clerk session tokens are short-lived.
+export function connectSocket(getToken: () => Promise<string | null>) {
+    socket.auth = (cb) => {
+        getToken().then(token => cb({ token }), () => cb({}));
+    };
+    if (!socket.connected) socket.connect();
+}
@@ -0,0 +1,46 @@
+"use client";
+
+import { useCallback, useEffect, useRef, useState } from "react";
+import { API_BASE_URL } from "@/lib/api";
+
+// Pages through a mother's assessments, newest first. /history returns one
+// page at a time, so older assessments are fetched with loadMore.
+export function useAssessmentHistory(motherId: string) {
+    const [history, setHistory] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loading, setLoading] = useState(true);
+    const requestRef = useRef(0);
+
+    const load = useCallback(async (cursor: string | null) => {
+        const params = new URLSearchParams();
+        if (cursor) params.set("cursor", cursor);
+
+        const request = ++requestRef.current;
+        setLoading(true);
+        try {
+            const res = await fetch(`${API_BASE_URL}/mother/${motherId}/history?${params}`);
+            if (!res.ok) return;
+            const page = await res.json();
+            // The page may have moved to another mother while this was loading
+            if (request !== requestRef.current) return;
+            setHistory(prev => cursor ? [...prev, ...page] : page);
+            setNextCursor(res.headers.get("X-Next-Cursor"));
+        } catch (err) {
+            console.error("Failed to fetch assessment history:", err);
+        } finally {
+            if (request === requestRef.current) setLoading(false);
+        }
+    }, [motherId]);
+
+    useEffect(() => {
+        load(null);
+    }, [load]);
+
+    return {
+        history,
+        setHistory,
+        loading,
+        hasMore: nextCursor !== null,
+        loadMore: () => load(nextCursor),
+    };
+}
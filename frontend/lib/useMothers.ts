@@ -0,0 +1,47 @@
+"use client";
+
+import { useCallback, useEffect, useRef, useState } from "react";
+import { API_BASE_URL } from "@/lib/api";
+
+// Pages through /mothers, fetching only the columns a list view shows.
+// Changing `search` restarts from the first page after a short debounce.
+export function useMothers(fields: string, search: string = "") {
+    const [mothers, setMothers] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loading, setLoading] = useState(true);
+    const requestRef = useRef(0);
+
+    const load = useCallback(async (cursor: string | null) => {
+        const params = new URLSearchParams({ fields });
+        if (search.trim()) params.set("q", search.trim());
+        if (cursor) params.set("cursor", cursor);
+
+        const request = ++requestRef.current;
+        setLoading(true);
+        try {
+            const res = await fetch(`${API_BASE_URL}/mothers?${params}`);
+            const page = await res.json();
+            // A newer search may have started while this page was loading
+            if (request !== requestRef.current) return;
+            setMothers(prev => cursor ? [...prev, ...page] : page);
+            setNextCursor(res.headers.get("X-Next-Cursor"));
+        } catch (err) {
+            console.error("Failed to fetch mothers:", err);
+        } finally {
+            if (request === requestRef.current) setLoading(false);
+        }
+    }, [fields, search]);
+
+    useEffect(() => {
+        const timer = setTimeout(() => load(null), search ? 300 : 0);
+        return () => clearTimeout(timer);
+    }, [load, search]);
+
+    return {
+        mothers,
+        setMothers,
+        loading,
+        hasMore: nextCursor !== null,
+        loadMore: () => load(nextCursor),
+    };
+}